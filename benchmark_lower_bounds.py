@@ -0,0 +1,33 @@
+import argparse
+import time
+
+from evaluate_algorithm import init_terminal, load_events
+from main.model.policies.lowerBounds import stack_blocking, bay_blocking, Maximum
+from main.model.policies.pbfs import PBFS
+
+available_bounds = {
+    "stack": stack_blocking,
+    "bay": bay_blocking,
+    "max": Maximum(stack_blocking, bay_blocking),
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-t', '--terminal', default='1', action="store", help="Which terminal layout needs to be used. 1=gantry, 2=reachstacker", choices=['1', '2'])
+    parser.add_argument('-i', '--instances', default=[1], nargs="+", type=int, help="The numbers of the instances solved")
+    parser.add_argument('-l', '--bounds', default=list(available_bounds), nargs="+", help="The lower bounds compared", choices=list(available_bounds))
+
+    args = parser.parse_args()
+
+    events = load_events(args.terminal)
+    terminal = init_terminal(args.terminal)
+
+    print("instance\tbound\texpected reshuffles\texpanded nodes\tseconds")
+    for instance_nr in args.instances:
+        for bound_name in args.bounds:
+            start = time.time()
+            pbfs = PBFS(events[instance_nr - 1], terminal, lower_bound_function=available_bounds[bound_name])
+            print("{}\t{}\t{}\t{}\t{:.2f}".format(instance_nr, bound_name, pbfs.cache_chance[(0, terminal)],
+                                                  pbfs.expanded_nodes, time.time() - start))
@@ -0,0 +1,29 @@
+import argparse
+import os
+import time
+
+from main.model.events.evaluatableEvents import EvaluatableEvents
+from main.model.events.packedEvents import EXTENSION
+from main.util import sub_folder
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-d', '--directory', default=sub_folder("events"), help="Directory of the instance files")
+    parser.add_argument('-f', '--files', nargs="+", default=None, help="Names of the instances converted (without extension), by default all json instances in the directory")
+    parser.add_argument('--force', default=False, action="store_true", help="Also convert instances that are already converted")
+
+    args = parser.parse_args()
+
+    names = args.files
+    if names is None:
+        names = sorted([os.path.splitext(f)[0] for f in os.listdir(args.directory) if f.endswith(".json")])
+
+    for name in names:
+        if not args.force and os.path.isfile(os.path.join(args.directory, "{}.{}".format(name, EXTENSION))):
+            print("{}: already converted".format(name))
+            continue
+        start = time.time()
+        events = EvaluatableEvents.load_evaluatable_events(name, directory=args.directory)
+        events.write_packed_events(name, directory=args.directory)
+        print("{}: converted in {:.2f}s".format(name, time.time() - start))
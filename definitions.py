@@ -2,3 +2,4 @@ import os
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 EXPORT_DIR = os.path.join(ROOT_DIR, "events")
+SOLUTION_STORE = os.path.join(ROOT_DIR, "solutions.sqlite")
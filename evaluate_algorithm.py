@@ -1,6 +1,6 @@
 import argparse
 from multiprocessing import Pool
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 import numpy
 
@@ -33,19 +33,22 @@ class ADPSettings:
     DEFAULT_EPSILON = 0.05
     DEFAULT_CONSTANT = 1.0
     DEFAULT_OPTIMIZED = False
+    DEFAULT_BEAM_WIDTH = None
 
     def __init__(self, discount_factor: float = DEFAULT_DISCOUNT_FACTOR,
                  init_weight: float = DEFAULT_INIT_WEIGHT,
                  delta: float = DEFAULT_DELTA,
                  epsilon: float = DEFAULT_EPSILON,
                  optimized: bool = DEFAULT_OPTIMIZED,
-                 constant: float = DEFAULT_CONSTANT):
+                 constant: float = DEFAULT_CONSTANT,
+                 beam_width: Optional[int] = DEFAULT_BEAM_WIDTH):
         self.discount_factor = discount_factor
         self.init_weight = init_weight
         self.delta = delta
         self.epsilon = epsilon
         self.optimized = optimized
         self.constant = constant
+        self.beam_width = beam_width
 
     def get_name(self, base_name):
         discount = "-lambda{}".format(self.discount_factor) if self.discount_factor != ADPSettings.DEFAULT_DISCOUNT_FACTOR else ""
@@ -54,7 +57,8 @@ class ADPSettings:
         epsilon = "-eps{}".format(self.epsilon) if self.epsilon != ADPSettings.DEFAULT_EPSILON else ""
         const = "-c{}".format(self.constant) if self.constant != ADPSettings.DEFAULT_CONSTANT else ""
         opt = "-optimized" if self.optimized != ADPSettings.DEFAULT_OPTIMIZED else ""
-        return "{}{}{}{}{}{}{}".format(base_name, discount, weight, delta, epsilon, const, opt)
+        beam = "-beam{}".format(self.beam_width) if self.beam_width != ADPSettings.DEFAULT_BEAM_WIDTH else ""
+        return "{}{}{}{}{}{}{}{}".format(base_name, discount, weight, delta, epsilon, const, opt, beam)
 
 available_algorithms = [
     "SingleFixed",
@@ -144,27 +148,47 @@ def init_terminal(terminal_type):
         raise RuntimeError("Invalid Terminal type {} supplied".format(terminal_type))
 
 
-def load_events(terminal_type):
+def instance_names(terminal_type) -> List[str]:
+    """
+    :return: names of the problem instances (in the events folder) used for the terminal type
+    """
     if terminal_type in ['1', '2']:
-        return [EvaluatableEvents.load_evaluatable_events("20_12_25_250_{}".format(i)) for i in range(1, 17)]
+        return ["20_12_25_250_{}".format(i) for i in range(1, 17)]
     elif terminal_type == '3':
-        return [EvaluatableEvents.load_evaluatable_events("40_15_250_250_{}".format(i)) for i in range(1, 17)]
+        return ["40_15_250_250_{}".format(i) for i in range(1, 17)]
     elif terminal_type == '4':
-        return [EvaluatableEvents.load_evaluatable_events("40_15_500_250_{}".format(i)) for i in range(1, 17)]
+        return ["40_15_500_250_{}".format(i) for i in range(1, 17)]
     elif terminal_type == '5':
-        return [EvaluatableEvents.load_evaluatable_events("40_15_1000_250_{}".format(i)) for i in range(1, 17)]
+        return ["40_15_1000_250_{}".format(i) for i in range(1, 17)]
     elif terminal_type == '6':
-        return [EvaluatableEvents.load_evaluatable_events("40_15_100_250_{}".format(i)) for i in range(1, 17)]
+        return ["40_15_100_250_{}".format(i) for i in range(1, 17)]
+    else:
+        raise RuntimeError("Invalid Terminal type {} supplied".format(terminal_type))
+
+
+def load_events(terminal_type):
+    return [EvaluatableEvents.load_instance(name) for name in instance_names(terminal_type)]
+
+
+def load_worker_instance(instance_name: str) -> EvaluatableEvents:
+    """
+    Loads a problem instance within a worker process. The jobs only contain the name of the instance, such that the
+    instances are not pickled and sent to the workers. Every job handles another instance, thus the instance is not
+    kept after the job.
+    """
+    return EvaluatableEvents.load_instance(instance_name)
 
 
 def evaluate_adp(args) -> Tuple[List[float], List[float]]:
     """
     Function that evaluates a single event. A tuple is returned containing a list of all obtained values.
     :param alg_name:
-    :param event:
+    :param instance_name: name of the instance, loaded by the worker itself
+    :param seed_sequence: seed of the random generator of the instance, spawned from the seed of the run
     :return:
     """
-    alg_name, event, instance_nr, terminal_type, number_sample_iterations, evaluation_samples, every_th_iteration, use_optimized, adp_settings = args
+    alg_name, instance_name, instance_nr, terminal_type, number_sample_iterations, evaluation_samples, every_th_iteration, use_optimized, adp_settings, seed_sequence = args
+    event = load_worker_instance(instance_name)
     print("{}:{} has been started".format(alg_name, instance_nr))
     initial_terminal = init_terminal(terminal_type)
     file_writer = FileWriter(alg_name, instance_nr, terminal_type, adp_settings)
@@ -209,7 +233,8 @@ def evaluate_adp(args) -> Tuple[List[float], List[float]]:
 
     # noinspection PyUnboundLocalVariable
     adp = ADP(event, initial_terminal, single, epsilon, value_function_approx, number_sample_iterations,
-              discount_factor, True, every_th_iteration, evaluation_samples, problem_instance=instance_nr, use_optimized_outcomes=use_optimized)
+              discount_factor, True, every_th_iteration, evaluation_samples, problem_instance=instance_nr, use_optimized_outcomes=use_optimized,
+              beam_width=adp_settings.beam_width, rng=numpy.random.default_rng(seed_sequence))
 
     iterations, reshuffles, init_values = extract_results(adp)
 
@@ -246,12 +271,16 @@ def convert_result(results, iterations):
 
 
 
-def main(alg_name: str, terminal_type: str, number_sample_iterations: int, evaluation_samples: int, every_th_iteration: int, use_optimized: bool, adp_settings: ADPSettings):
+def main(alg_name: str, terminal_type: str, number_sample_iterations: int, evaluation_samples: int, every_th_iteration: int, use_optimized: bool, adp_settings: ADPSettings, seed: Optional[int] = None):
     # events = [EvaluatableEvents.load_evaluatable_events("20_12_30_250_{}".format(i)) for i in range(1, 17)]
-    events = load_events(terminal_type)
+    names = instance_names(terminal_type)
+    # an independent random stream per instance, such that the results do not depend on which worker runs an instance
+    seed_sequence = numpy.random.SeedSequence(seed)
+    print("Seed: {}".format(seed_sequence.entropy))
+    instance_seeds = seed_sequence.spawn(len(names))
 
     with Pool(number_cores) as pool:
-        job_args = [[alg_name, events[i], i+1, terminal_type, number_sample_iterations, evaluation_samples, every_th_iteration, use_optimized, adp_settings] for i in range(len(events))]
+        job_args = [[alg_name, names[i], i+1, terminal_type, number_sample_iterations, evaluation_samples, every_th_iteration, use_optimized, adp_settings, instance_seeds[i]] for i in range(len(names))]
         # job_args = [[alg_name, events[i], i+1, terminal_type, number_sample_iterations, evaluation_samples, every_th_iteration] for i in [0, 1]]
 
         result = pool.map(evaluate_adp, job_args)
@@ -279,6 +308,7 @@ if __name__ == '__main__':
     parser.add_argument('-a', '--algorithm', required=True, help="The algorithm that needs to be run", choices=available_algorithms)
     parser.add_argument('-t', '--terminal', required=True, action="store", help="Which terminal layout needs to be used. 1=gantry, 2=reachstacker", choices=['1','2','3','4','5','6'])
     parser.add_argument('-o', '--optimized', default=False, action="store_true", help="Whether optimized outcomes needs to be used")
+    parser.add_argument('-b', '--beam', default=ADPSettings.DEFAULT_BEAM_WIDTH, help="Beam width used when determining the outcomes of a batch, by default all outcomes are enumerated")
 
 
     parser.add_argument('-discount', default=ADPSettings.DEFAULT_DISCOUNT_FACTOR)
@@ -286,6 +316,7 @@ if __name__ == '__main__':
     parser.add_argument('-weight', default=ADPSettings.DEFAULT_INIT_WEIGHT)
     parser.add_argument('-epsilon', default=ADPSettings.DEFAULT_EPSILON)
     parser.add_argument('-constant', default=ADPSettings.DEFAULT_CONSTANT)
+    parser.add_argument('-seed', default=None, help="Seed of the random generators, by default a random seed is used (and printed)")
 
 
 
@@ -298,15 +329,17 @@ if __name__ == '__main__':
     evaluation_samples = int(args.e)
     every_th_iteration = int(args.i)
     optimized = args.optimized
+    beam_width = None if args.beam is None else int(args.beam)
 
     discount_factor = float(args.discount)
     init_weight = float(args.weight)
     delta = float(args.delta)
     epsilon = float(args.epsilon)
     constant = float(args.constant)
+    seed = None if args.seed is None else int(args.seed)
 
-    # check if optimized flag is set when running the bigger problems (otherwise they wont terminate)
-    assert optimized or int(terminal_type) <= 2
+    # check if optimized flag or a beam width is set when running the bigger problems (otherwise they wont terminate)
+    assert optimized or beam_width is not None or int(terminal_type) <= 2
 
     adp_settings = ADPSettings(
         optimized=optimized,
@@ -314,8 +347,9 @@ if __name__ == '__main__':
         init_weight=init_weight,
         delta=delta,
         epsilon=epsilon,
-        constant=constant
+        constant=constant,
+        beam_width=beam_width
     )
 
-    main(alg_name, terminal_type, N, evaluation_samples, every_th_iteration, optimized, adp_settings)
+    main(alg_name, terminal_type, N, evaluation_samples, every_th_iteration, optimized, adp_settings, seed)
 
@@ -3,7 +3,7 @@ from multiprocessing import Pool
 
 import numpy
 
-from evaluate_algorithm import load_events, init_terminal, ADPSettings
+from evaluate_algorithm import instance_names, load_worker_instance, init_terminal, ADPSettings
 from main.model.adp.fileWriter import FileWriter
 from main.model.policies.MMAdoptedRule import MMAdoptedRule
 from main.model.policies.MMRule import MMRule
@@ -25,7 +25,8 @@ class heuristicSetting(ADPSettings):
 
 
 def evaluate_policy(args):
-    alg_name, event, instance_nr, terminal_type, evaluation_samples = args
+    alg_name, instance_name, instance_nr, terminal_type, evaluation_samples = args
+    event = load_worker_instance(instance_name)
     initial_terminal = init_terminal(terminal_type)
 
     file_writer = FileWriter(alg_name, instance_nr, terminal_type, heuristicSetting())
@@ -55,10 +56,10 @@ def convert_result(results, iterations):
 
 def main(alg_name: str, terminal_type: str, evaluation_samples: int):
     # events = [EvaluatableEvents.load_evaluatable_events("20_12_30_250_{}".format(i)) for i in range(1, 17)]
-    events = load_events(terminal_type)
+    names = instance_names(terminal_type)
 
     with Pool(number_cores) as pool:
-        job_args = [[alg_name, events[i], i+1, terminal_type, evaluation_samples] for i in range(len(events))]
+        job_args = [[alg_name, names[i], i+1, terminal_type, evaluation_samples] for i in range(len(names))]
         # job_args = [[alg_name, events[i], i+1, terminal_type, number_sample_iterations, evaluation_samples, every_th_iteration] for i in [0, 1]]
 
         result = pool.map(evaluate_policy, job_args)
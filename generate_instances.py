@@ -0,0 +1,28 @@
+import argparse
+import time
+
+import numpy
+
+from main.model.events.evaluatableEvents import EvaluatableEvents
+from main.util import sub_folder
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-p', '--periods', required=True, help="Number of time periods")
+    parser.add_argument('-w', '--dwell', required=True, help="Expected dwell time in periods")
+    parser.add_argument('-n', '--containers', required=True, help="Number of inbound containers")
+    parser.add_argument('-s', '--samples', default=250, help="Number of training and of evaluating samples")
+    parser.add_argument('-i', '--instances', nargs="+", default=[1], help="The numbers of the instances generated")
+    parser.add_argument('-d', '--directory', default=sub_folder("events"), help="Directory the instances are written to")
+    parser.add_argument('--seed', default=None, help="Seed of the random generator, by default unseeded")
+
+    args = parser.parse_args()
+
+    rng = numpy.random.default_rng(None if args.seed is None else int(args.seed))
+    for instance in args.instances:
+        name = "{}_{}_{}_{}_{}".format(args.periods, args.dwell, args.containers, args.samples, instance)
+        start = time.time()
+        EvaluatableEvents.create_packed_instance(name, int(args.periods), float(args.dwell), int(args.containers),
+                                                 int(args.samples), directory=args.directory, rng=rng)
+        print("{}: generated in {:.2f}s".format(name, time.time() - start))
@@ -1,16 +1,23 @@
+from multiprocessing import cpu_count
+
+from definitions import SOLUTION_STORE
 from evaluate_algorithm import init_terminal, load_events
 from main.model.policies.pbfs import PBFS
 from main.model.policies.policy import Policy
+from main.model.util.solutionStore import SolutionStore
 
-events = load_events('1')
-
-t = init_terminal('1')
+if __name__ == '__main__':
+    events = load_events('1')
 
-for i in range(len(events)):
-    index = i+1
-    print("handling {}".format(index))
-    event = events[i]
-    pbfs = PBFS(event, t)
-    mean, std = Policy.evaluate(pbfs, t, event, nr_samples=150)
-    print("{}: mean: {} std: {}".format(i+1, mean, std))
+    t = init_terminal('1')
 
+    # instances solved in an earlier run are read from the store instead of solved again
+    with SolutionStore(SOLUTION_STORE) as store:
+        for i in range(len(events)):
+            index = i+1
+            print("handling {}".format(index))
+            event = events[i]
+            # the realizations of the first batch are solved in parallel
+            pbfs = PBFS(event, t, processes=cpu_count(), store=store)
+            mean, std = Policy.evaluate(pbfs, t, event, nr_samples=150)
+            print("{}: mean: {} std: {}".format(i+1, mean, std))
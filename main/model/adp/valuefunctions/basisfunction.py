@@ -1,9 +1,12 @@
-from typing import Callable, List, Optional
+from typing import Callable, List, Optional, Sequence
 
 import numpy
 
 from main.model.adp.fileWriter import FileWriter
+from main.model.adp.valuefunctions.features.util.incremental import delta_feature, delta_state
+from main.model.adp.valuefunctions.features.util.vectorized import batch_feature
 from main.model.adp.valuefunctions.valueFunctionApproximation import ValueFunctionApproximate
+from main.model.dataclass import StackLocation
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
@@ -16,6 +19,16 @@ class BasisFunction(ValueFunctionApproximate):
         result = numpy.sum(weights.T * self.feature_evaluation(terminal, event, t))
         return result
 
+    def value_approximate_batch(self, n: int, t: int, terminals: Sequence[Terminal], event: Events) -> numpy.ndarray:
+        # a single matrix vector product for all terminals
+        weights = self.get_last_known(self.weights, self.init_weights, n, t)
+        return self.feature_matrix(terminals, event, t) @ weights[:, 0]
+
+    def value_approximate_stored(self, n: int, t: int, parent: Terminal, stack_locations: Sequence[StackLocation],
+                                 terminals: Sequence[Terminal], event: Events) -> numpy.ndarray:
+        weights = self.get_last_known(self.weights, self.init_weights, n, t)
+        return self.feature_matrix_stored(parent, stack_locations, terminals, event, t) @ weights[:, 0]
+
     def on_iteration_done(self, iteration_number: int):
         # add new hash for iteration_number + 1
         self.weights[iteration_number + 1] = {}
@@ -60,6 +73,37 @@ class BasisFunction(ValueFunctionApproximate):
         # Calculates \phi
         return numpy.array([f(state, event, t) for f in self.feature_functions])
 
+    def feature_matrix(self, terminals: Sequence[Terminal], event: Events, t: int) -> numpy.ndarray:
+        """
+        Evaluates phi for several terminals, features with a vectorized implementation (see
+        features.util.vectorized) are evaluated for all terminals at once.
+        :return: matrix with a row per terminal and a column per feature
+        """
+        result = numpy.empty((len(terminals), len(self.feature_functions)))
+        if len(terminals) > 0:
+            for j in range(len(self.feature_functions)):
+                result[:, j] = self.batch_features[j](terminals, event, t)
+        return result
+
+    def feature_matrix_stored(self, parent: Terminal, stack_locations: Sequence[StackLocation],
+                              terminals: Sequence[Terminal], event: Events, t: int) -> numpy.ndarray:
+        """
+        Same as feature_matrix for terminals that each differ from the parent by a single stored container. Features
+        with an incremental implementation (see features.util.incremental) are derived from their value for the parent.
+        :param stack_locations: per terminal, the location at which the container is stored in the parent
+        """
+        result = numpy.empty((len(terminals), len(self.feature_functions)))
+        if len(terminals) > 0:
+            for j in range(len(self.feature_functions)):
+                delta = self.delta_features[j]
+                if delta is None:
+                    result[:, j] = self.batch_features[j](terminals, event, t)
+                else:
+                    parent_state = self.delta_states[j](parent, event, t)
+                    result[:, j] = [delta(parent, parent_state, stack_locations[i], terminals[i], event, t)
+                                    for i in range(len(terminals))]
+        return result
+
     def alpha(self, n) -> float:
         # calculate \alpha_n
         return 1 - (self.delta / n)
@@ -74,6 +118,9 @@ class BasisFunction(ValueFunctionApproximate):
 
         # using dicts
         self.feature_functions = feature_functions
+        self.batch_features = [batch_feature(f) for f in feature_functions]
+        self.delta_features = [delta_feature(f) for f in feature_functions]
+        self.delta_states = [delta_state(f) for f in feature_functions]
         if type(init_weight) is float:
             self.init_weights = numpy.array([[init_weight for i in range(len(feature_functions))]]).T
             # self.weights = {1: numpy.array([init_weight for i in range(len(feature_functions))])}
@@ -1,9 +1,49 @@
 from statistics import mean
+from typing import Sequence, Tuple
 
+import numpy
+
+from main.model.adp.valuefunctions.features.util.incremental import incremental, touched_stacks
+from main.model.adp.valuefunctions.features.util.vectorized import vectorized
+from main.model.dataclass import StackLocation
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
+def _average_stack_height_batch(terminals: Sequence[Terminal], event: Events, current_batch_number: int) \
+        -> numpy.ndarray:
+    # heights of all stacks of all terminals in a single array, the heights of a block are cached on the block
+    heights = numpy.array([height for terminal in terminals for block in terminal.blocks for height in block.heights()])
+    nr_stacks = numpy.array([sum([len(block.stacks) for block in terminal.blocks]) for terminal in terminals])
+    # index of the terminal of each stack
+    owner = numpy.repeat(numpy.arange(len(terminals)), nr_stacks)
+    total = numpy.bincount(owner, weights=heights, minlength=len(terminals))
+    non_empty = numpy.bincount(owner, weights=heights > 0, minlength=len(terminals))
+    return numpy.divide(total, non_empty, out=numpy.zeros(len(terminals)), where=non_empty > 0)
+
+
+def _average_stack_height_state(parent: Terminal, event: Events, current_batch_number: int) -> Tuple[int, int]:
+    """
+    :return: total height and number of non empty stacks of the parent, counted on the cached heights of the blocks
+    """
+    total = 0
+    non_empty = 0
+    for block in parent.blocks:
+        heights = block.heights()
+        total += sum(heights)
+        non_empty += len(heights) - heights.count(0)
+    return total, non_empty
+
+
+def _average_stack_height_delta(parent: Terminal, parent_state: Tuple[int, int], stack_location: StackLocation,
+                                terminal: Terminal, event: Events, current_batch_number: int) -> float:
+    total, non_empty = parent_state
+    old_stack, _ = touched_stacks(parent, stack_location, terminal)
+    return (total + 1) / (non_empty + int(old_stack.height() == 0))
+
+
+@vectorized(_average_stack_height_batch)
+@incremental(_average_stack_height_delta, _average_stack_height_state)
 def average_stack_height(terminal: Terminal, event: Events, current_batch_number: int) -> float:
     """
     Calculates the average stack height of non empty stacks
@@ -1,9 +1,21 @@
+from main.model.adp.valuefunctions.features.util.incremental import incremental, touched_stacks
+from main.model.dataclass import StackLocation
 from main.model.dataclass.block import Block
 from main.model.dataclass.stack import Stack
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
+def _batch_label_difference_delta(parent: Terminal, parent_value: float, stack_location: StackLocation,
+                                  terminal: Terminal, event: Events, current_batch_number: int) -> float:
+    old_stack, new_stack = touched_stacks(parent, stack_location, terminal)
+    if old_stack.height() == 0:
+        return parent_value
+    # only the difference between the previous top container and the stored container is added
+    return parent_value + old_stack.containers[-1][1] - new_stack.containers[-1][1]
+
+
+@incremental(_batch_label_difference_delta)
 def batch_label_difference(terminal: Terminal, event: Events, current_batch_number: int) -> float:
     return sum([block_batch_label_diff(block) for block in terminal.blocks])
 
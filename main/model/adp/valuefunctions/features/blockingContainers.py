@@ -1,7 +1,27 @@
+from typing import Sequence
+
+import numpy
+
+from main.model.adp.valuefunctions.features.util.incremental import incremental, touched_stacks
+from main.model.adp.valuefunctions.features.util.vectorized import vectorized
+from main.model.dataclass import StackLocation
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
+def _blocking_containers_batch(terminals: Sequence[Terminal], event: Events, current_batch_number: int) -> numpy.ndarray:
+    # the lower bound of each stack is cached on the stack, only the sum remains
+    return numpy.fromiter([sum([stack.blocking_lowerbound for block in terminal.blocks for stack in block.stacks])
+                           for terminal in terminals], dtype=float, count=len(terminals))
+
+
+def _blocking_containers_delta(parent: Terminal, parent_value: float, stack_location: StackLocation,
+                               terminal: Terminal, event: Events, current_batch_number: int) -> float:
+    old_stack, new_stack = touched_stacks(parent, stack_location, terminal)
+    return parent_value - old_stack.blocking_lowerbound + new_stack.blocking_lowerbound
+
+
+@vectorized(_blocking_containers_batch)
+@incremental(_blocking_containers_delta)
 def blocking_containers(terminal: Terminal, event: Events, current_batch_number: int) -> float:
     return sum([stack.blocking_lowerbound for block in terminal.blocks for stack in block.stacks])
-
@@ -3,6 +3,7 @@ from typing import Optional, Set, List, Tuple
 from main.model.adp.valuefunctions.features.MMRule import MM_rule
 from main.model.adp.valuefunctions.features.mmAdopted import MM_adopted_rule
 from main.model.adp.valuefunctions.features.util.getAllContainers import get_all_containers
+from main.model.adp.valuefunctions.features.util.rollout import rollout_scores
 from main.model.adp.valuefunctions.features.util.validStacks import get_valid_stacks
 from main.model.dataclass import StackLocation, Container, StackTierLocation
 from main.model.dataclass.terminal import Terminal
@@ -12,14 +13,12 @@ ALPHA = 0.65
 
 
 def composite_adopted_measure(terminal: Terminal, event: Events, current_batch_number: int):
-    mmrule_score = MM_adopted_rule(terminal)
-    crl_score = crl(terminal)
+    mmrule_score, crl_score = rollout_scores(terminal, adopted=True)
     return ALPHA * mmrule_score + (1-ALPHA) * crl_score
 
 
 def composite_measure(terminal: Terminal, event: Events, current_batch_number: int):
-    mmrule_score = MM_rule(terminal)
-    crl_score = crl(terminal)
+    mmrule_score, crl_score = rollout_scores(terminal)
     return ALPHA * mmrule_score + (1-ALPHA) * crl_score
 
 
@@ -58,7 +57,8 @@ def causes_no_additional_reshuffle(terminal: Terminal, container: Container, to_
     # 1. a container departing earlier is present in the stack
     # 2. under the pyramid behind the stack no container is present that departs earlier than the specified container
     #   -> not strict a lowerbound anymore as the earlier container may be extracted from the other side
-    valid_stacks = get_valid_stacks(terminal, to_exclude)
+    # equivalent stacks give the same answer, thus one per class suffices
+    valid_stacks = get_valid_stacks(terminal, to_exclude, unique=True)
     for stack, location in valid_stacks:
         if stack.height() == 0 or stack.min_container()[1] >= container[1]:
             return True
@@ -1,10 +1,17 @@
+import numpy
+
+from main.model.adp.valuefunctions.features.util.vectorized import vectorized
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
+@vectorized(lambda terminals, event, current_batch_number: numpy.ones(len(terminals)))
 def constant(terminal: Terminal, event: Events, current_batch_number: int):
     return 1
 
 
 def constant_variable(value):
-    return lambda terminal, event, current_batch_number: value
+    @vectorized(lambda terminals, event, current_batch_number: numpy.full(len(terminals), value, dtype=float))
+    def constant_value(terminal: Terminal, event: Events, current_batch_number: int):
+        return value
+    return constant_value
@@ -1,34 +1,27 @@
-from typing import List
-
 from main.model.batch import RealizedBatch
-from main.model.dataclass import Container
 from main.model.dataclass.block import Block
 from main.model.dataclass.stack import Stack
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
+from main.model.events.futureArrivals import successor
 from main.model.events.realizedEvents import RealizedEvents
 
 
 def future_blocking_containers(terminal: Terminal, event: Events, current_batch_number: int):
-    stacks = [stack for block in terminal.blocks for stack in block.stacks if stack.height()>0]
-    inbound_batches = [(t, event.batch(t).containers) for t in range(len(event.batches)) if
-                       t > current_batch_number and event.batch(t).inbound]
+    """
+    Counts the containers arriving in a future inbound batch t for which a remaining container in the terminal has a
+    batch label in (t, label of the arriving container].
+    """
+    labels = sorted([container[1] for block in terminal.blocks for stack in block.stacks
+                     for container in stack.containers])
+    arrivals = event.future_arrivals(current_batch_number)
     total = 0
-    for t, containers in inbound_batches:
-        for container in containers:
-            if container_is_blocking_future(container, t, stacks):
-                total += 1
+    for j in range(len(arrivals)):
+        # an arriving container is blocking if the lowest remaining label above t does not exceed its label
+        total += arrivals.count_at_least(j, successor(labels, arrivals.times[j]))
     return total
 
 
-def container_is_blocking_future(container: Container, t: int, stacks: List[Stack]):
-    for stack in stacks:
-        for remaining_container in stack.containers:
-            if remaining_container[1] > t and remaining_container[1] <= container[1]:
-                return True
-    return False
-
-
 # e = RealizedEvents((RealizedBatch(True, ((10,10,-1),(11,11,-1))),))
 #
 # t = Terminal((
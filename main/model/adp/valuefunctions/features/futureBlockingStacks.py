@@ -1,35 +1,26 @@
-from typing import Tuple
-
-from main.model.dataclass import Container
 from main.model.dataclass.block import Block
 from main.model.dataclass.stack import Stack
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
+from main.model.events.futureArrivals import FutureArrivals
 
 
 def future_blocking_stacks(terminal: Terminal, event: Events, current_batch_number: int):
-    result = 0
-    stacks = [stack for block in terminal.blocks for stack in block.stacks]
-    inbound_batches = [(t, event.batch(t).containers) for t in range(len(event.batches)) if t > current_batch_number and event.batch(t).inbound]
-    for stack in stacks:
-        if stack_is_blocking_in_future(stack, inbound_batches):
-            result += 1
-
-    return result
-
-
-
-def stack_is_blocking_in_future(stack: Stack, inbound_batches: Tuple[int, Tuple[Container, ...]]):
-    for t, inbound_containers in inbound_batches:
-        remaining_containers = [container for container in stack.containers if container[1] > t]
-        if len(remaining_containers) == 0:
-            return False
-        for inbound_container in inbound_containers:
-            for remaining_container in remaining_containers:
-                if remaining_container[1] >= inbound_container[1]:
-                    return True
-
-    return False
+    """
+    Counts the stacks on which a container arrives in a future inbound batch t that departs no later than a container
+    of the stack that is still present at t.
+    """
+    arrivals = event.future_arrivals(current_batch_number)
+    return sum([stack_is_blocking_in_future(stack, arrivals) for block in terminal.blocks for stack in block.stacks])
+
+
+def stack_is_blocking_in_future(stack: Stack, arrivals: FutureArrivals) -> bool:
+    if stack.height() == 0:
+        return False
+    # containers are present at time t as long as t is below the highest label of the stack, a container arriving
+    # before then is blocked if its label does not exceed that highest label
+    max_label = max([container[1] for container in stack.containers])
+    return arrivals.min_label_before(max_label) <= max_label
 
 # inbound_batches = (
 #     (10, ((1,1,-1), (2,2,-1))),
@@ -1,3 +1,5 @@
+from main.model.adp.valuefunctions.features.util.incremental import incremental, touched_blocks
+from main.model.dataclass import StackLocation
 from main.model.dataclass.block import Block
 from main.model.dataclass.outcomes import _reachable
 from main.model.dataclass.stack import Stack
@@ -5,20 +7,30 @@ from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
-def non_reachable_containers(terminal: Terminal, event: Events, current_batch_number: int):
+def block_non_reachable_containers(block: Block) -> int:
     total = 0
-    for block in terminal.blocks:
-        for stack_index in range(len(block.stacks)):
-            if _reachable(block, stack_index):
-                # if reachable, the topmost container can be retrieved
-                total += max(0, block.stacks[stack_index].height()-1)
-            else:
-                # stack is not reachable, thus entire height is added
-                total += block.stacks[stack_index].height()
-
+    for stack_index in range(len(block.stacks)):
+        if _reachable(block, stack_index):
+            # if reachable, the topmost container can be retrieved
+            total += max(0, block.stacks[stack_index].height()-1)
+        else:
+            # stack is not reachable, thus entire height is added
+            total += block.stacks[stack_index].height()
     return total
 
 
+def _non_reachable_containers_delta(parent: Terminal, parent_value: float, stack_location: StackLocation,
+                                    terminal: Terminal, event: Events, current_batch_number: int) -> float:
+    # storing a container only changes the reachability of the stacks in the same block
+    old_block, new_block = touched_blocks(parent, stack_location, terminal)
+    return parent_value - block_non_reachable_containers(old_block) + block_non_reachable_containers(new_block)
+
+
+@incremental(_non_reachable_containers_delta)
+def non_reachable_containers(terminal: Terminal, event: Events, current_batch_number: int):
+    return sum([block_non_reachable_containers(block) for block in terminal.blocks])
+
+
 
 # t = Terminal((
 #             Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True),
@@ -1,3 +1,5 @@
+from main.model.adp.valuefunctions.features.util.incremental import incremental, touched_blocks
+from main.model.dataclass import StackLocation
 from main.model.dataclass.block import Block
 from main.model.dataclass.outcomes import _reachable
 from main.model.dataclass.stack import Stack
@@ -5,8 +7,20 @@ from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
+def block_non_reachable_stacks(block: Block) -> int:
+    return sum([not _reachable(block, stack_index) for stack_index in range(len(block.stacks))])
+
+
+def _non_reachable_stacks_delta(parent: Terminal, parent_value: float, stack_location: StackLocation,
+                                terminal: Terminal, event: Events, current_batch_number: int) -> float:
+    # storing a container only changes the reachability of the stacks in the same block
+    old_block, new_block = touched_blocks(parent, stack_location, terminal)
+    return parent_value - block_non_reachable_stacks(old_block) + block_non_reachable_stacks(new_block)
+
+
+@incremental(_non_reachable_stacks_delta)
 def non_reachable_stacks(terminal: Terminal, event: Events, current_batch_number: int):
-    return sum([not _reachable(block, stack_index) for block in terminal.blocks for stack_index in range(len(block.stacks))])
+    return sum([block_non_reachable_stacks(block) for block in terminal.blocks])
 
 
 # t = Terminal((
@@ -15,4 +29,4 @@ def non_reachable_stacks(terminal: Terminal, event: Events, current_batch_number
 #             Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), False)
 #         ), 4)
 # print(non_reachable_stacks(t, None, 0))
-# print(non_reachable_stacks(t.store_container((2,2), (1,1,-1)), None, 0))
\ No newline at end of file
+# print(non_reachable_stacks(t.store_container((2,2), (1,1,-1)), None, 0))
@@ -1,7 +1,16 @@
+from main.model.adp.valuefunctions.features.util.incremental import incremental, touched_stacks
+from main.model.dataclass import StackLocation
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
 
+def _unordered_stacks_delta(parent: Terminal, parent_value: float, stack_location: StackLocation, terminal: Terminal,
+                            event: Events, current_batch_number: int) -> float:
+    old_stack, new_stack = touched_stacks(parent, stack_location, terminal)
+    return parent_value - (old_stack.blocking_lowerbound > 0) + (new_stack.blocking_lowerbound > 0)
+
+
+@incremental(_unordered_stacks_delta)
 def unordered_stacks(terminal: Terminal, event: Events, current_batch_number: int) -> float:
     """
     Counts the number of stacks which are not strictly ordered. This means that in retrieving the containers of this
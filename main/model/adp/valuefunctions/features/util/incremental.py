@@ -0,0 +1,60 @@
+from typing import Any, Callable, Optional, Tuple
+
+from main.model.dataclass import StackLocation
+from main.model.dataclass.block import Block
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+
+# delta(parent, parent_state, stack_location, terminal, event, current_batch_number) -> value of the feature for the
+# terminal, with terminal = parent.store_container(stack_location, container) and parent_state the state of the parent
+DeltaFeature = Callable[[Terminal, Any, StackLocation, Terminal, Events, int], float]
+# parent_state(parent, event, current_batch_number) -> state of the parent used by the delta
+ParentState = Callable[[Terminal, Events, int], Any]
+
+
+def incremental(delta_feature: DeltaFeature, parent_state: Optional[ParentState] = None):
+    """
+    Decorator with which a feature function opts in to an incremental implementation, used by
+    BasisFunction.feature_matrix_stored to evaluate the feature for terminals that differ from a parent terminal by a
+    single stored container. Only the touched block or stack has to be considered. The decorated function is unchanged
+    when called on a single terminal.
+    :param delta_feature: derives the value of the feature from the state of the parent, must agree with the feature
+    function
+    :param parent_state: computes the state of the parent passed to the delta, once for all terminals derived from the
+    parent. By default the state is the value of the feature for the parent.
+    """
+    def decorator(feature):
+        feature.delta = delta_feature
+        feature.delta_state = feature if parent_state is None else parent_state
+        return feature
+    return decorator
+
+
+def delta_feature(feature) -> Optional[DeltaFeature]:
+    """
+    :return: incremental implementation of the feature, None if it has none
+    """
+    return getattr(feature, "delta", None)
+
+
+def delta_state(feature) -> ParentState:
+    """
+    :return: function computing the parent state passed to the incremental implementation of the feature
+    """
+    return getattr(feature, "delta_state", feature)
+
+
+def touched_blocks(parent: Terminal, stack_location: StackLocation, terminal: Terminal) -> Tuple[Block, Block]:
+    """
+    :return: the block in which the container is stored, before and after storing it
+    """
+    return parent.blocks[stack_location[0]], terminal.blocks[stack_location[0]]
+
+
+def touched_stacks(parent: Terminal, stack_location: StackLocation, terminal: Terminal) -> Tuple[Stack, Stack]:
+    """
+    :return: the stack in which the container is stored, before and after storing it
+    """
+    block_index, stack_index = stack_location
+    return parent.blocks[block_index].stacks[stack_index], terminal.blocks[block_index].stacks[stack_index]
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import heapq
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from main.model.dataclass import Container, StackLocation, StackTierLocation
+from main.model.dataclass.outcomes import valid_height_stacks, _reachability
+from main.model.dataclass.terminal import Terminal
+
+# number of layouts for which the rollout scores are kept
+CACHE_SIZE = 2 ** 16
+
+# (max height, per block (two way, per stack the containers from bottom to top))
+Layout = Tuple[int, Tuple[Tuple[bool, Tuple[Tuple[Container, ...], ...]], ...]]
+
+
+def terminal_layout(terminal: Terminal) -> Layout:
+    return (terminal.max_height,
+            tuple([(block.two_way, tuple([stack.containers for stack in block.stacks])) for block in terminal.blocks]))
+
+
+class Rollout:
+    """
+    Mutable simulation of the retrieval of all containers of a terminal, used by the MM rule and crl features. The
+    simulation follows MM_rule, MM_adopted_rule and crl move for move, but works in place on lists of containers per
+    stack instead of building a new Terminal for every move. All moves are recorded in an undo log, such that several
+    rollouts can start from the same layout.
+
+    Ties are broken exactly as in the simulation: the retrieval order by the initial position of the containers, the
+    store rules by the container ids. The scores thus depend on the container ids and not only on the abstraction of
+    the terminal.
+    """
+    __slots__ = ['max_height', 'two_way', 'stacks', 'locations', 'positions', 'undo_log']
+
+    def __init__(self, layout: Layout):
+        self.max_height, blocks = layout
+        self.two_way = [two_way for two_way, _ in blocks]
+        # per block, per stack, the containers from bottom to top
+        self.stacks: List[List[List[Container]]] = []
+        # container id -> (block, stack, tier)
+        self.locations: Dict[int, StackTierLocation] = {}
+        # container id -> index in the initial order of the blocks, stacks and tiers, see get_all_containers
+        self.positions: Dict[int, int] = {}
+        for block_index in range(len(blocks)):
+            block_stacks = []
+            for stack_index in range(len(blocks[block_index][1])):
+                containers = list(blocks[block_index][1][stack_index])
+                for tier_index in range(len(containers)):
+                    self.locations[containers[tier_index][0]] = (block_index, stack_index, tier_index)
+                    self.positions[containers[tier_index][0]] = len(self.positions)
+                block_stacks.append(containers)
+            self.stacks.append(block_stacks)
+        # (block, stack, retrieved container or None for a store)
+        self.undo_log: List[Tuple[int, int, Optional[Container]]] = []
+
+    @classmethod
+    def of(cls, terminal: Terminal) -> Rollout:
+        return cls(terminal_layout(terminal))
+
+    ########################################################################################
+    # In place operations (undo-log)
+    ########################################################################################
+
+    def store(self, stack_location: StackLocation, container: Container):
+        stack = self.stacks[stack_location[0]][stack_location[1]]
+        self.locations[container[0]] = (stack_location[0], stack_location[1], len(stack))
+        stack.append(container)
+        self.undo_log.append((stack_location[0], stack_location[1], None))
+
+    def retrieve(self, stack_location: StackLocation) -> Container:
+        container = self.stacks[stack_location[0]][stack_location[1]].pop()
+        self.undo_log.append((stack_location[0], stack_location[1], container))
+        return container
+
+    def mark(self) -> int:
+        return len(self.undo_log)
+
+    def undo(self, mark: int):
+        """
+        Reverts all operations performed after the mark was taken.
+        """
+        while len(self.undo_log) > mark:
+            block_index, stack_index, container = self.undo_log.pop()
+            stack = self.stacks[block_index][stack_index]
+            if container is None:
+                stack.pop()
+            else:
+                self.locations[container[0]] = (block_index, stack_index, len(stack))
+                stack.append(container)
+
+    ########################################################################################
+    # Rollouts
+    ########################################################################################
+
+    def mm_rule(self, adopted: bool = False) -> int:
+        """
+        Number of reshuffles needed when the containers are retrieved in order and blocking containers are reshuffled
+        according to MM_store_container (or MM_adopted_store_container), see MM_rule.
+        """
+        total = 0
+        retrieval_order = self._retrieval_order()
+        while len(retrieval_order) > 0:
+            target_location = self.locations[heapq.heappop(retrieval_order)[3]]
+            blocking_containers = self.blocking_containers(target_location)
+            total += len(blocking_containers)
+            for blocking_container in blocking_containers:
+                self.retrieve(self.locations[blocking_container[0]][:2])
+                self.store(self._mm_store_location(blocking_container, target_location, adopted), blocking_container)
+            self.retrieve(target_location[:2])
+        return total
+
+    def crl(self) -> int:
+        """
+        Number of reshuffles needed when the containers are retrieved in order, a blocking container costs an
+        additional reshuffle when there is no stack it can be placed on without blocking, see crl.
+        """
+        total = 0
+        removed = set()
+        retrieval_order = self._retrieval_order()
+        while len(retrieval_order) > 0:
+            container_id = heapq.heappop(retrieval_order)[3]
+            if container_id in removed:
+                continue
+            target_location = self.locations[container_id]
+            blocking_containers = self.blocking_containers(target_location)
+            total += len(blocking_containers)
+            for blocking_container in blocking_containers:
+                self.retrieve(self.locations[blocking_container[0]][:2])
+                removed.add(blocking_container[0])
+                total += int(not self._fits_without_reshuffle(blocking_container, target_location))
+            self.retrieve(target_location[:2])
+            removed.add(container_id)
+        return total
+
+    def _retrieval_order(self) -> List[Tuple[int, int, int, int]]:
+        # (batch label, order label, initial position, container id), ties are broken as in a stable sort
+        result = [(container[1], container[2], self.positions[container[0]], container[0])
+                  for block_stacks in self.stacks for stack in block_stacks for container in stack]
+        heapq.heapify(result)
+        return result
+
+    ########################################################################################
+    # Same as Block.blocking_containers, outcomes.valid_block_stacks and the MM store rules, on the container lists
+    ########################################################################################
+
+    def blocking_containers(self, stack_tier_location: StackTierLocation) -> List[Container]:
+        block_index, stack_index, tier_index = stack_tier_location
+        stacks = self.stacks[block_index]
+        neighbour_above = []
+        for neighbour_index in range(stack_index):
+            allowed_tier = tier_index - (stack_index - neighbour_index)
+            neighbour_above.extend(reversed(stacks[neighbour_index][allowed_tier + 1:]))
+
+        if self.two_way[block_index] and len(neighbour_above) > 0:
+            other_way = []
+            for neighbour_index in range(len(stacks) - 1, stack_index, -1):
+                allowed_tier = tier_index - (neighbour_index - stack_index)
+                other_way.extend(reversed(stacks[neighbour_index][allowed_tier + 1:]))
+
+            if len(other_way) < len(neighbour_above):
+                other_way.extend(reversed(stacks[stack_index][tier_index + 1:]))
+                return other_way
+
+        neighbour_above.extend(reversed(stacks[stack_index][tier_index + 1:]))
+        return neighbour_above
+
+    def _heights(self, block_index: int) -> Tuple[int, ...]:
+        return tuple([len(stack) for stack in self.stacks[block_index]])
+
+    def _valid_locations(self, target_location: StackTierLocation) -> List[StackLocation]:
+        result = []
+        for block_index in range(len(self.stacks)):
+            target_stack_tier = target_location[1:] if block_index == target_location[0] else None
+            for stack_index in valid_height_stacks(self._heights(block_index), self.two_way[block_index],
+                                                   self.max_height, target_stack_tier):
+                result.append((block_index, stack_index))
+        return result
+
+    def _mm_store_location(self, container: Container, target_location: StackTierLocation, adopted: bool) \
+            -> StackLocation:
+        valid_locations = self._valid_locations(target_location)
+        # try to pick a stack that cause no new reshuffles, disregarding empty stacks
+        no_reshuffle_stacks = []
+        for location in valid_locations:
+            stack = self.stacks[location[0]][location[1]]
+            if len(stack) > 0:
+                min_container = _min_container(stack)
+                if min_container[1] > container[1] and not (adopted and self._potential_blocking(location, container)):
+                    no_reshuffle_stacks.append((min_container, location))
+        if len(no_reshuffle_stacks) > 0:
+            return min(no_reshuffle_stacks)[1]
+
+        # check if empty stacks are available
+        for location in valid_locations:
+            if len(self.stacks[location[0]][location[1]]) == 0:
+                return location
+
+        # find least harmful stack by selecting the stack that has the latest first departing container
+        least_harmful = [(_min_container(self.stacks[location[0]][location[1]]), location)
+                         for location in valid_locations]
+        least_harmful.sort(reverse=True)
+        return least_harmful[0][1]
+
+    def _potential_blocking(self, stack_location: StackLocation, current_container: Container) -> bool:
+        # see mmAdopted.potential_blocking
+        block_index, current_stack_index = stack_location
+        stacks = self.stacks[block_index]
+        label = current_container[1]
+        target_height = len(stacks[current_stack_index])
+        for container in stacks[current_stack_index]:
+            if container[1] <= label:
+                return True
+
+        _, reachable_left, reachable_right = _reachability(self._heights(block_index), self.two_way[block_index])
+        if reachable_left[current_stack_index]:
+            for i in range(current_stack_index, len(stacks)):
+                for container in stacks[i][:target_height + i - current_stack_index]:
+                    if container[1] <= label:
+                        return True
+
+        if reachable_right[current_stack_index]:
+            for i in range(current_stack_index):
+                for container in stacks[i][:target_height + current_stack_index - i]:
+                    if container[1] <= label:
+                        return True
+        return False
+
+    def _fits_without_reshuffle(self, container: Container, target_location: StackTierLocation) -> bool:
+        # see compositeMeasure.causes_no_additional_reshuffle
+        for block_index, stack_index in self._valid_locations(target_location):
+            stack = self.stacks[block_index][stack_index]
+            if len(stack) == 0 or min([c[1] for c in stack]) >= container[1]:
+                return True
+        return False
+
+
+def _min_container(containers: List[Container]) -> Container:
+    # first departing container, the lowest one on ties (see StackStatistics)
+    return min(containers, key=lambda c: (c[1], c[2]))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _layout_rollout_scores(layout: Layout, adopted: bool) -> Tuple[int, int]:
+    rollout = Rollout(layout)
+    mark = rollout.mark()
+    mm_score = rollout.mm_rule(adopted)
+    rollout.undo(mark)
+    return mm_score, rollout.crl()
+
+
+def rollout_scores(terminal: Terminal, adopted: bool = False) -> Tuple[int, int]:
+    """
+    :param adopted: use the store rule of MM_adopted_rule instead of the one of MM_rule
+    :return: the MM rule and crl scores of the terminal, cached per layout including the container ids. Terminals with
+    equal abstractions can have different scores, as ties are broken by the container ids.
+    """
+    return _layout_rollout_scores(terminal_layout(terminal), adopted)
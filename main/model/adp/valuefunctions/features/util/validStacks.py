@@ -1,18 +1,24 @@
 from typing import Optional, List, Tuple
 
 from main.model.dataclass import StackTierLocation, StackLocation
-from main.model.dataclass.outcomes import valid_store_location
+from main.model.dataclass.outcomes import valid_block_stacks, unique_store_locations
 from main.model.dataclass.stack import Stack
 from main.model.dataclass.terminal import Terminal
 
 
-def get_valid_stacks(terminal: Terminal, to_exclude: Optional[StackTierLocation]) -> List[Tuple[Stack, StackLocation]]:
+def get_valid_stacks(terminal: Terminal, to_exclude: Optional[StackTierLocation], unique: bool = False) \
+        -> List[Tuple[Stack, StackLocation]]:
+    """
+    :param unique: only return one stack per equivalence class (see outcomes.unique_store_locations)
+    """
+    if unique:
+        return [(terminal.blocks[location[0]].stacks[location[1]], location)
+                for location in unique_store_locations(terminal, to_exclude)]
+
     available_stacks = []
     for block_index in range(len(terminal.blocks)):
         block = terminal.blocks[block_index]
-        for stack_index in range(len(block.stacks)):
-            stack_location = (block_index, stack_index)
-            if valid_store_location(terminal, stack_location, to_exclude):
-                stack = block.stacks[stack_index]
-                available_stacks.append((stack, (block_index, stack_index)))
+        for stack_index in valid_block_stacks(terminal, block_index, to_exclude):
+            stack = block.stacks[stack_index]
+            available_stacks.append((stack, (block_index, stack_index)))
     return available_stacks
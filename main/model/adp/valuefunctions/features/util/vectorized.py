@@ -0,0 +1,34 @@
+from typing import Callable, Sequence
+
+import numpy
+
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+
+# feature(terminals, event, current_batch_number) -> one value per terminal
+BatchFeature = Callable[[Sequence[Terminal], Events, int], numpy.ndarray]
+
+
+def vectorized(batch_feature: BatchFeature):
+    """
+    Decorator with which a feature function opts in to a vectorized implementation, used by
+    BasisFunction.feature_matrix to evaluate the feature for all candidate terminals at once. The decorated function is
+    unchanged when called on a single terminal.
+    :param batch_feature: evaluates the feature for a sequence of terminals, must agree with the feature function
+    """
+    def decorator(feature):
+        feature.batch = batch_feature
+        return feature
+    return decorator
+
+
+def batch_feature(feature) -> BatchFeature:
+    """
+    :return: vectorized implementation of the feature, evaluating it terminal by terminal if it has none
+    """
+    batch = getattr(feature, "batch", None)
+    if batch is not None:
+        return batch
+    return lambda terminals, event, current_batch_number: \
+        numpy.fromiter([feature(terminal, event, current_batch_number) for terminal in terminals], dtype=float,
+                       count=len(terminals))
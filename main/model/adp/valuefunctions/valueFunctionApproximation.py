@@ -1,3 +1,8 @@
+from typing import Sequence
+
+import numpy
+
+from main.model.dataclass import StackLocation
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 
@@ -14,6 +19,26 @@ class ValueFunctionApproximate:
         """
         raise NotImplementedError("Not Implemented")
 
+    def value_approximate_batch(self, iteration_number: int, t: int, terminals: Sequence[Terminal], event: Events) \
+            -> numpy.ndarray:
+        """
+        Approximate values of several terminal layouts at time t (in iteration n), e.g. all candidate outcomes of a
+        decision. Evaluates the terminals one by one unless overridden.
+        :return: array with the value of each terminal, in the order of the terminals
+        """
+        return numpy.fromiter([self.value_approximate(iteration_number, t, terminal, event) for terminal in terminals],
+                              dtype=float, count=len(terminals))
+
+    def value_approximate_stored(self, iteration_number: int, t: int, parent: Terminal,
+                                 stack_locations: Sequence[StackLocation], terminals: Sequence[Terminal],
+                                 event: Events) -> numpy.ndarray:
+        """
+        Approximate values of terminals that each differ from the parent by a single stored container, e.g. the
+        candidate locations of a container. Equal to value_approximate_batch unless overridden.
+        :param stack_locations: per terminal, the location at which the container is stored in the parent
+        """
+        return self.value_approximate_batch(iteration_number, t, terminals, event)
+
     def on_iteration_done(self, iteration_number: int):
         raise NotImplementedError("Not Implemented")
 
@@ -1,5 +1,5 @@
 from itertools import permutations
-from typing import Tuple
+from typing import Tuple, List
 
 from main.model.batch.realizedBatch import RealizedBatch
 from main.model.dataclass import Container
@@ -10,3 +10,28 @@ def unique_permutations(inbound: bool, containers: Tuple[Container, ...]):
     # return [x for x in set(permutations(self.containers))]
     # return [x for x in permutations(self.containers)]
     return [RealizedBatch(inbound, x) for x in permutations(containers)]
+
+
+def weighted_permutations(inbound: bool, containers: Tuple[Container, ...], terminal) \
+        -> Tuple[List[Tuple[RealizedBatch, object, int]], int]:
+    """
+    Groups all orderings of a batch by the subproblem they yield, such that each distinct subproblem is solved only
+    once. Two orderings yield the same subproblem when the abstraction of the terminal after revealing the order is the
+    same (inbound batches do not reveal anything) and the containers are handled in the same sequence of labels.
+    :param inbound: whether the batch is inbound
+    :param containers: containers of the batch
+    :param terminal: terminal in which the batch is handled
+    :return: list of (representative realization, terminal after revealing its order, number of orderings in the
+    group), in order of the first ordering of each group, and the total number of orderings
+    """
+    groups = {}
+    total = 0
+    for realized_batch in unique_permutations(inbound, containers):
+        total += 1
+        revealed = terminal if inbound else terminal.reveal_order(realized_batch.containers)
+        key = (revealed.abstract(), tuple([container[1:] for container in realized_batch.containers]))
+        if key in groups:
+            groups[key][2] += 1
+        else:
+            groups[key] = [realized_batch, revealed, 1]
+    return [(realized_batch, revealed, weight) for realized_batch, revealed, weight in groups.values()], total
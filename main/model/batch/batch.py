@@ -1,6 +1,8 @@
 import random
 from itertools import permutations
-from typing import Tuple
+from typing import Tuple, Optional
+
+import numpy
 
 from main.model.batch import unique_permutations
 from main.model.batch.baseBatch import BaseBatch
@@ -22,8 +24,13 @@ class Batch(BaseBatch):
     def is_empty(self):
         return len(self.containers) == 0
 
-    def sample(self) -> RealizedBatch:
-        return RealizedBatch(self.inbound, tuple(random.sample(self.containers, self.length())))
+    def sample(self, rng: Optional[numpy.random.Generator] = None) -> RealizedBatch:
+        """
+        :param rng: random generator used to order the containers, the global random module if not given
+        """
+        if rng is None:
+            return RealizedBatch(self.inbound, tuple(random.sample(self.containers, self.length())))
+        return RealizedBatch(self.inbound, tuple([self.containers[i] for i in rng.permutation(self.length())]))
 
     def __repr__(self):
         return "{{ {} }}{}".format(", ".join([str(c) for c in self.containers]), self.bound_label())
@@ -0,0 +1,109 @@
+import math
+from typing import Tuple, Set, Optional, Callable, List, Dict
+
+from main.model.adp.valuefunctions.features.blockingContainers import blocking_containers
+from main.model.batch.realizedBatch import RealizedBatch
+from main.model.dataclass.outcomes import terminal_unique_outcomes, store_locations, handle_outbound_container
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+from main.model.noSolutionError import NoSolutionError
+
+# score(terminal, event, t), lower is better. Same signature as the feature functions and the PBFS lower bounds.
+ScoreFunction = Callable[[Terminal, Optional[Events], int], float]
+
+
+def terminal_beam_outcomes(terminal: Terminal,
+                           batch: RealizedBatch,
+                           beam_width: Optional[int],
+                           score_function: ScoreFunction = blocking_containers,
+                           event: Optional[Events] = None,
+                           t: int = 0) -> Set[Tuple[Terminal, int]]:
+    """
+    Beam search variant of terminal_unique_outcomes. After every move only the beam_width partial layouts with the
+    lowest reshuffles plus score are kept, which bounds the time and memory of handling a batch on large terminals at
+    the cost of possibly missing outcomes.
+    :param terminal: terminal before the batch is handled
+    :param batch: realized batch
+    :param beam_width: number of partial layouts kept per move, None enumerates all outcomes
+    :param score_function: score of a partial layout, added to the number of reshuffles
+    :param event: events, passed on to the score function
+    :param t: batch number, passed on to the score function
+    :return: unique outcomes and their number of reshuffles
+    """
+    if beam_width is None:
+        return terminal_unique_outcomes(terminal, batch)
+    if beam_width < 1:
+        raise ValueError("beam width must be at least 1, got {}".format(beam_width))
+    if batch.length() == 0:
+        return {(terminal, 0)}
+    if batch.inbound:
+        return _beam_inbound_outcomes(terminal, batch, beam_width, score_function, event, t)
+    else:
+        return _beam_outbound_outcomes(terminal.reveal_order(batch.containers), batch, beam_width, score_function,
+                                       event, t)
+
+
+def _beam_inbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch, beam_width: int,
+                           score_function: ScoreFunction, event: Optional[Events], t: int) \
+        -> Set[Tuple[Terminal, int]]:
+    beam = [initial_terminal]
+    for container in batch.containers:
+        # unique children of the complete beam
+        children: Dict[Terminal, Terminal] = {}
+        for terminal in beam:
+            for new_term in store_locations(terminal, container, None):
+                children.setdefault(new_term.abstract(), new_term)
+        beam = _truncate(list(children.values()), beam_width, lambda node: score_function(node, event, t))
+        if len(beam) == 0:
+            raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}"
+                                  .format(batch, initial_terminal))
+    return {(terminal, 0) for terminal in beam}
+
+
+def _beam_outbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch, beam_width: int,
+                            score_function: ScoreFunction, event: Optional[Events], t: int) \
+        -> Set[Tuple[Terminal, int]]:
+    # (terminal, number of handled containers, reshuffles)
+    beam: List[Tuple[Terminal, int, int]] = [(initial_terminal, 0, 0)]
+    result: Dict[Terminal, Tuple[Terminal, int]] = {}
+    min_reshuffles = math.inf
+    while len(beam) > 0:
+        # unique children of the complete beam, keeping the path with the fewest reshuffles
+        children: Dict[Terminal, Tuple[Terminal, int, int]] = {}
+        for terminal, i, reshuffles in beam:
+            handling_outcomes, is_reshuffle = handle_outbound_container(terminal, batch.containers[i])
+            new_i = i + int(not is_reshuffle)
+            new_reshuffles = reshuffles + int(is_reshuffle)
+            for new_term in handling_outcomes:
+                key = new_term.abstract()
+                if key not in children or new_reshuffles < children[key][2]:
+                    children[key] = (new_term, new_i, new_reshuffles)
+
+        beam = []
+        for key, (new_term, new_i, new_reshuffles) in children.items():
+            if new_reshuffles > min_reshuffles:
+                continue
+            if new_i == batch.length():
+                if new_reshuffles < min_reshuffles:
+                    min_reshuffles = new_reshuffles
+                    result = {}
+                result[key] = (new_term, new_reshuffles)
+            else:
+                beam.append((new_term, new_i, new_reshuffles))
+
+        beam = _truncate(beam, beam_width, lambda node: node[2] + score_function(node[0], event, t))
+
+    if len(result) == 0:
+        raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}"
+                              .format(batch, initial_terminal))
+    return {outcome for outcome in result.values() if outcome[1] == min_reshuffles}
+
+
+def _truncate(nodes: List, beam_width: int, score: Callable) -> List:
+    """
+    :return: the beam_width nodes with the lowest score, ties are kept in their original order
+    """
+    if len(nodes) <= beam_width:
+        return nodes
+    scored = sorted([(score(nodes[index]), index) for index in range(len(nodes))])
+    return [nodes[index] for _, index in scored[:beam_width]]
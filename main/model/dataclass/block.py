@@ -1,45 +1,76 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 from main.model.dataclass import tuple_short_replace, Container, StackTierLocation, StackLocation
 from main.model.dataclass.stack import Stack
+from main.model.dataclass.zobrist import block_hashes, slot_key, combine_block
 
 
 @dataclass(order=True)
 class Block:
-    __slots__ = ['two_way', 'stacks']
+    __slots__ = ['two_way', 'stacks', 'zobrist', 'zobrist_mirror', 'is_abstract', '_abstract', '_heights']
     two_way: bool
     stacks: Tuple[Stack, ...]
 
-    def __init__(self, stacks: Tuple[Stack, ...], two_way: bool):
+    def __init__(self, stacks: Tuple[Stack, ...], two_way: bool, zobrist: Optional[Tuple[int, int]] = None):
         self.stacks = stacks
         self.two_way = two_way
+        # Zobrist hashes of the stacks read from left to right and from right to left, can be supplied when they are
+        # derived incrementally
+        self.zobrist, self.zobrist_mirror = block_hashes(stacks) if zobrist is None else zobrist
+        # the abstraction is computed once on first use, an abstract block is its own abstraction
+        self.is_abstract = False
+        self._abstract: Optional[Block] = None
+        self._heights: Optional[Tuple[int, ...]] = None
 
     @classmethod
     def empty_single_stack(cls) -> Block:
         return cls((Stack.empty(),), False)
 
     def abstract(self) -> Block:
+        if self.is_abstract:
+            return self
+        if self._abstract is None:
+            self._abstract = self._calc_abstract()
+            self._abstract.is_abstract = True
+        return self._abstract
+
+    def _calc_abstract(self) -> Block:
         stacks = tuple([stack.abstract() for stack in self.stacks])
         if self.two_way and len(self.stacks) > 1:
-            return Block(min(stacks, self.stacks[::-1]), self.two_way)
-        return Block(stacks, self.two_way)
+            mirrored = stacks[::-1]
+            if mirrored < stacks:
+                return Block(mirrored, self.two_way, (self.zobrist_mirror, self.zobrist))
+        return Block(stacks, self.two_way, (self.zobrist, self.zobrist_mirror))
 
     def store_container(self, stack_index: int, container: Container) -> Block:
+        tier = self.stacks[stack_index].height()
         return Block(tuple_short_replace(
                 self.stacks,
                 stack_index,
                 self.stacks[stack_index].store_container(container)
             ),
-            self.two_way
+            self.two_way,
+            self._moved_zobrist(stack_index, tier, container)
         )
 
     def retrieve_container(self, stack_index: int) -> Tuple[Block, Container]:
         stack, container = self.stacks[stack_index].retrieve_container()
         new_stacks: Tuple[Stack] = tuple_short_replace(self.stacks, stack_index, stack)
-        return Block(new_stacks, self.two_way), container
+        return Block(new_stacks, self.two_way, self._moved_zobrist(stack_index, stack.height(), container)), container
+
+    def _moved_zobrist(self, stack_index: int, tier: int, container: Container) -> Tuple[int, int]:
+        # placing or removing a container toggles the same key
+        mirror_index = len(self.stacks) - 1 - stack_index
+        return (self.zobrist ^ slot_key(stack_index, tier, container[1], container[2]),
+                self.zobrist_mirror ^ slot_key(mirror_index, tier, container[1], container[2]))
+
+    def heights(self) -> Tuple[int, ...]:
+        if self._heights is None:
+            self._heights = tuple([len(stack.containers) for stack in self.stacks])
+        return self._heights
 
     def reveal_order(self, order_dict: dict) -> Block:
         return Block(tuple([stack.reveal_order(order_dict) for stack in self.stacks]), self.two_way)
@@ -77,9 +108,16 @@ class Block:
         neighbour_above.extend(reversed(self.stacks[stack_index].containers_above(tier_index)))
         return neighbour_above
 
-    # @lru_cache(1)
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return NotImplemented
+        if self.zobrist != other.zobrist:
+            return False
+        return self.two_way == other.two_way and self.stacks == other.stacks
+
     def __hash__(self):
-        return hash((self.two_way, self.stacks))
+        # mirror invariant for two way blocks
+        return combine_block(self.zobrist, self.zobrist_mirror, self.two_way)
 
     def __repr__(self):
         return "\n".join([str(stack) for stack in self.stacks])
@@ -1,18 +1,18 @@
 import math
 import random
-from queue import PriorityQueue
 from typing import Tuple, Set, Optional, List
 
+import numpy
+
 from main.model.adp.valuefunctions.valueFunctionApproximation import ValueFunctionApproximate
 from main.model.dataclass import Container, StackLocation, StackTierLocation
 
 from main.model.batch.realizedBatch import RealizedBatch
 from main.model.dataclass.block import Block
-from main.model.dataclass.outcomes import valid_store_location
+from main.model.dataclass.outcomes import valid_block_stacks, unique_store_locations
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 from main.model.noSolutionError import NoSolutionError
-from main.model.util.prioritizedItem import PrioritizedItem
 
 
 def terminal_optimized_outcome(terminal: Terminal,
@@ -21,15 +21,20 @@ def terminal_optimized_outcome(terminal: Terminal,
                                n: int,
                                t: int,
                                event: Events,
-                               random_choice: bool = False) \
+                               random_choice: bool = False,
+                               rng: Optional[numpy.random.Generator] = None) \
         -> Tuple[Terminal, int, float]:
+    """
+    :param random_choice: store the containers at random locations instead of the locations with the lowest value
+    :param rng: random generator used for the random locations, the global random module if not given
+    """
     if batch.length() == 0:
         return terminal, 0, value_function_approx.value_approximate(n,t, terminal, event)
     if batch.inbound:
-        return _optimized_inbound_outcome(terminal, batch, value_function_approx, n, t, event, random_choice)
+        return _optimized_inbound_outcome(terminal, batch, value_function_approx, n, t, event, random_choice, rng)
     else:
         return _optimized_outbound_outcome(terminal.reveal_order(batch.containers), batch, value_function_approx, n, t,
-                                           event, random_choice)
+                                           event, random_choice, rng)
 
 
 def _optimized_inbound_outcome(initial_terminal: Terminal,
@@ -38,7 +43,8 @@ def _optimized_inbound_outcome(initial_terminal: Terminal,
                                n: int,
                                t: int,
                                event: Events,
-                               random_choice: bool) -> Tuple[Terminal, int, float]:
+                               random_choice: bool,
+                               rng: Optional[numpy.random.Generator]) -> Tuple[Terminal, int, float]:
     current_terminal = initial_terminal
     for target_container in batch.containers:
         # find best terminal layout according to the value function approx
@@ -47,8 +53,7 @@ def _optimized_inbound_outcome(initial_terminal: Terminal,
                                                     target_container, None)
         else:
             # pick random spot
-            valid_locations = valid_store_locations(current_terminal, None)
-            stack_location = random.choice(valid_locations)
+            stack_location = _random_choice(valid_store_locations(current_terminal, None), rng)
             current_terminal = current_terminal.store_container(stack_location, target_container)
             value = value_function_approx.value_approximate(n, t, current_terminal, event)
 
@@ -61,7 +66,8 @@ def _optimized_outbound_outcome(initial_terminal: Terminal,
                                 n: int,
                                 t: int,
                                 event: Events,
-                                random_choice: bool) \
+                                random_choice: bool,
+                                rng: Optional[numpy.random.Generator]) \
         -> Tuple[Terminal, int, float]:
     current_terminal = initial_terminal
     reshuffles = 0
@@ -80,8 +86,7 @@ def _optimized_outbound_outcome(initial_terminal: Terminal,
                     current_terminal, value = optimized_store_location(term, value_function_approx, n, t, event, blocking_container, target_location)
                 else:
                     # Reshuffle to random locations
-                    valid_locations = valid_store_locations(current_terminal, target_location)
-                    stack_location = random.choice(valid_locations)
+                    stack_location = _random_choice(valid_store_locations(current_terminal, target_location), rng)
                     current_terminal = term.store_container(stack_location, blocking_container)
 
         current_terminal, retrieved_container = current_terminal.retrieve_container(target_location[:-1])
@@ -96,20 +101,19 @@ def optimized_store_location(terminal: Terminal,
                              event: Events,
                              container: Container,
                              exclude_target_stack_tier_location: Optional[StackTierLocation]) -> Tuple[Terminal, float]:
+    # equivalent locations yield the same abstract terminal, thus the value function is only evaluated once per class
+    stack_locations = unique_store_locations(terminal, exclude_target_stack_tier_location)
+    new_terms = [terminal.store_container(stack_location, container) for stack_location in stack_locations]
     min_value = math.inf
     min_terminal = None
-
-    for block_index in range(terminal.nr_blocks()):
-        block = terminal.blocks[block_index]
-        for stack_index in range(len(block.stacks)):
-            stack_location = (block_index, stack_index)
-            # check if container may be placed in this location
-            if valid_store_location(terminal, stack_location, exclude_target_stack_tier_location):
-                new_term = terminal.store_container((block_index, stack_index), container)
-                value = value_function_approx.value_approximate(n, t, new_term, event)
-                if value < min_value:
-                    min_value = value
-                    min_terminal = new_term
+    if len(new_terms) > 0:
+        # the candidates are evaluated at once, relative to the terminal they are derived from. Ties are broken by the
+        # order of the locations
+        values = value_function_approx.value_approximate_stored(n, t, terminal, stack_locations, new_terms, event)
+        i = int(numpy.argmin(values))
+        if values[i] < min_value:
+            min_value = float(values[i])
+            min_terminal = new_terms[i]
 
     if min_terminal is None:
         raise NoSolutionError("Could not find suitable solutions for container: {}\n terminal:\n{}"
@@ -117,15 +121,26 @@ def optimized_store_location(terminal: Terminal,
     return min_terminal, min_value
 
 
-def valid_store_locations(terminal: Terminal, exclude_target_stack_tier_location: Optional[StackTierLocation]) -> List[StackLocation]:
-    valid_locations = []
-    for block_index in range(terminal.nr_blocks()):
-        block = terminal.blocks[block_index]
-        for stack_index in range(len(block.stacks)):
-            stack_location = (block_index, stack_index)
-            # check if container may be placed in this location
-            if valid_store_location(terminal, stack_location, exclude_target_stack_tier_location):
-                valid_locations.append(stack_location)
+def _random_choice(locations: List[StackLocation], rng: Optional[numpy.random.Generator]) -> StackLocation:
+    if rng is None:
+        return random.choice(locations)
+    return locations[rng.integers(len(locations))]
+
+
+def valid_store_locations(terminal: Terminal, exclude_target_stack_tier_location: Optional[StackTierLocation],
+                          unique: bool = False) -> List[StackLocation]:
+    """
+    :param unique: only return one location per equivalence class (see outcomes.unique_store_locations), by default
+    all locations are returned such that a random choice is uniform over all stacks
+    """
+    if unique:
+        valid_locations = unique_store_locations(terminal, exclude_target_stack_tier_location)
+    else:
+        valid_locations = []
+        for block_index in range(terminal.nr_blocks()):
+            # only stacks in which the container may be placed
+            for stack_index in valid_block_stacks(terminal, block_index, exclude_target_stack_tier_location):
+                valid_locations.append((block_index, stack_index))
 
     if len(valid_locations) == 0:
         raise NoSolutionError("Could not find suitable solutions for (to exclude: {}) terminal:\n{}"
@@ -0,0 +1,97 @@
+from typing import Callable, Optional, Set, Tuple
+
+from main.model.batch.realizedBatch import RealizedBatch
+from main.model.dataclass.outcomes import handle_outbound_container
+from main.model.dataclass.terminal import Terminal
+from main.model.noSolutionError import NoSolutionError
+from main.model.util.frontier import Frontier
+
+# estimate(terminal, batch, i) of the reshuffles needed to retrieve containers i, i+1, ... of the batch
+Heuristic = Callable[[Terminal, RealizedBatch, int], int]
+
+
+class SearchStatistics:
+    """
+    Node counts of outbound searches, accumulated over all searches it is passed to.
+    """
+    __slots__ = ['searches', 'expanded', 'generated', 'duplicates']
+
+    def __init__(self):
+        self.searches = 0
+        # nodes popped from the frontier and expanded
+        self.expanded = 0
+        # nodes pushed on the frontier
+        self.generated = 0
+        # popped nodes whose abstract terminal was already expanded
+        self.duplicates = 0
+
+    def __repr__(self):
+        return "searches: {}, expanded: {}, generated: {}, duplicates: {}".format(self.searches, self.expanded,
+                                                                                  self.generated, self.duplicates)
+
+
+def remaining_blocking(terminal: Terminal, batch: RealizedBatch, i: int) -> int:
+    """
+    Number of containers placed on top of a container of the batch that is still to be retrieved, while they are not
+    retrieved before it. Each of them is reshuffled at least once and a single move uncovers at most one of them, which
+    makes the estimate admissible and consistent.
+    """
+    # position of the remaining containers within the batch
+    ranks = dict([(batch.containers[j][0], j) for j in range(i, batch.length())])
+    result = 0
+    for block in terminal.blocks:
+        for stack in block.stacks:
+            # lowest rank of the remaining batch containers below the current tier
+            min_rank = None
+            for container in stack.containers:
+                rank = ranks.get(container[0])
+                if min_rank is not None and (rank is None or rank > min_rank):
+                    result += 1
+                if rank is not None and (min_rank is None or rank < min_rank):
+                    min_rank = rank
+    return result
+
+
+def solve_outbound_batch(initial_terminal: Terminal, batch: RealizedBatch,
+                         heuristic: Heuristic = remaining_blocking,
+                         statistics: Optional[SearchStatistics] = None) -> Tuple[Terminal, int]:
+    """
+    A* search for the least number of reshuffles needed to retrieve a revealed outbound batch, in the order of the batch.
+    Abstract terminals are expanded once, which keeps the search optimal as long as the heuristic is consistent.
+    :param initial_terminal: terminal with the order of the batch revealed
+    :param heuristic: admissible and consistent estimate of the remaining reshuffles
+    :param statistics: node counts are added to these statistics
+    :return: the terminal after the batch is retrieved and the number of reshuffles
+    """
+    if statistics is not None:
+        statistics.searches += 1
+    # ((estimated total reshuffles, -i), (reshuffles, i, terminal))
+    q = Frontier()
+    q.push((heuristic(initial_terminal, batch, 0), 0), (0, 0, initial_terminal))
+    closed: Set[Terminal] = set()
+
+    while not q.empty():
+        _, (reshuffles, i, terminal) = q.pop()
+        # check if done
+        if i == batch.length():
+            return terminal, reshuffles
+
+        abstract = terminal.abstract()
+        if abstract in closed:
+            if statistics is not None:
+                statistics.duplicates += 1
+            continue
+        closed.add(abstract)
+        if statistics is not None:
+            statistics.expanded += 1
+
+        handling_outcomes, is_reshuffle = handle_outbound_container(terminal, batch.containers[i])
+        new_i = i + int(not is_reshuffle)
+        new_reshuffles = reshuffles + int(is_reshuffle)
+        for new_term in handling_outcomes:
+            if new_term.abstract() not in closed:
+                q.push((new_reshuffles + heuristic(new_term, batch, new_i), -new_i), (new_reshuffles, new_i, new_term))
+                if statistics is not None:
+                    statistics.generated += 1
+
+    raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}".format(batch, initial_terminal))
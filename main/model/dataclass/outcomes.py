@@ -1,6 +1,6 @@
 import math
-from queue import PriorityQueue
-from typing import Tuple, Set, Optional
+from functools import lru_cache
+from typing import Tuple, Set, Optional, List
 
 from main.model.dataclass import Container, StackLocation, StackTierLocation
 
@@ -8,7 +8,7 @@ from main.model.batch.realizedBatch import RealizedBatch
 from main.model.dataclass.block import Block
 from main.model.dataclass.terminal import Terminal
 from main.model.noSolutionError import NoSolutionError
-from main.model.util.prioritizedItem import PrioritizedItem
+from main.model.util.frontier import Frontier
 
 
 def terminal_unique_outcomes(terminal: Terminal, batch: RealizedBatch) -> Set[Tuple[Terminal, int]]:
@@ -23,15 +23,13 @@ def terminal_unique_outcomes(terminal: Terminal, batch: RealizedBatch) -> Set[Tu
 
 def _unique_inbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch) -> Set[Tuple[Terminal, int]]:
     # q = ((-i, reshuffles)), term)
-    q = PriorityQueue()
-    q.put(PrioritizedItem((0, 0), initial_terminal))
+    q = Frontier()
+    q.push((0, 0), initial_terminal)
     abstract_added = set()
     result = set()
     while not q.empty():
-        item = q.get(block=False)
-        (i, reshuffles) = item.priority
+        (i, reshuffles), terminal = q.pop()
         i = -i
-        terminal = item.item
 
         # check if this is end state
         if i == batch.length():
@@ -46,7 +44,7 @@ def _unique_inbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch) -
                 if new_term_abstracted not in abstract_added:
                     new_i = i + 1
                     abstract_added.add(new_term_abstracted)
-                    q.put(PrioritizedItem((-new_i, reshuffles), new_term))
+                    q.push((-new_i, reshuffles), new_term)
     if len(result) == 0:
         raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}"
                          .format(batch, initial_terminal))
@@ -56,25 +54,29 @@ def _unique_inbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch) -
 def _unique_outbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch) \
         -> Set[Tuple[Terminal, int]]:
     # q = ((-i, reshuffles)), term)
-    q = PriorityQueue()
-    q.put(PrioritizedItem((0, 0), initial_terminal))
-    abstract_added = set()
-    result = set()
+    q = Frontier()
+    q.push((0, 0), initial_terminal)
+    # least number of reshuffles with which each abstract terminal was reached, a terminal is only (re)visited if it is
+    # reached with fewer reshuffles, such that the outcome does not depend on the order in which children are generated
+    abstract_added = {initial_terminal.abstract(): 0}
+    result = {}
     min_reshuffles = math.inf
     while not q.empty():
-        item = q.get(block=False)
-        (i, reshuffles) = item.priority
+        (i, reshuffles), terminal = q.pop()
         i = -i
-        terminal = item.item
 
         # if reshuffles is bigger than the current min reshuffles, disregard this option
         if reshuffles > min_reshuffles:
             continue
+        terminal_abstracted = terminal.abstract()
+        # a cheaper path to this terminal was found after this one was queued
+        if reshuffles > abstract_added[terminal_abstracted]:
+            continue
 
         # check if this is end state
         if i == batch.length():
             min_reshuffles = reshuffles
-            result.add((terminal, reshuffles))
+            result[terminal_abstracted] = (terminal, reshuffles)
         else:
             # not yet explored, need to add children to queue
             current_container = batch.containers[i]
@@ -84,13 +86,14 @@ def _unique_outbound_outcomes(initial_terminal: Terminal, batch: RealizedBatch)
             new_reshuffles = reshuffles + int(is_reshuffle)
             for new_term in handling_outcomes:
                 new_term_abstracted = new_term.abstract()
-                if new_term_abstracted not in abstract_added:
-                    abstract_added.add(new_term_abstracted)
-                    q.put(PrioritizedItem((-new_i, new_reshuffles), new_term))
+                if new_reshuffles < abstract_added.get(new_term_abstracted, math.inf):
+                    abstract_added[new_term_abstracted] = new_reshuffles
+                    q.push((-new_i, new_reshuffles), new_term)
     if len(result) == 0:
         raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}"
                               .format(batch, initial_terminal))
-    return result
+    # end states found before the minimum was known may need more reshuffles than necessary
+    return {outcome for outcome in result.values() if outcome[1] == min_reshuffles}
 
 
 def handle_outbound_container(terminal: Terminal, container: Container) -> Tuple[Set[Terminal], bool]:
@@ -110,131 +113,221 @@ def handle_outbound_container(terminal: Terminal, container: Container) -> Tuple
 def store_locations(terminal: Terminal, container: Container,
                     exclude_target_stack_tier_location: Optional[StackTierLocation]) \
         -> Set[Terminal]:
-    # max_stack_height = terminal.max_height
     result = set()
+    for stack_location in unique_store_locations(terminal, exclude_target_stack_tier_location):
+        new_term = terminal.store_container(stack_location, container)
+        result.add(new_term)
+
+    return result
+
+
+def unique_store_locations(terminal: Terminal, target_stack_tier_location: Optional[StackTierLocation]) \
+        -> List[StackLocation]:
+    """
+    Valid store locations, with one location per equivalence class. Storing a container in either location of a class
+    yields the same abstract terminal: blocks with the same abstraction (identical or mirrored two way blocks) are
+    considered once and within a mirror symmetric two way block only the left half is considered. The block containing
+    the target container is never grouped, as the diagonal of the target breaks the symmetry.
+    :param terminal: terminal
+    :param target_stack_tier_location: location of the target container that is being retrieved, if any
+    :return: representative locations, in the order of the blocks and stacks
+    """
+    result = []
+    target_block_index = None if target_stack_tier_location is None else target_stack_tier_location[0]
     blocks_visited = set()
 
     for block_index in range(terminal.nr_blocks()):
         block = terminal.blocks[block_index]
-        if block not in blocks_visited:
-            blocks_visited.add(block)
-            for stack_index in range(len(block.stacks)):
-                stack_location = (block_index, stack_index)
-                # check if container may be placed in this location
-                if valid_store_location(terminal, stack_location, exclude_target_stack_tier_location):
-                    new_term = terminal.store_container((block_index, stack_index), container)
-                    result.add(new_term)
-
+        if block_index != target_block_index:
+            abstract_block = block.abstract()
+            if abstract_block in blocks_visited:
+                continue
+            blocks_visited.add(abstract_block)
+
+        stack_indices = valid_block_stacks(terminal, block_index, target_stack_tier_location)
+        if block_index != target_block_index and _mirror_symmetric(block):
+            nr_stacks = len(block.stacks)
+            classes_visited = set()
+            for stack_index in stack_indices:
+                stack_class = min(stack_index, nr_stacks - 1 - stack_index)
+                if stack_class not in classes_visited:
+                    classes_visited.add(stack_class)
+                    result.append((block_index, stack_index))
+        else:
+            result.extend([(block_index, stack_index) for stack_index in stack_indices])
     return result
 
 
+def _mirror_symmetric(block: Block) -> bool:
+    return block.two_way and block.stacks == block.stacks[::-1]
+
 
+def valid_block_stacks(terminal: Terminal, block_index: int,
+                       target_stack_tier_location: Optional[StackTierLocation]) -> List[int]:
+    """
+    All stacks of a block in which a container may be stored, see valid_store_location.
+    :param terminal: terminal
+    :param block_index: index of the block
+    :param target_stack_tier_location: location of the target container that is being retrieved, if any
+    :return: indices of the valid stacks, in ascending order
+    """
+    block = terminal.blocks[block_index]
+    if target_stack_tier_location is None or target_stack_tier_location[0] != block_index:
+        return list(valid_height_stacks(block.heights(), block.two_way, terminal.max_height, None))
+    return list(valid_height_stacks(block.heights(), block.two_way, terminal.max_height, target_stack_tier_location[1:]))
 
 
 def valid_store_location(terminal: Terminal,
                          stack_location: StackLocation,
                          target_stack_tier_location: Optional[StackTierLocation]):
-    # stack is not full
-    max_stack_height = terminal.max_height
-    non_full = terminal.stack_height(stack_location) < max_stack_height
-
-    if not non_full:
+    block = terminal.blocks[stack_location[0]]
+    heights = block.heights()
+    # stack is not full, is placed at a correct location within the bay and is reachable
+    if not _valid_flags(heights, block.two_way, terminal.max_height)[stack_location[1]]:
         return False
 
     # a container may not be stored when the target container is located in the same stack
     if target_stack_tier_location is not None and stack_location == target_stack_tier_location[:-1]:
         return False
 
-    # if bay is empty, stack_location must be in the middle, otherwise must be against a neighbouring
-    if not correct_bay_location(terminal, stack_location):
-        return False
-
-    # stack must be reachable
-    if not _reachable(terminal.blocks[stack_location[0]], stack_location[1]):
-        return False
-
     # if target stack tier is supplied, it is not allowed to store a container below the diagonal of the target container
     return below_diagonal(terminal, stack_location, target_stack_tier_location)
 
 
-def correct_bay_location(terminal: Terminal, stack_location: StackLocation):
-    block = terminal.blocks[stack_location[0]]
-    if block.two_way:
-        return _correct_bay_location_two_way(block, stack_location)
-    else:
-        return _correct_bay_location_one_way(block, stack_location)
+########################################################################################
+# Validity of store locations, these only depend on the stack heights of a block and are cached on the height vector,
+# such that the result is shared across all blocks with the same heights
+########################################################################################
 
+@lru_cache(maxsize=None)
+def _valid_flags(heights: Tuple[int, ...], two_way: bool, max_height: int) -> Tuple[bool, ...]:
+    reachable = _reachability(heights, two_way)[0]
+    return tuple([heights[stack_index] < max_height
+                  and _correct_bay_location(heights, two_way, stack_index)
+                  and reachable[stack_index]
+                  for stack_index in range(len(heights))])
 
-def _correct_bay_location_one_way(block: Block, stack_location: StackLocation):
-    nr_stacks = len(block.stacks)
-    # if bay is empty, must be placed all the way to the right
-    if all_empty_in_range(block, range(nr_stacks)):
-        return stack_location[1] == nr_stacks-1
 
-    # if stack already has a container placed on it, it is allowed to build on top of it
-    if block.stacks[stack_location[1]].height() > 0:
-        return True
+@lru_cache(maxsize=None)
+def _valid_stacks(heights: Tuple[int, ...], two_way: bool, max_height: int) -> Tuple[int, ...]:
+    flags = _valid_flags(heights, two_way, max_height)
+    return tuple([stack_index for stack_index in range(len(heights)) if flags[stack_index]])
 
-    # if there exist an empty stack to the right of the given stack, it is not a valid position
-    if exist_empty_in_range(block, range(stack_location[1]+1)):
-        return False
 
-    # if above checks hold, it is a valid location according to this rule
+@lru_cache(maxsize=None)
+def valid_height_stacks(heights: Tuple[int, ...], two_way: bool, max_height: int,
+                        target_stack_tier: Optional[Tuple[int, int]]) -> Tuple[int, ...]:
+    """
+    Same as valid_block_stacks, for a block given by its stack heights.
+    :param target_stack_tier: (stack index, tier) of the target container if it is located in this block
+    """
+    valid = _valid_stacks(heights, two_way, max_height)
+    if target_stack_tier is None:
+        return valid
+    target_stack_index, target_tier = target_stack_tier
+    reachable_left, reachable_right = _reachability(heights, two_way)[1:]
+    return tuple([stack_index for stack_index in valid if stack_index != target_stack_index
+                  and _below_diagonal(heights, two_way, stack_index, target_stack_index, target_tier,
+                                      reachable_left[stack_index], reachable_right[stack_index])])
+
+
+@lru_cache(maxsize=None)
+def _reachability(heights: Tuple[int, ...], two_way: bool) \
+        -> Tuple[Tuple[bool, ...], Tuple[bool, ...], Tuple[bool, ...]]:
+    """
+    :return: per stack, whether it is reachable at all, from the left and from the right
+    """
+    nr_stacks = len(heights)
+    left = tuple([_reachable_heights(heights, stack_index, range(stack_index)) for stack_index in range(nr_stacks)])
+    right = tuple([two_way and _reachable_heights(heights, stack_index, range(stack_index + 1, nr_stacks))
+                   for stack_index in range(nr_stacks)])
+    return tuple([left[stack_index] or right[stack_index] for stack_index in range(nr_stacks)]), left, right
+
+
+def _reachable_heights(heights: Tuple[int, ...], stack_index: int, iterator) -> bool:
+    stack_height = heights[stack_index]
+    for i in iterator:
+        stack_distance = abs(stack_index - i)
+        i_height = heights[i]
+        below_diagonal = i_height <= (stack_height - stack_distance) or i_height == 0
+        if not below_diagonal:
+            return False
     return True
 
 
-def _correct_bay_location_two_way(block: Block, stack_location: StackLocation):
-    nr_stacks = len(block.stacks)
-    stack_index = stack_location[1]
+def _correct_bay_location(heights: Tuple[int, ...], two_way: bool, stack_index: int) -> bool:
+    nr_stacks = len(heights)
+    if not two_way:
+        # if bay is empty, must be placed all the way to the right
+        if not any(heights):
+            return stack_index == nr_stacks - 1
+
+        # if stack already has a container placed on it, it is allowed to build on top of it
+        if heights[stack_index] > 0:
+            return True
+
+        # if there exist an empty stack to the right of the given stack, it is not a valid position
+        return all(heights[:stack_index + 1])
+
     # if bay is emtpy, must be placed in the middle
-    if all_empty_in_range(block, range(nr_stacks)):
-        return nr_stacks <= 2 or len(block.stacks) // 2 == stack_location[1]
+    if not any(heights):
+        return nr_stacks <= 2 or nr_stacks // 2 == stack_index
 
     # if stack already has a container placed on it, it is allowed to build on top of it
-    if block.stacks[stack_index].height() > 0:
+    if heights[stack_index] > 0:
         return True
 
     # direct neighbour stack must not be empty and other side must all be empty
     # right neighbour, left empty:
-    right_neighbour = has_container(block, stack_index+1) and all_empty_in_range(block, range(stack_index))
+    right_neighbour = stack_index + 1 < nr_stacks and heights[stack_index + 1] > 0 and not any(heights[:stack_index])
 
     # left neighbour, right empty:
-    return right_neighbour or (has_container(block, stack_index-1) and all_empty_in_range(block, range(stack_index+1, nr_stacks)))
+    return right_neighbour or (stack_index - 1 >= 0 and heights[stack_index - 1] > 0
+                               and not any(heights[stack_index + 1:]))
 
 
-def below_diagonal(terminal: Terminal, stack_location: StackLocation, target_stack_tier: Optional[StackTierLocation]):
-    # if target stack tier is None, the check on diagonal is not needed
-    if target_stack_tier is None:
-        return True
-
-    # if bays are different, the check on diagonal is not needed
-    if stack_location[0] != target_stack_tier[0]:
-        return True
-
-    block = terminal.blocks[stack_location[0]]
-    target_tier = target_stack_tier[2]
-    target_stack_index = target_stack_tier[1]
-    stack_index = stack_location[1]
+def _below_diagonal(heights: Tuple[int, ...], two_way: bool, stack_index: int, target_stack_index: int,
+                    target_tier: int, reachable_left: bool, reachable_right: bool) -> bool:
     stack_distance = abs(target_stack_index - stack_index)
+    height = heights[stack_index]
 
     if stack_index < target_stack_index:
         # target is on the right, thus needs to be below diagonal
-        diagonal = (block.stacks[stack_index].height()) < (target_tier - stack_distance) and _reachable_left(block, stack_index)
+        diagonal = height < (target_tier - stack_distance) and reachable_left
     else:
         # target is on the left, thus needs to be above diagonal
-        diagonal = (block.stacks[stack_index].height()) > (target_tier + stack_distance) and _reachable_left(block, stack_index)
+        diagonal = height > (target_tier + stack_distance) and reachable_left
 
-    if block.two_way and not diagonal:
+    if two_way and not diagonal:
         if stack_index < target_stack_index:
             # target is on the left, thus needs to be above diagonal
-            diagonal = (block.stacks[stack_index].height()) > (target_tier + stack_distance) and _reachable_right(block, stack_index)
+            diagonal = height > (target_tier + stack_distance) and reachable_right
         else:
             # target is on the right, thus needs to be below diagonal
-            diagonal = (block.stacks[stack_index].height()) < (target_tier - stack_distance) and _reachable_right(block, stack_index)
+            diagonal = height < (target_tier - stack_distance) and reachable_right
 
     return diagonal
 
 
+def correct_bay_location(terminal: Terminal, stack_location: StackLocation):
+    block = terminal.blocks[stack_location[0]]
+    return _correct_bay_location(block.heights(), block.two_way, stack_location[1])
+
+
+def below_diagonal(terminal: Terminal, stack_location: StackLocation, target_stack_tier: Optional[StackTierLocation]):
+    # if target stack tier is None, the check on diagonal is not needed
+    if target_stack_tier is None:
+        return True
+
+    # if bays are different, the check on diagonal is not needed
+    if stack_location[0] != target_stack_tier[0]:
+        return True
+
+    block = terminal.blocks[stack_location[0]]
+    stack_index = stack_location[1]
+    return _below_diagonal(block.heights(), block.two_way, stack_index, target_stack_tier[1], target_stack_tier[2],
+                           _reachable_left(block, stack_index), _reachable_right(block, stack_index))
+
 
 def exist_empty_in_range(block: Block, iterator):
     for stack_index in iterator:
@@ -258,42 +351,12 @@ def has_container(block: Block, stack_index: int):
 
 
 def _reachable_right(block: Block, stack_location: int):
-    return block.two_way and _reachable_base(block, stack_location, range(stack_location + 1, len(block.stacks)))
+    return _reachability(block.heights(), block.two_way)[2][stack_location]
 
 
 def _reachable_left(block: Block, stack_location: int):
-    return _reachable_base(block, stack_location, range(stack_location))
-
-
-def _reachable_base(block: Block, stack_location: int, iterator):
-    stack_height = block.stacks[stack_location].height()
-    for i in iterator:
-        stack_distance = abs(stack_location - i)
-        i_height = block.stacks[i].height()
-        below_diagonal = i_height <= (stack_height - stack_distance) or i_height == 0
-        if not below_diagonal:
-            return False
-    return True
+    return _reachability(block.heights(), block.two_way)[1][stack_location]
 
 
 def _reachable(block: Block, stack_location: int):
-    stack_height = block.stacks[stack_location].height()
-    reachable = True
-    for i in range(stack_location):
-        stack_distance = stack_location - i
-        i_height = block.stacks[i].height()
-        below_diagonal = i_height <= (stack_height - stack_distance) or i_height == 0
-        if not below_diagonal:
-            reachable = False
-            break
-
-    if block.two_way and not reachable:
-        reachable = True
-        for i in range(stack_location + 1, len(block.stacks)):
-            stack_distance = i - stack_location
-            i_height = block.stacks[i].height()
-            below_diagonal = i_height <= (stack_height - stack_distance) or i_height == 0
-            if not below_diagonal:
-                reachable = False
-                break
-    return reachable
+    return _reachability(block.heights(), block.two_way)[0][stack_location]
@@ -1,22 +1,102 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Tuple, Optional
 
 from main.model.dataclass import Container
+from main.model.dataclass.zobrist import stack_hash, slot_key
+
+
+class StackStatistics:
+    """
+    Statistics of the containers up to and including a tier of a stack. The statistics of a tier are derived from those
+    of the tier below, and keep a reference to them, such that pushing or popping a container is O(1).
+    """
+    __slots__ = ['below', 'min_label', 'min_count', 'blocking_sum', 'min_container', 'ordered']
+
+    def __init__(self, below: Optional[StackStatistics], min_label: float, min_count: int, blocking_sum: float,
+                 min_container: Optional[Container], ordered: bool):
+        self.below = below
+        # lowest batch label and the number of containers carrying it
+        self.min_label = min_label
+        self.min_count = min_count
+        # sum of the terms of the formula of (Galle et.al., 2018), see Stack.calc_blocking_lowerbound
+        self.blocking_sum = blocking_sum
+        # first departing container, by batch and order label
+        self.min_container = min_container
+        # whether no container is placed on top of a container with a lower batch label
+        self.ordered = ordered
+
+    @classmethod
+    def empty(cls) -> StackStatistics:
+        return cls(None, math.inf, 0, 0, None, True)
+
+    @classmethod
+    def of(cls, containers: Tuple[Container, ...]) -> StackStatistics:
+        result = StackStatistics.empty()
+        for container in containers:
+            result = result.push(container)
+        return result
+
+    def push(self, container: Container) -> StackStatistics:
+        label = container[1]
+        if label < self.min_label:
+            min_label, min_count = label, 1
+        elif label == self.min_label:
+            min_label, min_count = label, self.min_count + 1
+        else:
+            min_label, min_count = self.min_label, self.min_count
+        # a container only contributes when it carries the lowest label, it then shares its contribution with all other
+        # containers with that label
+        blocking_sum = self.blocking_sum + int(label == min_label) / min_count
+        min_container = self.min_container
+        if min_container is None or container[1:] < min_container[1:]:
+            min_container = container
+        return StackStatistics(self, min_label, min_count, blocking_sum, min_container,
+                               self.ordered and label <= self.min_label)
+
+
+EMPTY_STATISTICS = StackStatistics.empty()
 
 
 @dataclass
 class Stack:
-    __slots__ = ['containers', 'abstract_containers', 'blocking_lowerbound']
+    __slots__ = ['containers', 'statistics', 'zobrist', 'is_abstract', '_abstract', '_abstract_containers']
     containers: Tuple[Container, ...]
-    abstract_containers: Tuple[Container, ...]
-    blocking_lowerbound: float
 
-    def __init__(self, containers: Tuple[Container, ...]):
+    def __init__(self, containers: Tuple[Container, ...], zobrist: Optional[int] = None,
+                 statistics: Optional[StackStatistics] = None):
         self.containers = containers
-        self.abstract_containers = self.calc_abstract_containers()
-        self.blocking_lowerbound = self.calc_blocking_lowerbound()
+        # statistics can be supplied when they are derived incrementally
+        self.statistics = StackStatistics.of(containers) if statistics is None else statistics
+        # Zobrist hash of the stack, can be supplied when it is derived incrementally
+        self.zobrist = stack_hash(containers) if zobrist is None else zobrist
+        # the abstraction is computed once on first use, an abstract stack is its own abstraction
+        self.is_abstract = False
+        self._abstract: Optional[Stack] = None
+        self._abstract_containers: Optional[Tuple[Container, ...]] = None
+
+    @property
+    def abstract_containers(self) -> Tuple[Container, ...]:
+        if self._abstract_containers is None:
+            self._abstract_containers = self.calc_abstract_containers()
+        return self._abstract_containers
+
+    @property
+    def blocking_lowerbound(self) -> float:
+        return len(self.containers) - self.statistics.blocking_sum
+
+    @property
+    def min_label(self) -> float:
+        """
+        :return: lowest batch label within the stack, infinity for an empty stack
+        """
+        return self.statistics.min_label
+
+    @property
+    def ordered(self) -> bool:
+        return self.statistics.ordered
 
     def calc_blocking_lowerbound(self) -> float:
         """
@@ -32,18 +112,27 @@ class Stack:
 
     @classmethod
     def empty(cls) -> Stack:
-        return cls(())
+        return cls((), 0, EMPTY_STATISTICS)
 
-    # @lru_cache(1)
     def abstract(self) -> Stack:
-        return Stack(self.abstract_containers)
+        if self.is_abstract:
+            return self
+        if self._abstract is None:
+            self._abstract = Stack(self.abstract_containers, self.zobrist)
+            self._abstract.is_abstract = True
+        return self._abstract
 
     def store_container(self, container: Container) -> Stack:
-        return Stack(self.containers + (container,))
+        tier = len(self.containers)
+        return Stack(self.containers + (container,), self.zobrist ^ slot_key(-1, tier, container[1], container[2]),
+                     self.statistics.push(container))
 
     # @lru_cache(1)
     def retrieve_container(self) -> Tuple[Stack, Container]:
-        return Stack(self.containers[:-1]), self.containers[-1]
+        container = self.containers[-1]
+        tier = len(self.containers) - 1
+        return Stack(self.containers[:-1], self.zobrist ^ slot_key(-1, tier, container[1], container[2]),
+                     self.statistics.below), container
 
     def reveal_order(self, order_dict: dict) -> Stack:
         return Stack(tuple([Stack.__reveal_container(container, order_dict) for container in self.containers]))
@@ -55,15 +144,16 @@ class Stack:
         return "-" + "∣".join([Stack.__container_to_string(container) for container in self.containers]) + "\n"
 
     def __eq__(self, other):
+        if self.zobrist != other.zobrist:
+            return False
         return self.abstract_containers == other.abstract_containers
         # return Stack.__container_abstract(self) == Stack.__container_abstract(other)
 
     def __lt__(self, other):
         return self.abstract_containers < other.abstract_containers
 
-    # @lru_cache(1)
     def __hash__(self):
-        return hash(self.abstract_containers)
+        return self.zobrist
 
     @staticmethod
     def __reveal_container(container: Container, order_dict: dict) -> Container:
@@ -96,4 +186,6 @@ class Stack:
 
     def min_container(self):
         # returns first departing container
-        return min(self.containers, key=lambda x: x[1:])
+        if self.statistics.min_container is None:
+            raise ValueError("An empty stack has no first departing container")
+        return self.statistics.min_container
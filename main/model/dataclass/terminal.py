@@ -1,24 +1,50 @@
 from __future__ import annotations
 
+from bisect import bisect_left, insort
 from dataclasses import dataclass
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Union
 
 from main.model.dataclass import tuple_long_replace, StackLocation, Container, StackTierLocation
 from main.model.dataclass.block import Block
 from main.model.dataclass.stack import Stack
+from main.model.dataclass.zobrist import terminal_term, combine_block, MASK
+from main.model.util.persistentIndex import PersistentIndex
 
 
 @dataclass(order=True)
 class Terminal:
-    __slots__ = ['max_height', 'blocks']
+    __slots__ = ['max_height', 'blocks', 'zobrist', 'is_abstract', '_abstract', '_abstract_source',
+                 '_locations']
     max_height: int
     blocks: Tuple[Block, ...]
 
-    # cache_hash: Any
+    # number of replaced blocks up to which the abstraction is derived from the abstraction of an ancestor
+    MAX_ABSTRACT_DELTA = 2
 
-    def __init__(self, blocks: Tuple[Block, ...], max_height: int):
+    def __init__(self, blocks: Tuple[Block, ...], max_height: int, zobrist: Optional[int] = None):
         self.blocks = blocks
         self.max_height = max_height
+        # Zobrist hash of the terminal, invariant to the order of the blocks (see zobrist.terminal_term). Can be supplied
+        # when it is derived incrementally.
+        self.zobrist = Terminal.calc_zobrist(blocks) if zobrist is None else zobrist
+        # the abstraction is computed once on first use, an abstract terminal is its own abstraction
+        self.is_abstract = False
+        self._abstract: Optional[Terminal] = None
+        # (abstract ancestor, removed blocks, added blocks), allows the abstraction to be derived from the (sorted)
+        # abstraction of an ancestor by only re-sorting the blocks that changed
+        self._abstract_source: Optional[Tuple[Terminal, Tuple[Block, ...], Tuple[Block, ...]]] = None
+        # container id -> (block, stack, tier), built on the first lookup and derived on store and retrieve. False if
+        # container ids are not unique (e.g. in abstract terminals), lookups then fall back to a linear scan.
+        self._locations: Union[None, bool, PersistentIndex] = None
+
+    @staticmethod
+    def calc_zobrist(blocks: Tuple[Block, ...]) -> int:
+        return sum([Terminal.block_term(block) for block in blocks]) & MASK
+
+    @staticmethod
+    def block_term(block: Block) -> int:
+        # the full 64 bit block hash, hash(block) would reduce it modulo the builtin hash width
+        return terminal_term(combine_block(block.zobrist, block.zobrist_mirror, block.two_way))
 
     @classmethod
     def empty_single_stack_block(cls, nr_stacks, max_height) -> Terminal:
@@ -33,17 +59,37 @@ class Terminal:
     ########################################################################################
 
     def abstract(self) -> Terminal:
-        return Terminal(tuple(sorted([block.abstract() for block in self.blocks])), self.max_height)
+        if self.is_abstract:
+            return self
+        if self._abstract is None:
+            blocks = None
+            if self._abstract_source is not None:
+                blocks = Terminal._derived_abstract_blocks(*self._abstract_source)
+                self._abstract_source = None
+            if blocks is None:
+                blocks = sorted([block.abstract() for block in self.blocks])
+            # abstraction only reorders blocks and drops ids, thus the hash remains the same
+            self._abstract = Terminal(tuple(blocks), self.max_height, self.zobrist)
+            self._abstract.is_abstract = True
+        return self._abstract
 
     def store_container(self, location: StackLocation, container: Container) -> Terminal:
         replacement = self.blocks[location[0]].store_container(location[1], container)
-        blocks = tuple_long_replace(self.blocks, location[0], replacement)
-        return Terminal(blocks, self.max_height)
+        result = self._replaced_block(location[0], replacement)
+        if isinstance(self._locations, PersistentIndex):
+            if container[0] in self._locations:
+                result._locations = False
+            else:
+                tier = self.stack_height(location)
+                result._locations = self._locations.set(container[0], (location[0], location[1], tier))
+        return result
 
     def retrieve_container(self, location: StackLocation) -> Tuple[Terminal, Container]:
         new_block, container = self.blocks[location[0]].retrieve_container(location[1])
-        blocks = tuple_long_replace(self.blocks, location[0], new_block)
-        return Terminal(blocks, self.max_height), container
+        result = self._replaced_block(location[0], new_block)
+        if isinstance(self._locations, PersistentIndex):
+            result._locations = self._locations.remove(container[0])
+        return result, container
 
     def reshuffle_container(self, from_location: StackLocation, to_location: StackLocation) -> Terminal:
         new_term, container = self.retrieve_container(from_location)
@@ -51,7 +97,10 @@ class Terminal:
 
     def reveal_order(self, containers: Tuple[Container, ...]):
         order_dict = dict([(containers[i][0], i + 1) for i in range(len(containers))])
-        return Terminal(tuple([block.reveal_order(order_dict) for block in self.blocks]), self.max_height)
+        result = Terminal(tuple([block.reveal_order(order_dict) for block in self.blocks]), self.max_height)
+        # revealing the order does not move containers
+        result._locations = self._locations
+        return result
 
     ########################################################################################
     # Misc util operators
@@ -67,6 +116,14 @@ class Terminal:
         return len(self.blocks[stack_location[0]].stacks[stack_location[1]].containers)
 
     def container_location(self, container: Container):
+        if self._locations is None:
+            self._locations = self._build_locations()
+        if self._locations is not False:
+            location = self._locations.get(container[0])
+            if location is None:
+                raise RuntimeError("Could not find given container")
+            return location
+
         container_id = container[0]
         for block_index in range(len(self.blocks)):
             block = self.blocks[block_index]
@@ -77,6 +134,18 @@ class Terminal:
                         return block_index, stack_index, tier_index
         raise RuntimeError("Could not find given container")
 
+    def _build_locations(self) -> Union[bool, PersistentIndex]:
+        result = PersistentIndex()
+        for block_index in range(len(self.blocks)):
+            block = self.blocks[block_index]
+            for stack_index in range(len(block.stacks)):
+                containers = block.stacks[stack_index].containers
+                for tier_index in range(len(containers)):
+                    if containers[tier_index][0] in result:
+                        return False
+                    result = result.set(containers[tier_index][0], (block_index, stack_index, tier_index))
+        return result
+
     # def containers_above(self, stack_tier_location: StackTierLocation) -> Tuple[Container, ...]:
     #     stack = self.blocks[stack_tier_location[0]].stacks[stack_tier_location[1]]
     #     return stack.containers[stack_tier_location[2] + 1:]
@@ -89,6 +158,49 @@ class Terminal:
         split = "*" * 20 + "\n"
         return """\n{split}\n{blocks}\n{split}\n""".format(split=split, blocks="**\n".join([str(block) for block in self.blocks]))
 
+    def _replaced_block(self, block_index: int, new_block: Block) -> Terminal:
+        old_block = self.blocks[block_index]
+        zobrist = (self.zobrist - Terminal.block_term(old_block) + Terminal.block_term(new_block)) & MASK
+        result = Terminal(tuple_long_replace(self.blocks, block_index, new_block), self.max_height, zobrist)
+        result._abstract_source = self._replaced_abstract_source(old_block, new_block)
+        return result
+
+    def _replaced_abstract_source(self, old_block: Block, new_block: Block) \
+            -> Optional[Tuple[Terminal, Tuple[Block, ...], Tuple[Block, ...]]]:
+        if self._abstract is not None:
+            return self._abstract, (old_block,), (new_block,)
+        if self._abstract_source is None:
+            return None
+        ancestor, removed, added = self._abstract_source
+        for i in range(len(added)):
+            # the block was changed before, so the earlier replacement can be dropped
+            if added[i] is old_block:
+                return ancestor, removed, added[:i] + added[i + 1:] + (new_block,)
+        if len(added) >= Terminal.MAX_ABSTRACT_DELTA:
+            return None
+        return ancestor, removed + (old_block,), added + (new_block,)
+
+    @staticmethod
+    def _derived_abstract_blocks(ancestor: Terminal, removed: Tuple[Block, ...], added: Tuple[Block, ...]) \
+            -> Optional[List[Block]]:
+        blocks = list(ancestor.blocks)
+        for block in removed:
+            abstract_block = block.abstract()
+            index = bisect_left(blocks, abstract_block)
+            if index == len(blocks) or blocks[index] != abstract_block:
+                return None
+            del blocks[index]
+        for block in added:
+            insort(blocks, block.abstract())
+        return blocks
+
+    def __eq__(self, other):
+        if not isinstance(other, Terminal):
+            return NotImplemented
+        if self.zobrist != other.zobrist:
+            return False
+        return self.max_height == other.max_height and self.blocks == other.blocks
+
     def __hash__(self):
-        return hash(self.blocks)
+        return self.zobrist
 
@@ -0,0 +1,71 @@
+from functools import lru_cache
+from typing import Tuple
+
+MASK = (1 << 64) - 1
+
+
+def mix(value: int) -> int:
+    """
+    SplitMix64 finalizer, scrambles a 64 bit integer. Deterministic over runs and processes (unlike the builtin hash of
+    strings), such that the hashes can be used as persistent keys.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=None)
+def slot_key(stack_index: int, tier: int, batch_label: int, order_label: int) -> int:
+    """
+    Zobrist key of a container with the given labels placed at the given stack and tier. The container id is not part of
+    the key, as containers with different ids but equal labels are considered equal. Stacks use stack_index -1, as they
+    are unaware of their position within a block.
+    """
+    key = mix(stack_index & MASK)
+    key = mix(key ^ (tier & MASK))
+    key = mix(key ^ (batch_label & MASK))
+    return mix(key ^ (order_label & MASK))
+
+
+def stack_hash(containers) -> int:
+    result = 0
+    for tier in range(len(containers)):
+        container = containers[tier]
+        result ^= slot_key(-1, tier, container[1], container[2])
+    return result
+
+
+def block_hashes(stacks) -> Tuple[int, int]:
+    """
+    Calculates the Zobrist hash of the given stacks read from left to right and the hash of the mirror image (stacks read
+    from right to left).
+    """
+    forward = 0
+    mirror = 0
+    nr_stacks = len(stacks)
+    for stack_index in range(nr_stacks):
+        containers = stacks[stack_index].containers
+        for tier in range(len(containers)):
+            container = containers[tier]
+            forward ^= slot_key(stack_index, tier, container[1], container[2])
+            mirror ^= slot_key(nr_stacks - 1 - stack_index, tier, container[1], container[2])
+    return forward, mirror
+
+
+def combine_block(forward: int, mirror: int, two_way: bool) -> int:
+    """
+    Hash of a block. For a two way block the hash is mirror invariant.
+    """
+    if two_way:
+        return (forward + mirror) & MASK
+    return forward
+
+
+def terminal_term(block_hash: int) -> int:
+    """
+    Contribution of a single block to the hash of a terminal. The terminal hash is the sum of these terms, which makes
+    it invariant to the order of the blocks. As a result, a terminal and its abstraction share the same hash and a move
+    only needs to replace the term of the block it touches.
+    """
+    return mix(block_hash)
@@ -1,15 +1,18 @@
 import math
 import operator
 from functools import reduce
-from typing import Tuple, List
+from typing import Tuple, List, Dict
 
 from main.model.batch.baseBatch import BaseBatch
+from main.model.events.futureArrivals import FutureArrivals
 
 
 class BaseEvents:
 
     def __init__(self, batches: Tuple[BaseBatch]):
         self.batches = batches
+        # current batch number -> summary of the inbound batches after it, built on first use
+        self._future_arrivals: Dict[int, FutureArrivals] = {}
 
     def batch(self, i):
         return self.batches[i]
@@ -17,6 +20,18 @@ class BaseEvents:
     def length(self):
         return len(self.batches)
 
+    def future_arrivals(self, current_batch_number: int) -> FutureArrivals:
+        """
+        :return: summary of the inbound batches after the current batch number, see FutureArrivals
+        """
+        result = self._future_arrivals.get(current_batch_number)
+        if result is None:
+            result = FutureArrivals([(t, [container[1] for container in self.batches[t].containers])
+                                     for t in range(len(self.batches))
+                                     if t > current_batch_number and self.batches[t].inbound])
+            self._future_arrivals[current_batch_number] = result
+        return result
+
     def max_number_realisations(self):
         return reduce(operator.mul, [math.factorial(batch.length()) for batch in self.batches], 1)
 
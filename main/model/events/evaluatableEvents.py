@@ -1,11 +1,16 @@
-from typing import Tuple, List
+import os
+from typing import Tuple, List, Sequence, Optional
 
 import json
 
+import numpy
+
 from main.model.batch import RealizedBatch
 from main.model.batch.batch import Batch
 from main.model.events.events import Events
-from main.model.events.generator import generate_events
+from main.model.events.generator import generate_events, generate_packed_events
+from main.model.events.packedEvents import PackedEvents, PackedSamples, EXTENSION, pack_sequences, \
+    write_packed_events
 from main.model.events.realizedEvents import RealizedEvents
 from numpyencoder import NumpyEncoder
 
@@ -14,14 +19,16 @@ from main.util import writeToFile, sub_folder_file, sub_folder
 
 class EvaluatableEvents(Events):
 
-    def __init__(self, batches: Tuple[Batch], training_events: List[RealizedEvents], evaluating_events: List[RealizedEvents]):
+    def __init__(self, batches: Tuple[Batch], training_events: Sequence[RealizedEvents],
+                 evaluating_events: Sequence[RealizedEvents]):
         super().__init__(batches)
         self.sample_count_training = 0
         self.sample_count_evaluating = 0
         self.training_events = training_events
         self.evaluating_events = evaluating_events
 
-    def sample(self) -> RealizedEvents:
+    def sample(self, rng: Optional[numpy.random.Generator] = None) -> RealizedEvents:
+        # the training samples are fixed by the instance, thus rng is not used
         return self._get_training_sample()
 
     def sample_evaluating(self) -> RealizedEvents:
@@ -44,9 +51,9 @@ class EvaluatableEvents(Events):
         return self.evaluating_events[self.sample_count_evaluating - 1]
 
     @classmethod
-    def create_from_ids(cls, batches, nr_samples=1000):
+    def create_from_ids(cls, batches, nr_samples=1000, rng: Optional[numpy.random.Generator] = None):
         events = Events.create(batches)
-        return cls(events.batches, [events.sample() for i in range(nr_samples)], [events.sample() for i in range(nr_samples)])
+        return cls(events.batches, [events.sample(rng) for i in range(nr_samples)], [events.sample(rng) for i in range(nr_samples)])
 
     @staticmethod
     def load_evaluatable_events(filename: str, extension="json", directory=sub_folder("events")):
@@ -72,6 +79,42 @@ class EvaluatableEvents(Events):
             return EvaluatableEvents(ev, training_events, evaluating_events)
 
 
+    @staticmethod
+    def load_packed_events(filename: str, directory=sub_folder("events")):
+        """
+        Loads an instance written in the binary event format (see packedEvents), which is much faster than parsing the
+        json file of the instance.
+        """
+        packed = PackedEvents(sub_folder_file(directory, "{}.{}".format(filename, EXTENSION)))
+        return EvaluatableEvents.from_packed_events(packed)
+
+    @staticmethod
+    def from_packed_events(packed: PackedEvents):
+        # the samples are decoded on demand, see PackedSamples
+        return EvaluatableEvents(packed.batches(),
+                                 PackedSamples(packed, packed.training_sequence(0), packed.nr_training),
+                                 PackedSamples(packed, packed.evaluating_sequence(0), packed.nr_evaluating))
+
+    @staticmethod
+    def load_instance(filename: str, directory=sub_folder("events")):
+        """
+        Loads an instance from the binary event format if it has been converted (see convert_events.py), and from json
+        otherwise.
+        """
+        if os.path.isfile(sub_folder_file(directory, "{}.{}".format(filename, EXTENSION))):
+            return EvaluatableEvents.load_packed_events(filename, directory)
+        return EvaluatableEvents.load_evaluatable_events(filename, directory=directory)
+
+    def write_packed_events(self, filename: str, directory=sub_folder("events")):
+        sequences = [[batch.containers for batch in self.batches]] + \
+                    [[batch.containers for batch in sample.batches] for sample in self.training_events] + \
+                    [[batch.containers for batch in sample.batches] for sample in self.evaluating_events]
+        batch_offsets, containers = pack_sequences(sequences)
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+        write_packed_events(sub_folder_file(directory, "{}.{}".format(filename, EXTENSION)), len(self.batches),
+                            len(self.training_events), len(self.evaluating_events), batch_offsets, containers)
+
     @staticmethod
     def list_to_tuple_of_containers(list_of_containers):
         return tuple([tuple(container) for container in list_of_containers])
@@ -89,13 +132,28 @@ class EvaluatableEvents(Events):
         return [[list(container) for container in batch.containers] for batch in batches]
 
     @classmethod
-    def create_evaluatable_batches(cls, period_slots, dwell_time, number_of_containers, nr_samples=1000):
-        events = generate_events(period_slots, dwell_time, number_of_containers)
-        training_events = [events.sample() for i in range(nr_samples)]
-        evaluating_events = [events.sample() for i in range(nr_samples)]
+    def create_evaluatable_batches(cls, period_slots, dwell_time, number_of_containers, nr_samples=1000,
+                                   rng: Optional[numpy.random.Generator] = None):
+        events = generate_events(period_slots, dwell_time, number_of_containers, rng)
+        training_events = [events.sample(rng) for i in range(nr_samples)]
+        evaluating_events = [events.sample(rng) for i in range(nr_samples)]
         return cls(events.batches, training_events, evaluating_events)
 
 
+    @staticmethod
+    def create_packed_instance(filename: str, period_slots, dwell_time, number_of_containers, nr_samples=1000,
+                               directory=sub_folder("events"), rng: Optional[numpy.random.Generator] = None):
+        """
+        Generates a random instance like create_evaluatable_batches, but writes it directly in the binary event format
+        (see generator.generate_packed_events), which is much faster for large instances.
+        :return: the generated instance
+        """
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+        generate_packed_events(sub_folder_file(directory, "{}.{}".format(filename, EXTENSION)), period_slots,
+                               dwell_time, number_of_containers, nr_samples, rng)
+        return EvaluatableEvents.load_packed_events(filename, directory)
+
 # events = EvaluatableEvents.create_evaluatable_batches(8,3,10)
 # print(EvaluatableEvents.load_evaluatable_events("test"))
 # writeToFile("test", events.write_evaluatable_events(), extension="json")
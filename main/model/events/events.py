@@ -1,4 +1,6 @@
-from typing import Tuple
+from typing import Tuple, Optional
+
+import numpy
 
 from main.model.batch.batch import Batch
 from main.model.events.baseEvents import BaseEvents
@@ -14,8 +16,11 @@ class Events(BaseEvents):
     def create(cls, batches):
         return super().from_ids(cls, Batch, batches)
 
-    def sample(self) -> RealizedEvents:
-        return RealizedEvents(tuple([batch.sample() for batch in self.batches]))
+    def sample(self, rng: Optional[numpy.random.Generator] = None) -> RealizedEvents:
+        """
+        :param rng: random generator used to order the batches, see Batch.sample
+        """
+        return RealizedEvents(tuple([batch.sample(rng) for batch in self.batches]))
 
     def __repr__(self):
         return "[ {} ]".format(", ".join(str(batch) for batch in self.batches))
@@ -0,0 +1,57 @@
+import math
+from bisect import bisect_left, bisect_right
+from typing import List, Sequence, Tuple
+
+
+class FutureArrivals:
+    """
+    Summary of the inbound batches after a given batch number, used by the future_blocking_* features. Built once per
+    batch number (see BaseEvents.future_arrivals), such that the features only need O(log n) lookups per container or
+    stack instead of a scan over all future arrivals.
+    """
+    __slots__ = ['times', 'labels', 'prefix_min']
+
+    def __init__(self, arrivals: Sequence[Tuple[int, Sequence[int]]]):
+        """
+        :param arrivals: (batch number, batch labels of the arriving containers) of the future inbound batches, in
+        order of the batch number
+        """
+        # batch numbers of the future inbound batches, ascending
+        self.times: Tuple[int, ...] = tuple([t for t, _ in arrivals])
+        # per future inbound batch, the sorted batch labels of its containers
+        self.labels: Tuple[Tuple[int, ...], ...] = tuple([tuple(sorted(labels)) for _, labels in arrivals])
+        # prefix_min[j]: lowest batch label arriving in the first j future inbound batches, infinity if none
+        prefix_min: List[float] = [math.inf]
+        for labels in self.labels:
+            prefix_min.append(min(prefix_min[-1], labels[0]) if len(labels) > 0 else prefix_min[-1])
+        self.prefix_min: Tuple[float, ...] = tuple(prefix_min)
+
+    def nr_batches_before(self, t: float) -> int:
+        """
+        :return: number of future inbound batches with a batch number below t
+        """
+        return bisect_left(self.times, t)
+
+    def min_label_before(self, t: float) -> float:
+        """
+        :return: lowest batch label arriving in a future inbound batch with a batch number below t
+        """
+        return self.prefix_min[self.nr_batches_before(t)]
+
+    def count_at_least(self, j: int, label: float) -> int:
+        """
+        :return: number of containers of the j-th future inbound batch with a batch label of at least the given label
+        """
+        labels = self.labels[j]
+        return len(labels) - bisect_left(labels, label)
+
+    def __len__(self):
+        return len(self.times)
+
+
+def successor(sorted_labels: Sequence[int], t: float) -> float:
+    """
+    :return: lowest label strictly above t, infinity if there is none
+    """
+    i = bisect_right(sorted_labels, t)
+    return sorted_labels[i] if i < len(sorted_labels) else math.inf
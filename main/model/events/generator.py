@@ -1,13 +1,18 @@
-from typing import List
+from itertools import chain
+from typing import Iterator, Optional, Tuple
 
 import numpy
 
 from main.model.batch.batch import Batch
-from main.model.dataclass import Container
 from main.model.events.events import Events
+from main.model.events.packedEvents import stream_packed_events
 
+# maximum number of containers permuted at once when the samples are generated
+CHUNK_CONTAINERS = 2 ** 20
 
-def generate_events(period_slots: int, expected_dwell_periods, nr_containers) -> Events:
+
+def generate_events(period_slots: int, expected_dwell_periods, nr_containers,
+                    rng: Optional[numpy.random.Generator] = None) -> Events:
     """
     Generates a random Events. Generation is done as follows. First an arrival period is sampled for all containers.
     This sampling is done uniform over the number of period slots. After that, for each container a dwell time is sampled
@@ -17,30 +22,68 @@ def generate_events(period_slots: int, expected_dwell_periods, nr_containers) ->
     :param period_slots:
     :param expected_dwell_periods:
     :param nr_containers:
+    :param rng: random generator used, a fresh unseeded one by default
     :return:
     """
+    containers, batch_lengths = _generate_containers(period_slots, expected_dwell_periods, nr_containers,
+                                                     numpy.random.default_rng() if rng is None else rng)
+    batch_offsets = numpy.concatenate([[0], numpy.cumsum(batch_lengths)])
+    rows = containers.tolist()
+    return Events(tuple([Batch(i % 2 == 0, tuple([tuple(row) for row in rows[batch_offsets[i]:batch_offsets[i + 1]]]))
+                         for i in range(len(batch_lengths))]))
+
 
-    batches: List[List[Container], ...] = [[] for e in range(period_slots*2)]
+def generate_packed_events(path: str, period_slots: int, expected_dwell_periods, nr_containers, nr_samples: int,
+                           rng: Optional[numpy.random.Generator] = None):
+    """
+    Generates a random instance, as generate_events, together with nr_samples training and nr_samples evaluating
+    samples, and writes it in the binary event format (see packedEvents). The samples are random orders within each
+    batch, drawn for many samples at once and written as they are drawn, thus no Batch or RealizedEvents is created.
+    :param rng: random generator used, a fresh unseeded one by default
+    """
+    rng = numpy.random.default_rng() if rng is None else rng
+    containers, batch_lengths = _generate_containers(period_slots, expected_dwell_periods, nr_containers, rng)
+    # the events and all samples consist of the same batches
+    nr_sequences = 1 + 2 * nr_samples
+    batch_offsets = numpy.zeros(nr_sequences * len(batch_lengths) + 1, dtype=numpy.int64)
+    numpy.cumsum(numpy.tile(batch_lengths, nr_sequences), out=batch_offsets[1:])
+    stream_packed_events(path, len(batch_lengths), nr_samples, nr_samples, batch_offsets,
+                         chain([containers], _sample_orders(containers, batch_lengths, 2 * nr_samples, rng)))
 
-    inbound_batches = numpy.random.randint(period_slots, size=nr_containers)
-    outbound_batches = [int(i) for i in
-                        numpy.random.exponential(expected_dwell_periods, size=nr_containers).round()]
 
-    for i in range(nr_containers):
-        inbound_label = inbound_batches[i]
-        outbound_label = inbound_label + outbound_batches[i]
+def _generate_containers(period_slots: int, expected_dwell_periods, nr_containers, rng: numpy.random.Generator) \
+        -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    :return: the containers of all batches (a row (id, batch label, -1) per container, grouped by batch and ordered by
+    id within a batch) and the number of containers per batch
+    """
+    inbound_labels = rng.integers(period_slots, size=nr_containers)
+    outbound_labels = inbound_labels + rng.exponential(expected_dwell_periods, size=nr_containers).round() \
+        .astype(numpy.int64)
 
-        container: Container = (i, outbound_label, -1)
+    # a container is part of its inbound batch, and of its outbound batch if it is within the planning period
+    departing = outbound_labels < period_slots
+    ids = numpy.concatenate([numpy.arange(nr_containers), numpy.flatnonzero(departing)])
+    batch_indices = numpy.concatenate([inbound_labels * 2, outbound_labels[departing] * 2 + 1])
+    order = numpy.argsort(batch_indices, kind="stable")
 
-        inbound_index = inbound_label * 2
-        outbound_index = outbound_label * 2 + 1
+    containers = numpy.full((len(ids), 3), -1, dtype=numpy.int64)
+    containers[:, 0] = ids[order]
+    containers[:, 1] = outbound_labels[ids[order]]
+    return containers, numpy.bincount(batch_indices, minlength=period_slots * 2)
 
-        batches[inbound_index].append(container)
-        # only add if it is within the planning period
-        if outbound_label < period_slots:
-            batches[outbound_index].append(container)
 
-    return Events(tuple([Batch(i % 2 == 0, tuple(batches[i])) for i in range(len(batches))]))
+def _sample_orders(containers: numpy.ndarray, batch_lengths: numpy.ndarray, nr_samples: int,
+                   rng: numpy.random.Generator) -> Iterator[numpy.ndarray]:
+    """
+    :return: per chunk of samples, the containers of the samples, each a uniformly random order within every batch
+    """
+    # sorting on batch index + a uniform key in [0, 1) keeps the batches together and shuffles within a batch
+    batch_of_row = numpy.repeat(numpy.arange(len(batch_lengths)), batch_lengths)
+    samples_per_chunk = max(1, CHUNK_CONTAINERS // max(1, len(containers)))
+    for first in range(0, nr_samples, samples_per_chunk):
+        keys = rng.random((min(samples_per_chunk, nr_samples - first), len(containers))) + batch_of_row
+        yield containers[numpy.argsort(keys, axis=1)].reshape(-1, 3)
 
 
 # # events = generate_events(10, 2, 100)
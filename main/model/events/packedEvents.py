@@ -0,0 +1,172 @@
+import os
+from collections import OrderedDict
+from typing import Iterable, Sequence, Tuple
+
+import numpy
+
+from main.model.batch.batch import Batch
+from main.model.batch.realizedBatch import RealizedBatch
+from main.model.dataclass import Container
+from main.model.events.realizedEvents import RealizedEvents
+
+MAGIC = b"EVTPACK1"
+EXTENSION = "events"
+# number of decoded samples kept per PackedSamples
+SAMPLE_CACHE_SIZE = 4
+# batches per sequence, number of training samples, number of evaluating samples, number of containers
+HEADER_LENGTH = 4
+OFFSET_DTYPE = numpy.int64
+CONTAINER_DTYPE = numpy.int32
+
+
+def write_packed_events(path: str, batches_per_sequence: int, nr_training: int, nr_evaluating: int,
+                        batch_offsets: numpy.ndarray, containers: numpy.ndarray):
+    """
+    Writes an instance in the binary event format. The instance consists of 1 + nr_training + nr_evaluating sequences
+    of batches_per_sequence batches each: the events themselves, followed by the training and the evaluating samples.
+    Batch i of a sequence is inbound if i is even.
+
+    Layout (little endian): the magic bytes, the header (int64), the batch offsets (int64) and the containers (int32,
+    (id, batch label, order label) per container). The containers of batch b are containers[batch_offsets[b]:
+    batch_offsets[b + 1]], with the batches of all sequences concatenated.
+    :param batch_offsets: offsets of the batches into containers, one more than the total number of batches
+    :param containers: matrix with a row per container
+    """
+    stream_packed_events(path, batches_per_sequence, nr_training, nr_evaluating, batch_offsets, [containers])
+
+
+def stream_packed_events(path: str, batches_per_sequence: int, nr_training: int, nr_evaluating: int,
+                         batch_offsets: numpy.ndarray, container_chunks: Iterable[numpy.ndarray]):
+    """
+    Same as write_packed_events, but the containers are written chunk by chunk as they are produced, such that they
+    never have to be in memory at once.
+    :param container_chunks: consecutive parts of the container matrix, together batch_offsets[-1] rows
+    """
+    nr_batches = (1 + nr_training + nr_evaluating) * batches_per_sequence
+    nr_containers = int(batch_offsets[-1])
+    if len(batch_offsets) != nr_batches + 1:
+        raise ValueError("Batch offsets do not match the number of batches ({})".format(nr_batches))
+    header = numpy.array([batches_per_sequence, nr_training, nr_evaluating, nr_containers], dtype="<i8")
+    written = 0
+    with open(path, "wb") as file:
+        file.write(MAGIC)
+        file.write(header.tobytes())
+        file.write(numpy.ascontiguousarray(batch_offsets, dtype="<i8").tobytes())
+        for chunk in container_chunks:
+            chunk = numpy.ascontiguousarray(chunk, dtype="<i4").reshape(-1, 3)
+            file.write(chunk.tobytes())
+            written += len(chunk)
+    if written != nr_containers:
+        os.remove(path)
+        raise ValueError("Batch offsets do not match the number of containers ({})".format(written))
+
+
+def pack_sequences(sequences: Sequence[Sequence[Sequence[Container]]]) -> Tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    :param sequences: per sequence, per batch, the containers
+    :return: batch offsets and container matrix of the sequences, see write_packed_events
+    """
+    lengths = [len(batch) for sequence in sequences for batch in sequence]
+    batch_offsets = numpy.zeros(len(lengths) + 1, dtype=OFFSET_DTYPE)
+    numpy.cumsum(lengths, out=batch_offsets[1:])
+    containers = numpy.array([container for sequence in sequences for batch in sequence for container in batch],
+                             dtype=CONTAINER_DTYPE).reshape(-1, 3)
+    return batch_offsets, containers
+
+
+class PackedEvents:
+    """
+    Read only, memory mapped view on an instance in the binary event format (see write_packed_events). Opening the
+    file does not read the containers, and all processes that open the same file share its pages. Pickling only
+    transfers the path, the receiving process maps the file itself.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        data = numpy.memmap(path, dtype=numpy.uint8, mode="r")
+        if bytes(data[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a packed events file: {}".format(path))
+        offset = len(MAGIC)
+        header = numpy.frombuffer(data, dtype="<i8", count=HEADER_LENGTH, offset=offset)
+        self.batches_per_sequence, self.nr_training, self.nr_evaluating, nr_containers = [int(h) for h in header]
+        offset += header.nbytes
+
+        nr_batches = (1 + self.nr_training + self.nr_evaluating) * self.batches_per_sequence
+        self.batch_offsets = numpy.frombuffer(data, dtype="<i8", count=nr_batches + 1, offset=offset)
+        offset += self.batch_offsets.nbytes
+        self.containers = numpy.frombuffer(data, dtype="<i4", count=3 * nr_containers, offset=offset) \
+            .reshape(nr_containers, 3)
+
+    def __reduce__(self):
+        return PackedEvents, (self.path,)
+
+    def nr_sequences(self) -> int:
+        return 1 + self.nr_training + self.nr_evaluating
+
+    def training_sequence(self, i: int) -> int:
+        return 1 + i
+
+    def evaluating_sequence(self, i: int) -> int:
+        return 1 + self.nr_training + i
+
+    def batch_array(self, sequence: int, t: int) -> numpy.ndarray:
+        """
+        :return: view on the containers of batch t of the sequence, a row per container
+        """
+        b = sequence * self.batches_per_sequence + t
+        return self.containers[self.batch_offsets[b]:self.batch_offsets[b + 1]]
+
+    def batch_containers(self, sequence: int, t: int) -> Tuple[Container, ...]:
+        return tuple([tuple(container) for container in self.batch_array(sequence, t).tolist()])
+
+    def batches(self) -> Tuple[Batch, ...]:
+        """
+        :return: the batches of the events (the first sequence)
+        """
+        return tuple([Batch(t % 2 == 0, self.batch_containers(0, t)) for t in range(self.batches_per_sequence)])
+
+    def realized_events(self, sequence: int) -> RealizedEvents:
+        return RealizedEvents(tuple([RealizedBatch(t % 2 == 0, self.batch_containers(sequence, t))
+                                     for t in range(self.batches_per_sequence)]))
+
+
+class PackedSamples(Sequence):
+    """
+    Lazy sequence of the training or evaluating samples of a packed instance. A sample is only decoded into a
+    RealizedEvents when it is accessed, and only the most recently accessed samples are kept, thus the memory used does
+    not grow with the number of samples of the instance. Like PackedEvents, pickling only transfers the path.
+    """
+
+    def __init__(self, packed: PackedEvents, first_sequence: int, nr_samples: int, cache_size: int = SAMPLE_CACHE_SIZE):
+        """
+        :param first_sequence: sequence of the first sample, the samples are consecutive sequences
+        """
+        self.packed = packed
+        self.first_sequence = first_sequence
+        self.nr_samples = nr_samples
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+
+    def __reduce__(self):
+        return PackedSamples, (self.packed, self.first_sequence, self.nr_samples, self.cache_size)
+
+    def __len__(self):
+        return self.nr_samples
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.nr_samples))]
+        if i < 0:
+            i += self.nr_samples
+        if not 0 <= i < self.nr_samples:
+            raise IndexError("Sample {} out of range ({} samples)".format(i, self.nr_samples))
+
+        sample = self._cache.get(i)
+        if sample is None:
+            sample = self.packed.realized_events(self.first_sequence + i)
+            self._cache[i] = sample
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(i)
+        return sample
@@ -1,14 +1,13 @@
 import math
-import random
 from statistics import mean, stdev
-from typing import Tuple, Set, List
+from typing import Tuple, Set, List, Optional
 
 import numpy as np
 
 from main.model.adp.valuefunctions.valueFunctionApproximation import ValueFunctionApproximate
 from main.model.batch.realizedBatch import RealizedBatch
 from main.model.dataclass.optimizedOutcomes import terminal_optimized_outcome
-from main.model.dataclass.outcomes import terminal_unique_outcomes
+from main.model.dataclass.beamOutcomes import terminal_beam_outcomes
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
 from main.model.events.realizedEvents import RealizedEvents
@@ -32,8 +31,14 @@ class ADP(Policy):
                  every_th_iteration=10,
                  evaluation_samples=1000,
                  problem_instance=0,
-                 use_optimized_outcomes=False
+                 use_optimized_outcomes=False,
+                 beam_width: Optional[int] = None,
+                 rng: Optional[np.random.Generator] = None
                  ):
+        """
+        :param rng: random generator used for the exploration, a fresh unseeded one by default. Passing a seeded
+        generator makes the learned values reproducible.
+        """
         super().__init__(events, initial_terminal)
         # ADP settings
         self.single = single
@@ -45,6 +50,9 @@ class ADP(Policy):
         self.N = number_sample_iterations
 
         self.use_optimized_outcomes = use_optimized_outcomes
+        # if set, outcomes of a batch are determined using a beam search of the given width instead of enumerating all
+        self.beam_width = beam_width
+        self.rng = np.random.default_rng() if rng is None else rng
 
         # evaluation settings
         self.evaluate = evaluate
@@ -63,34 +71,49 @@ class ADP(Policy):
     def handle_realized_inbound_batch(self, terminal: Terminal, realized_batch: RealizedBatch,
                                       batch_number: int) -> Tuple[Terminal, int]:
         if not self.use_optimized_outcomes:
-            return self._best_choice(terminal_unique_outcomes(terminal, realized_batch), batch_number)
+            return self._best_choice(self.unique_outcomes(terminal, realized_batch, batch_number), batch_number)
         else:
             return terminal_optimized_outcome(terminal, realized_batch, self.value_function_approximator, self.n, batch_number, self.events)[:-1]
 
     def handle_realized_outbound_batch(self, terminal: Terminal, realized_batch: RealizedBatch,
                                        batch_number: int) -> Tuple[Terminal, int]:
         if not self.use_optimized_outcomes:
-            return self._best_choice(terminal_unique_outcomes(terminal, realized_batch), batch_number)
+            return self._best_choice(self.unique_outcomes(terminal, realized_batch, batch_number), batch_number)
         else:
             return terminal_optimized_outcome(terminal, realized_batch, self.value_function_approximator, self.n,
                                               batch_number, self.events)[:-1]
 
+    def unique_outcomes(self, terminal: Terminal, realized_batch: RealizedBatch, batch_number: int) \
+            -> Set[Tuple[Terminal, int]]:
+        # all unique outcomes, or a bounded subset of them when a beam width is set
+        return terminal_beam_outcomes(terminal, realized_batch, self.beam_width, event=self.events, t=batch_number)
+
     def _best_choice(self, outcomes: Set[Tuple[Terminal, int]], current_batch_number: int) \
             -> Tuple[Terminal, int]:
-        min_value = math.inf
-        min_terminal = None
-        min_nr_reshuffles = math.inf
-        for (term, reshuffles) in outcomes:
-            value = reshuffles + self.value_function_approximator.value_approximate(self.n, current_batch_number + 1,
-                                                                                    term, self.events)
-            if value < min_value:
-                min_value = value
-                min_terminal = term
-                min_nr_reshuffles = reshuffles
+        min_terminal, _, min_nr_reshuffles = self._min_outcome(self.n, outcomes, current_batch_number, 1)
         if min_nr_reshuffles == ADP.NO_SOLUTION_COST:
             raise NoSolutionError("No solution for batch {}".format(self.events.batch(current_batch_number)))
         return min_terminal, min_nr_reshuffles
 
+    def _min_outcome(self, iteration: int, outcomes: Set[Tuple[Terminal, int]], batch_number: int,
+                     discount_factor: float) -> Tuple[Optional[Terminal], float, float]:
+        """
+        Outcome minimizing the reshuffles plus the discounted approximate value of the outcome terminal, the values of
+        all outcomes are approximated at once. Ties are broken by the iteration order of the outcomes.
+        :return: the outcome terminal, its value and its number of reshuffles. None, inf and inf if no outcome has a
+        finite value.
+        """
+        outcomes = list(outcomes)
+        if len(outcomes) == 0:
+            return None, math.inf, math.inf
+        state_values = self.value_function_approximator.value_approximate_batch(
+            iteration, batch_number + 1, [term for term, _ in outcomes], self.events)
+        values = np.array([cost for _, cost in outcomes], dtype=float) + discount_factor * state_values
+        i = int(np.argmin(values))
+        if not values[i] < math.inf:
+            return None, math.inf, math.inf
+        return outcomes[i][0], float(values[i]), outcomes[i][1]
+
     ########################################################################################
     # Learning code
     ########################################################################################
@@ -114,7 +137,7 @@ class ADP(Policy):
 
     def _iteration_single_pass(self, iteration: int):
         current_terminal = self.initial_terminal
-        sample: RealizedEvents = self.events.sample()
+        sample: RealizedEvents = self.events.sample(self.rng)
         for t in range(sample.length()):
             try:
                 outcome_terminal, value, _ = self.epsilon_greedy_policy(iteration, current_terminal, sample.batch(t), t)
@@ -126,7 +149,7 @@ class ADP(Policy):
 
     def _iteration_double_pass(self, iteration: int):
         current_terminal = self.initial_terminal
-        sample: RealizedEvents = self.events.sample()
+        sample: RealizedEvents = self.events.sample(self.rng)
         backtrace = []
         for t in range(sample.length()):
             try:
@@ -165,37 +188,26 @@ class ADP(Policy):
         :return: The new state, the experience value of S_t and the number of reshuffles need in order to reach this
         layout. In other words, returns:  S^n_{t+1}, \hat{v}^n_t, #nr_reshuffles
         """
-        min_value = math.inf
-        min_terminal = None
-        min_cost = math.inf
-        for (outcome_terminal, cost) in terminal_unique_outcomes(terminal, realized_batch):
-            # key = (batch_number+1, outcome_terminal.abstract())
-            state_value = self.value_function_approximator.value_approximate(iteration, batch_number + 1,
-                                                                             outcome_terminal, self.events)
-            # state_value = self.approx_values.get(key, self.initial_approximation(batch_number+1, outcome_terminal))
-            value = cost + self.discount_factor * state_value
-            if value < min_value:
-                min_value = value
-                min_terminal = outcome_terminal
-                min_cost = cost
-        return min_terminal, min_value, min_cost
+        return self._min_outcome(iteration, self.unique_outcomes(terminal, realized_batch, batch_number), batch_number,
+                                 self.discount_factor)
 
     def epsilon_greedy_policy(self, iteration: int, terminal: Terminal, realized_batch: RealizedBatch,
                               batch_number: int) \
             -> Tuple[Terminal, float, int]:
         # print("about to handle batch: {}: {}".format(batch_number, realized_batch))
-        p = np.random.random()
+        p = self.rng.random()
         if p < self.epsilon:
             # explore
             if not self.use_optimized_outcomes:
-                outcomes = terminal_unique_outcomes(terminal, realized_batch)
-                outcome_terminal, nr_reshuffles = random.sample(outcomes, 1)[0]
+                # the outcomes are a set, its iteration order is deterministic as terminals hash by zobrist keys
+                outcomes = list(self.unique_outcomes(terminal, realized_batch, batch_number))
+                outcome_terminal, nr_reshuffles = outcomes[self.rng.integers(len(outcomes))]
                 # key = (batch_number+1, outcome_terminal.abstract())
                 state_value = self.value_function_approximator.value_approximate(iteration, batch_number + 1,
                                                                                  outcome_terminal, self.events)
                 value = nr_reshuffles + self.discount_factor * state_value
             else:
-                outcome_terminal, nr_reshuffles, value = terminal_optimized_outcome(terminal, realized_batch, self.value_function_approximator, iteration, batch_number, self.events, True)
+                outcome_terminal, nr_reshuffles, value = terminal_optimized_outcome(terminal, realized_batch, self.value_function_approximator, iteration, batch_number, self.events, True, self.rng)
         else:
             # exploit
             if not self.use_optimized_outcomes:
@@ -3,6 +3,7 @@ from typing import Tuple, Iterator
 
 from main.model.dataclass import StackLocation, Container
 
+from main.model.batch import weighted_permutations
 from main.model.batch.realizedBatch import RealizedBatch
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
@@ -78,20 +79,18 @@ class Heuristic(Policy):
         # abstracted_terminal = initial_terminal.abstract()
 
         value = Decimal(0)
-        permutations = current_batch.unique_permutations()
-        for batch_realization in permutations:
-            if not current_batch.inbound:
-                terminal = initial_terminal.reveal_order(batch_realization).abstract()
-
+        permutations, nr_permutations = weighted_permutations(current_batch.inbound, current_batch.containers,
+                                                              initial_terminal)
+        for batch_realization, revealed_terminal, weight in permutations:
+            # the revealed terminal keeps the container ids, such that the containers of the batch can be located
             if current_batch.inbound:
-                new_terminal, costs = self.handle_realized_inbound_batch(terminal, batch_realization, t)
+                new_terminal, costs = self.handle_realized_inbound_batch(revealed_terminal, batch_realization, t)
             else:
-                new_terminal, costs = self.handle_realized_outbound_batch(terminal, batch_realization, t)
+                new_terminal, costs = self.handle_realized_outbound_batch(revealed_terminal, batch_realization, t)
 
-            value = value + costs + self.__calculate(new_terminal, t + 1)
+            value = value + weight * (costs + self.__calculate(new_terminal, t + 1))
 
-        # expected_value = value * (1.0 / len(permutations))
-        expected_value = value / len(permutations)
+        expected_value = value / nr_permutations
 
         self.cache[(t, initial_terminal.abstract())] = expected_value
 
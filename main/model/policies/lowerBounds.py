@@ -0,0 +1,135 @@
+"""
+Lower bounds on the expected number of reshuffles still needed from a terminal, used by PBFS to prune decisions. All
+bounds share the signature of the feature functions: bound(terminal, events, t), with t the current batch number.
+
+A bound is admissible when it never exceeds the expected number of reshuffles from the terminal on, pruning with an
+admissible bound does not change the solution of PBFS.
+"""
+from typing import Callable, List, Optional, Set, Tuple
+
+from main.model.adp.valuefunctions.features.blockingContainers import blocking_containers
+from main.model.dataclass import Container
+from main.model.dataclass.block import Block
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+
+LowerBound = Callable[[Terminal, Events, int], float]
+# (block index, stack index, tier)
+Position = Tuple[int, int, int]
+
+
+def stack_blocking(terminal: Terminal, events: Events, t: int) -> float:
+    """
+    Bound of (Galle et.al., 2018) summed over all stacks, see Stack.blocking_lowerbound. Only considers containers that
+    are blocked within their own stack.
+    """
+    return blocking_containers(terminal, events, t)
+
+
+def bay_blocking(terminal: Terminal, events: Events, t: int) -> float:
+    """
+    Extends stack_blocking with the blocking of the reach stacker (see Block.blocking_containers). A container c that is
+    retrieved before all containers above the diagonal of c (in the neighbouring stacks on an approach side) can only be
+    retrieved after either c or one of these containers is reshuffled. Each such group that does not contain a container
+    already counted by stack_blocking needs a reshuffle of its own, as long as the groups are disjoint.
+    """
+    nr_retrieved_labels = _nr_retrieved_labels(events)
+    counted: Set[Position] = set()
+    groups: List[Set[Position]] = []
+    for block_index in range(len(terminal.blocks)):
+        block = terminal.blocks[block_index]
+        for stack_index in range(len(block.stacks)):
+            containers = block.stacks[stack_index].containers
+            # containers with a positive term in the bound of Galle
+            min_label = None
+            for tier in range(len(containers)):
+                label = containers[tier][1]
+                if min_label is not None and label >= min_label:
+                    counted.add((block_index, stack_index, tier))
+                min_label = label if min_label is None else min(min_label, label)
+
+            for tier in range(len(containers)):
+                if containers[tier][1] < nr_retrieved_labels:
+                    group = _blocking_group(block, block_index, stack_index, tier)
+                    if group is not None:
+                        groups.append(group)
+
+    # disjoint groups without counted containers, small groups first to fit as many as possible
+    extra = 0
+    used = counted
+    for group in sorted(groups, key=len):
+        if used.isdisjoint(group):
+            used = used | group
+            extra += 1
+    return stack_blocking(terminal, events, t) + extra
+
+
+class Maximum:
+    """
+    Maximum of several bounds, admissible if all bounds are. A class rather than a closure, such that it can be passed
+    to worker processes.
+    """
+
+    def __init__(self, *bounds: LowerBound):
+        self.bounds = bounds
+
+    def __call__(self, terminal: Terminal, events: Events, t: int) -> float:
+        return max([bound(terminal, events, t) for bound in self.bounds])
+
+
+def bound_name(bound: LowerBound) -> str:
+    """
+    :return: identifier of the bound that is stable over runs, e.g. to tell apart solutions found with different bounds
+    """
+    if isinstance(bound, Maximum):
+        return "max({})".format(", ".join([bound_name(b) for b in bound.bounds]))
+    return "{}.{}".format(bound.__module__, getattr(bound, "__qualname__", type(bound).__qualname__))
+
+
+def _nr_retrieved_labels(events: Events) -> int:
+    # batch label i is retrieved by the outbound batch at index 2i + 1, other containers remain in the terminal
+    return events.length() // 2
+
+
+def _retrieved_later(container: Container, target: Container) -> bool:
+    """
+    :return: whether the container is certainly retrieved after the target (if at all)
+    """
+    if container[1] != target[1]:
+        return container[1] > target[1]
+    # order labels are revealed for a complete batch at once
+    return target[2] >= 0 and container[2] > target[2]
+
+
+def _side_blocking(block: Block, block_index: int, stack_index: int, tier: int, neighbour_indices, target: Container) \
+        -> Set[Position]:
+    # same as Block.blocking_containers for a single approach side, restricted to containers retrieved after the target
+    result = set()
+    for neighbour_index in neighbour_indices:
+        allowed_tier = tier - abs(stack_index - neighbour_index)
+        containers = block.stacks[neighbour_index].containers
+        above = block.stacks[neighbour_index].containers_above(allowed_tier)
+        for above_tier in range(len(containers) - len(above), len(containers)):
+            if _retrieved_later(containers[above_tier], target):
+                result.add((block_index, neighbour_index, above_tier))
+    return result
+
+
+def _blocking_group(block: Block, block_index: int, stack_index: int, tier: int) -> Optional[Set[Position]]:
+    """
+    :return: the target container and the containers that block it from every approach side, of which at least one is
+    reshuffled before the target is retrieved. None if the target might be retrieved without reshuffles.
+    """
+    target = block.stacks[stack_index].containers[tier]
+    left = _side_blocking(block, block_index, stack_index, tier, range(stack_index), target)
+    if len(left) == 0:
+        return None
+    group = left
+    if block.two_way:
+        right = _side_blocking(block, block_index, stack_index, tier,
+                               range(len(block.stacks) - 1, stack_index, -1), target)
+        if len(right) == 0:
+            return None
+        group = group | right
+    group.add((block_index, stack_index, tier))
+    return group
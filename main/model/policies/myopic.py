@@ -1,13 +1,13 @@
 import math
-from queue import PriorityQueue
-from typing import Tuple, Set
+from typing import Tuple, Set, Optional
 
 from main.model.batch import RealizedBatch
-from main.model.dataclass.outcomes import terminal_unique_outcomes, store_locations, handle_outbound_container
+from main.model.dataclass.outboundSearch import solve_outbound_batch, SearchStatistics
+from main.model.dataclass.outcomes import terminal_unique_outcomes, store_locations
 from main.model.dataclass.terminal import Terminal
 from main.model.noSolutionError import NoSolutionError
 from main.model.policies.policy import Policy
-from main.model.util.prioritizedItem import PrioritizedItem
+from main.model.util.frontier import Frontier
 
 
 class Myopic(Policy):
@@ -23,15 +23,13 @@ class Myopic(Policy):
 
 def lowest_inbound_outcome(initial_terminal: Terminal, batch: RealizedBatch) -> Tuple[Terminal, int]:
     # q = ((reshuffles, -i)), term)
-    q = PriorityQueue()
-    q.put(PrioritizedItem((0, 0), initial_terminal))
+    q = Frontier()
+    q.push((0, 0), initial_terminal)
     abstract_added = set()
 
     while not q.empty():
-        item = q.get(block=False)
-        (reshuffles, i) = item.priority
+        (reshuffles, i), terminal = q.pop()
         i = -i
-        terminal = item.item
 
         # check if this is end state
         if i == batch.length():
@@ -45,38 +43,11 @@ def lowest_inbound_outcome(initial_terminal: Terminal, batch: RealizedBatch) ->
                 if new_term_abstracted not in abstract_added:
                     new_i = i + 1
                     abstract_added.add(new_term_abstracted)
-                    q.put(PrioritizedItem((reshuffles, -new_i), new_term))
+                    q.push((reshuffles, -new_i), new_term)
 
     raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}".format(batch, initial_terminal))
 
 
-def lowest_outbound_outcome(initial_terminal: Terminal, batch: RealizedBatch) -> Tuple[Terminal, int]:
-    # q = ((reshuffles, -i)), term)
-    q = PriorityQueue()
-    q.put(PrioritizedItem((0, 0), initial_terminal))
-    abstract_added = set()
-
-    while not q.empty():
-        item = q.get(block=False)
-        (reshuffles, i) = item.priority
-        i = -i
-        terminal = item.item
-
-        # check if this is end state
-        if i == batch.length():
-            return terminal, reshuffles
-        else:
-            # not yet explored, need to add children to queue
-            current_container = batch.containers[i]
-            # store_outcomes = __store_locations(terminal, current_container, None)
-            handling_outcomes, is_reshuffle = handle_outbound_container(terminal, current_container)
-            new_i = i + int(not is_reshuffle)
-            new_reshuffles = reshuffles + int(is_reshuffle)
-            for new_term in handling_outcomes:
-                new_term_abstracted = new_term.abstract()
-                if new_term_abstracted not in abstract_added:
-                    abstract_added.add(new_term_abstracted)
-                    q.put(PrioritizedItem((new_reshuffles, -new_i), new_term))
-
-    raise NoSolutionError("Could not find suitable solutions for batch: {}\n terminal:\n{}".format(batch, initial_terminal))
-
+def lowest_outbound_outcome(initial_terminal: Terminal, batch: RealizedBatch,
+                            statistics: Optional[SearchStatistics] = None) -> Tuple[Terminal, int]:
+    return solve_outbound_batch(initial_terminal, batch, statistics=statistics)
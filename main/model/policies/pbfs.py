@@ -1,38 +1,129 @@
 import math
-from decimal import Decimal
-from queue import PriorityQueue
-from typing import Tuple, Set
+from multiprocessing import Pool
+from typing import Callable, Tuple, Set, Optional
 
 from main.model.adp.valuefunctions.features.blockingContainers import blocking_containers
-from main.model.batch import unique_permutations
+from main.model.batch import weighted_permutations
 from main.model.batch.realizedBatch import RealizedBatch
-from main.model.dataclass.outcomes import terminal_unique_outcomes, handle_outbound_container, store_locations
+from main.model.dataclass.beamOutcomes import terminal_beam_outcomes
+from main.model.dataclass.outboundSearch import solve_outbound_batch, SearchStatistics
 from main.model.dataclass.terminal import Terminal
 from main.model.events.events import Events
-from main.model.noSolutionError import NoSolutionError
+from main.model.policies.lowerBounds import LowerBound, bound_name
+from main.model.policies.pbfsSearch import PBFSSearch
 from main.model.policies.policy import Policy
-from main.model.util.prioritizedItem import PrioritizedItem
-
+from main.model.util.solutionStore import SolutionStore, instance_hash
+from main.model.util.transpositionTable import TranspositionTable, DEPTH
 
 
+def _solve_permutation(args) -> Tuple[float, TranspositionTable, int]:
+    """
+    Solves the decision problem of a single realization of the first batch, run within a worker process.
+    :return: the value of the realization, the cache filled while solving it and the number of expanded nodes
+    """
+    events, terminal, realized_batch, lower_bound_function, beam_width, max_entries, eviction = args
+    pbfs = PBFS(events, terminal, beam_width, solve=False, max_entries=max_entries, eviction=eviction,
+                lower_bound_function=lower_bound_function)
+    value = pbfs.pbfs_decision(events, realized_batch.inbound, 0, 0, realized_batch, terminal, lower_bound_function)
+    return value, pbfs.cache_chance, pbfs.expanded_nodes
 
 
 class PBFS(Policy):
 
-    def __init__(self, events: Events, initial_terminal: Terminal):
+    def __init__(self, events: Events, initial_terminal: Terminal, beam_width: Optional[int] = None,
+                 processes: Optional[int] = None, solve: bool = True, max_entries: Optional[int] = None,
+                 eviction: str = DEPTH, drop_passed: bool = False, store: Optional[SolutionStore] = None,
+                 lower_bound_function: Optional[LowerBound] = None, time_limit: Optional[float] = None,
+                 progress: Optional[Callable[[PBFSSearch], None]] = None):
+        """
+        :param beam_width: if set, only the beam_width children with the lowest lower bound are explored at each decision
+        :param processes: if larger than 1, the realizations of the first batch are solved in parallel by a pool of the
+        given size. Can not be used from within a daemonic (pool) process.
+        :param solve: whether the cache is filled on construction
+        :param max_entries: maximum number of cached expected values, None for no maximum. Evicted values are recomputed
+        when they are needed while handling a batch.
+        :param eviction: eviction policy of the cache, see TranspositionTable
+        :param drop_passed: whether the cached values of the time steps before a handled batch are dropped. Only suited
+        for handling a single realization of the events, as the values are recomputed for every next realization.
+        :param store: persistent store of solved values. Values of an earlier run on the same instance are looked up
+        instead of solved, newly solved values are saved to the store as they are evicted or dropped from the cache and
+        once solving is done. Values missing from a store that is not marked complete are recomputed when they are
+        needed while handling a batch.
+        :param lower_bound_function: admissible lower bound used to prune decisions, see lowerBounds. By default
+        lower_bound_reshuffles_blocking.
+        :param time_limit: maximum number of seconds spent solving on construction. If the search is not done within the
+        limit, it is paused and can be continued by resume. The bounds found so far are available in the search.
+        :param progress: called with the search every second while solving
+        """
         super().__init__(events, initial_terminal)
-        self.cache_chance = {}
-        # fill the cache
-        self.solve(self.events, self.initial_terminal, PBFS.lower_bound_reshuffles_blocking)
+        self.beam_width = beam_width
+        self.processes = processes
+        self.drop_passed = drop_passed
+        self.lower_bound_function = PBFS.lower_bound_reshuffles_blocking if lower_bound_function is None \
+            else lower_bound_function
+        self.store = store
+        # the bound decides which children the beam keeps, thus which values are solved
+        self.instance = None if store is None else instance_hash(events, initial_terminal, beam_width,
+                                                                  bound_name(self.lower_bound_function))
+        self.cache_chance = TranspositionTable(max_entries, eviction, None if store is None else self.__persist)
+        # number of decision nodes expanded while solving
+        self.expanded_nodes = 0
+        # node counts of the searches solving the last batch
+        self.last_batch_statistics = SearchStatistics()
+        # whether the store holds values of this instance
+        self.warm = store is not None and store.contains_instance(self.instance)
+        # whether a value missing from the store was never solved, rather than lost by an earlier run
+        self.warm_complete = self.warm and store.is_complete(self.instance)
+        # whether values were evicted without being saved, by the caches of parallel workers
+        self.lost = False
+        self.time_limit = time_limit
+        self.progress = progress
+        # search of the root, None if the root is solved otherwise
+        self.search: Optional[PBFSSearch] = None
+        if solve:
+            # fill the cache
+            self.solve(self.events, self.initial_terminal, self.lower_bound_function)
+            self.__solved()
+
+    def resume(self, time_limit: Optional[float] = None) -> bool:
+        """
+        Continues a search paused by the time limit.
+        :return: whether the search is done
+        """
+        if self.search is not None and not self.search.done():
+            self.search.run(time_limit, self.progress)
+            self.__solved()
+        return self.search is None or self.search.done()
+
+    def __solved(self):
+        if self.search is not None and not self.search.done():
+            print("PBFS: Paused, expected reshuffles within {}".format(self.search.bounds()))
+            return
+        if self.store is not None:
+            self.store.save(self.instance, self.cache_chance.items())
+            if not self.lost and (not self.warm or self.warm_complete):
+                self.store.mark_complete(self.instance)
         print("PBFS: Done calculating")
 
+    def handle_realized_batch(self, terminal: Terminal, realized_batch: RealizedBatch, batch_number: int) \
+            -> Tuple[Terminal, int]:
+        if self.drop_passed:
+            # only the values of the outcomes of this batch and later batches can still be looked up
+            self.cache_chance.drop_before(batch_number + 1)
+        return super().handle_realized_batch(terminal, realized_batch, batch_number)
+
     def handle_realized_inbound_batch(self, terminal: Terminal, realized_batch: RealizedBatch, batch_number: int) \
             -> Tuple[Terminal, int]:
-        return self.__get_best_expected_terminal(terminal_unique_outcomes(terminal, realized_batch), batch_number)
+        return self.__get_best_expected_terminal(self.__outcomes(terminal, realized_batch, batch_number), batch_number)
 
     def handle_realized_outbound_batch(self, terminal: Terminal, realized_batch: RealizedBatch, batch_number: int) \
             -> Tuple[Terminal, int]:
-        return self.__get_best_expected_terminal(terminal_unique_outcomes(terminal, realized_batch), batch_number)
+        return self.__get_best_expected_terminal(self.__outcomes(terminal, realized_batch, batch_number), batch_number)
+
+    def __outcomes(self, terminal: Terminal, realized_batch: RealizedBatch, batch_number: int) \
+            -> Set[Tuple[Terminal, int]]:
+        return terminal_beam_outcomes(terminal, realized_batch, self.beam_width, self.lower_bound_function,
+                                      self.events, batch_number)
 
     def __get_best_expected_terminal(self, outcomes: Set[Tuple[Terminal, int]], batch_number: int) \
             -> Tuple[Terminal, int]:
@@ -41,9 +132,12 @@ class PBFS(Policy):
         min_value = math.inf
         min_nr_reshuffles = math.inf
         for new_terminal, nr_reshuffles in outcomes:
-            key = (batch_number+1, new_terminal.abstract())
-            if key in self.cache_chance:
-                expected_reshuffles = self.cache_chance[key]
+            expected_reshuffles = self.cached_value(batch_number+1, new_terminal)
+            if expected_reshuffles is None and not self.__complete():
+                # the value might have been evicted, dropped or lost by the run that filled the store
+                expected_reshuffles = self.pbfs_chance(self.events, batch_number+1, new_terminal,
+                                                       self.lower_bound_function)
+            if expected_reshuffles is not None:
                 value = nr_reshuffles + expected_reshuffles
                 if value < min_value:
                     min_term = new_terminal
@@ -52,133 +146,90 @@ class PBFS(Policy):
         # handling an inbound move does not yield any new reshuffles
         return min_term, min_nr_reshuffles
 
-    def solve(self, events: Events, initial_terminal: Terminal, lower_bound_function) -> Decimal:
-        return self.pbfs_chance(events, 0, initial_terminal, lower_bound_function)
-
-    def pbfs_chance(self, events: Events, t: int, initial_terminal: Terminal, lower_bound_function) -> Decimal:
-        # print("pbfs_chance {}".format(t))
-        if t == events.length():
-            # all events explored, thus done
-            value = Decimal(0)
-            abstracted = initial_terminal.abstract()
-            if not (t, abstracted) in self.cache_chance:
-                self.cache_chance[(t, abstracted)] = value
-
+    def __persist(self, t: int, key: int, value: float):
+        self.store.put(self.instance, t, key, value)
+
+    def __complete(self) -> bool:
+        """
+        :return: whether a value missing from both the cache and the store was pruned, such that it need not be computed
+        """
+        return self.cache_chance.complete() and (not self.warm or self.warm_complete)
+
+    def cached_value(self, t: int, terminal: Terminal) -> Optional[float]:
+        """
+        :return: the expected number of reshuffles from time step t on, from the cache or else from the store. None if
+        neither holds the value.
+        """
+        value = self.cache_chance.get(t, terminal)
+        if value is None and self.warm:
+            value = self.store.get(self.instance, t, terminal.zobrist)
+            if value is not None:
+                self.cache_chance.store(t, terminal, value)
+        return value
+
+    def solve(self, events: Events, initial_terminal: Terminal, lower_bound_function) -> Optional[float]:
+        """
+        :return: the expected number of reshuffles, None if the search is paused by the time limit
+        """
+        value = self.cached_value(0, initial_terminal)
+        if value is not None and not math.isinf(value):
             return value
-
-        current_batch = events.batch(t)
-
-        abstract_terminal = initial_terminal.abstract()
-        if (t, abstract_terminal) in self.cache_chance and not self.cache_chance[(t, abstract_terminal)].is_infinite():
-            expected_value = self.cache_chance[(t, abstract_terminal)]
-        else:
-            value = Decimal(0)
-            permutations = unique_permutations(current_batch.inbound, current_batch.containers)
-            for realized_batch in permutations:
-                if current_batch.inbound:
-                    terminal = initial_terminal
-                else:
-                    # terminal = initial_terminal.reveal_order(realized_batch.containers).abstract()
-                    terminal = initial_terminal.reveal_order(realized_batch.containers)
-                intermediary_value = self.pbfs_decision(events, current_batch.inbound, t, 0, realized_batch, terminal, lower_bound_function)
-
-                value += intermediary_value
-
-            # expected_value = value * (1.0 / len(permutations))
-            expected_value = value / len(permutations)
-            self.cache_chance[(t, initial_terminal.abstract())] = expected_value
-
+        if self.processes is not None and self.processes > 1 and events.length() > 0:
+            return self.pbfs_chance_parallel(events, initial_terminal, lower_bound_function)
+        self.search = PBFSSearch.chance(self, events, 0, initial_terminal, lower_bound_function)
+        self.search.run(self.time_limit, self.progress)
+        return self.search.value
+
+    def pbfs_chance_parallel(self, events: Events, initial_terminal: Terminal, lower_bound_function) -> float:
+        """
+        Same as pbfs_chance for t=0, but the realizations of the first batch are independent subproblems and are solved
+        by a pool of processes. The caches of the workers are merged afterwards.
+        """
+        current_batch = events.batch(0)
+        permutations, nr_permutations = weighted_permutations(current_batch.inbound, current_batch.containers,
+                                                              initial_terminal)
+        jobs = []
+        for realized_batch, terminal, _ in permutations:
+            jobs.append((events, terminal, realized_batch, lower_bound_function, self.beam_width,
+                         self.cache_chance.max_entries, self.cache_chance.policy))
+
+        with Pool(min(self.processes, len(jobs))) as pool:
+            results = pool.map(_solve_permutation, jobs)
+
+        value = 0.0
+        for (_, _, weight), (intermediary_value, cache, expanded_nodes) in zip(permutations, results):
+            value += weight * intermediary_value
+            self.cache_chance.merge(cache)
+            self.lost = self.lost or not cache.complete()
+            self.expanded_nodes += expanded_nodes
+
+        expected_value = value / nr_permutations
+        self.cache_chance.store(0, initial_terminal, expected_value)
         return expected_value
 
+    def pbfs_chance(self, events: Events, t: int, initial_terminal: Terminal, lower_bound_function) -> float:
+        """
+        :return: the expected number of reshuffles from batch t on
+        """
+        search = PBFSSearch.chance(self, events, t, initial_terminal, lower_bound_function)
+        search.run()
+        return search.value
+
     def pbfs_decision(self, events: Events, inbound: bool, t: int, k: int, realized_batch: RealizedBatch,
-                      init_terminal: Terminal, lower_bound_function) -> Decimal:
-        # print("decision {}, {}".format(t, k))
-        if k == realized_batch.length():
-            # check if we completed the batch
-            return self.pbfs_chance(events, t+1, init_terminal, lower_bound_function)
-        elif t == events.length() - 1:
-            # check if this is the last batch, can be solved using A* as problem is fully known
-            # return  # calculate number of reshuffles using A* if batch is outbound, else return reshuffles
-            try:
-                term, value = self.handle_last_batch(realized_batch, init_terminal)
-                # the expected reshuffles after handling the last batch is equal to zero (as no containers are left to
-                # handle anymore.
-                if not (t+1, term.abstract()) in self.cache_chance:
-                    self.cache_chance[(t+1, term.abstract())] = value
-                return value
-            except NoSolutionError:
-                return Decimal('Infinity')
-        else:
-            if inbound:
-                # outcomes = init_terminal.get_unique_moves(batch_realized[k - 1])
-                outcomes = store_locations(init_terminal, realized_batch.containers[k - 1], None)
-                if len(outcomes) == 0:
-                    # print("no store locations available")
-                    return Decimal('Infinity')
-                is_reshuffle = False
-            else:
-                # outcomes, is_reshuffle = init_terminal.handle_container_or_reshuffle(batch_realized[k - 1])
-                outcomes, is_reshuffle = handle_outbound_container(init_terminal, realized_batch.containers[k - 1])
-
-            # determine lowerbounds of the possible terminal outcomes of the handle or reshuffle
-            sorted_lower_bounds = PriorityQueue()
-            for term in outcomes:
-                sorted_lower_bounds.put(PrioritizedItem(lower_bound_function(term, events, t), term))
-
-            # update k if a container in the batch is handled. Do not update when a reshuffle has taken place
-            new_k = k + int(not is_reshuffle)
-
-            n_1 = sorted_lower_bounds.get(block=False).item
-            min_value = self.pbfs_decision(events, inbound, t, new_k, realized_batch, n_1, lower_bound_function)
-            while not sorted_lower_bounds.empty():
-                item = sorted_lower_bounds.get(block=False)
-                lower_bound = item.priority
-                term = item.item
-                if lower_bound >= min_value:
-                    # lowerbound of item is worse (or equal (can only get worse)) than the actual currently min value
-                    # found. No need to explore
-                    break
-                # term = term.abstract()
-                # abstracted_term = term.abstract()
-                value = self.pbfs_decision(events, inbound, t, new_k, realized_batch, term, lower_bound_function)
-                min_value = min(min_value, value)
-
-            return int(is_reshuffle) + min_value
+                      init_terminal: Terminal, lower_bound_function) -> float:
+        """
+        :return: the minimal expected number of reshuffles from the k-th container of the realized batch t on
+        """
+        search = PBFSSearch.decision(self, events, t, k, inbound, realized_batch, init_terminal, lower_bound_function)
+        search.run()
+        return search.value
 
     @staticmethod
-    def handle_last_batch(realized_batch: RealizedBatch, initial_terminal: Terminal) -> Tuple[Terminal, Decimal]:
+    def handle_last_batch(realized_batch: RealizedBatch, initial_terminal: Terminal,
+                          statistics: Optional[SearchStatistics] = None) -> Tuple[Terminal, float]:
         if realized_batch.inbound:
             raise RuntimeError("last batch should nto be an inbound batch")
-        else:
-            # (nr_reshuffles, -i), term
-            q = PriorityQueue()
-            q.put(PrioritizedItem((Decimal(0), 0), initial_terminal))
-
-            while not q.empty():
-                item = q.get()
-                term: Terminal = item.item
-                (reshuffles, i) = item.priority
-                i = abs(i)
-
-                # check if done
-                if i == realized_batch.length():
-                    return term, reshuffles
-
-                current_container = realized_batch.containers[i]
-                current_block, current_stack, current_tier = term.container_location(current_container)
-                blocking_containers = term.blocking_containers((current_block, current_stack, current_tier))
-
-                if len(blocking_containers) > 0:
-                    # try all reshuffle locations
-                    term, container = term.retrieve_container((current_block, current_stack))
-                    for reshuffle_term in store_locations(term, container, (current_block, current_stack, current_tier)):
-                        q.put(PrioritizedItem((reshuffles+1, -i), reshuffle_term))
-                else:
-                    # retrieve current container in batch
-                    new_term = term.retrieve_container((current_block, current_stack))[0]
-                    q.put(PrioritizedItem((reshuffles, -(i+1)), new_term))
-
-            raise NoSolutionError("No solution found")
+        return solve_outbound_batch(initial_terminal, realized_batch, statistics=statistics)
 
     @staticmethod
     def lower_bound_reshuffles_blocking(terminal: Terminal, event: Events, t: int):
@@ -0,0 +1,287 @@
+import math
+import time
+from typing import Callable, List, Optional, Tuple
+
+from main.model.batch import weighted_permutations
+from main.model.batch.realizedBatch import RealizedBatch
+from main.model.dataclass.outcomes import handle_outbound_container, store_locations
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+from main.model.noSolutionError import NoSolutionError
+from main.model.util.frontier import Frontier
+
+Bounds = Tuple[float, float]
+
+
+class _Chance:
+    """
+    Call of a chance node: the expected value over the realizations of batch t.
+    """
+    __slots__ = ['t', 'terminal']
+
+    def __init__(self, t: int, terminal: Terminal):
+        self.t = t
+        self.terminal = terminal
+
+
+class _Decision:
+    """
+    Call of a decision node: the minimal value over the moves of the k-th container of a realized batch.
+    """
+    __slots__ = ['t', 'k', 'inbound', 'realized_batch', 'terminal']
+
+    def __init__(self, t: int, k: int, inbound: bool, realized_batch: RealizedBatch, terminal: Terminal):
+        self.t = t
+        self.k = k
+        self.inbound = inbound
+        self.realized_batch = realized_batch
+        self.terminal = terminal
+
+
+class _ChanceFrame:
+    __slots__ = ['t', 'terminal', 'inbound', 'permutations', 'nr_permutations', 'index', 'value']
+
+    def __init__(self, t: int, terminal: Terminal, inbound: bool, permutations: List[Tuple[RealizedBatch, Terminal, int]],
+                 nr_permutations: int):
+        self.t = t
+        self.terminal = terminal
+        self.inbound = inbound
+        self.permutations = permutations
+        self.nr_permutations = nr_permutations
+        # number of realizations started, all but the last one are solved
+        self.index = 0
+        # weighted sum of the values of the solved realizations
+        self.value = 0.0
+
+
+class _DecisionFrame:
+    __slots__ = ['call', 'frontier', 'new_k', 'is_reshuffle', 'min_value', 'explored']
+
+    def __init__(self, call: _Decision, frontier: Frontier, new_k: int, is_reshuffle: bool):
+        self.call = call
+        # children that are not explored yet, by lower bound
+        self.frontier = frontier
+        self.new_k = new_k
+        self.is_reshuffle = is_reshuffle
+        # lowest value of the solved children, None before the first child is solved
+        self.min_value: Optional[float] = None
+        self.explored = 0
+
+
+class PBFSSearch:
+    """
+    Explicit stack implementation of the expectimin search of PBFS. The search alternates chance nodes (the expected
+    value over the realizations of a batch) and decision nodes (the best move for the next container of a realization),
+    in the same order and with the same pruning as the recursive formulation. As the frames are kept on a list rather
+    than the call stack, long event horizons do not hit the recursion limit, and the search can be paused and resumed.
+    While paused, bounds on the value of the root can be derived from the frames (anytime search).
+
+    Values are stored in the cache of the PBFS instance, exactly as the recursive formulation would.
+    """
+
+    def __init__(self, pbfs, events: Events, root, lower_bound_function):
+        """
+        :param pbfs: PBFS instance whose cache and settings are used
+        :param root: _Chance or _Decision call to solve
+        """
+        self.pbfs = pbfs
+        self.events = events
+        self.lower_bound_function = lower_bound_function
+        self.stack: List = []
+        # value returned by the last finished frame, not yet passed to the frame below it
+        self.child_value: Optional[float] = None
+        self.value: Optional[float] = None
+        self.elapsed = 0.0
+        self.__call(root)
+
+    @classmethod
+    def chance(cls, pbfs, events: Events, t: int, terminal: Terminal, lower_bound_function):
+        return cls(pbfs, events, _Chance(t, terminal), lower_bound_function)
+
+    @classmethod
+    def decision(cls, pbfs, events: Events, t: int, k: int, inbound: bool, realized_batch: RealizedBatch,
+                 terminal: Terminal, lower_bound_function):
+        return cls(pbfs, events, _Decision(t, k, inbound, realized_batch, terminal), lower_bound_function)
+
+    def done(self) -> bool:
+        return len(self.stack) == 0
+
+    def depth(self) -> int:
+        return len(self.stack)
+
+    def run(self, time_limit: Optional[float] = None, progress: Optional[Callable] = None,
+            progress_interval: float = 1.0) -> bool:
+        """
+        Continues the search.
+        :param time_limit: maximum number of seconds to search, None to search until done
+        :param progress: called with this search every progress_interval seconds
+        :param progress_interval: number of seconds between progress reports
+        :return: whether the search is done, the value is then available in the value attribute
+        """
+        start = time.time()
+        deadline = None if time_limit is None else start + time_limit
+        next_report = start + progress_interval
+        steps = 0
+        while len(self.stack) > 0:
+            steps += 1
+            # the clock is only read every few steps
+            if steps % 64 == 0 and (deadline is not None or progress is not None):
+                now = time.time()
+                if progress is not None and now >= next_report:
+                    self.elapsed += now - start
+                    start = now
+                    progress(self)
+                    next_report = now + progress_interval
+                if deadline is not None and now >= deadline:
+                    break
+
+            frame = self.stack[-1]
+            child_value, self.child_value = self.child_value, None
+            if isinstance(frame, _ChanceFrame):
+                result = self.__step_chance(frame, child_value)
+            else:
+                result = self.__step_decision(frame, child_value)
+
+            if isinstance(result, (_Chance, _Decision)):
+                self.__call(result)
+            else:
+                self.stack.pop()
+                self.__return(result)
+        self.elapsed += time.time() - start
+        return self.done()
+
+    def bounds(self) -> Bounds:
+        """
+        :return: lower and upper bound on the value of the root. The upper bound stays infinite until a value is known
+        for every realization of the first batch.
+        """
+        if self.done():
+            return self.value, self.value
+        child = None if self.child_value is None else (self.child_value, self.child_value)
+        for frame in reversed(self.stack):
+            if isinstance(frame, _ChanceFrame):
+                child = self.__chance_bounds(frame, child)
+            else:
+                child = self.__decision_bounds(frame, child)
+        return child
+
+    def __call(self, call):
+        # either the value of the call is known immediately, or a frame is pushed
+        if isinstance(call, _Chance):
+            frame_or_value = self.__enter_chance(call)
+        else:
+            frame_or_value = self.__enter_decision(call)
+        if isinstance(frame_or_value, (_ChanceFrame, _DecisionFrame)):
+            self.stack.append(frame_or_value)
+        else:
+            self.__return(frame_or_value)
+
+    def __return(self, value: float):
+        if len(self.stack) == 0:
+            self.value = value
+        else:
+            self.child_value = value
+
+    def __enter_chance(self, call: _Chance):
+        t, terminal = call.t, call.terminal
+        if t == self.events.length():
+            # all events explored, thus done
+            if not (t, terminal) in self.pbfs.cache_chance:
+                self.pbfs.cache_chance.store(t, terminal, 0.0)
+            return 0.0
+
+        expected_value = self.pbfs.cached_value(t, terminal)
+        if expected_value is not None and not math.isinf(expected_value):
+            return expected_value
+
+        current_batch = self.events.batch(t)
+        # orderings that lead to the same subproblem are solved once and weighted by their number
+        permutations, nr_permutations = weighted_permutations(current_batch.inbound, current_batch.containers,
+                                                              terminal)
+        return _ChanceFrame(t, terminal, current_batch.inbound, permutations, nr_permutations)
+
+    def __step_chance(self, frame: _ChanceFrame, child_value: Optional[float]):
+        if child_value is not None:
+            frame.value += frame.permutations[frame.index - 1][2] * child_value
+        if frame.index < len(frame.permutations):
+            realized_batch, terminal, _ = frame.permutations[frame.index]
+            frame.index += 1
+            return _Decision(frame.t, 0, frame.inbound, realized_batch, terminal)
+
+        expected_value = frame.value / frame.nr_permutations
+        self.pbfs.cache_chance.store(frame.t, frame.terminal, expected_value)
+        return expected_value
+
+    def __enter_decision(self, call: _Decision):
+        self.pbfs.expanded_nodes += 1
+        t, k, realized_batch, terminal = call.t, call.k, call.realized_batch, call.terminal
+        if k == realized_batch.length():
+            # the batch is completed, the value is the value of the next chance node
+            return self.__enter_chance(_Chance(t + 1, terminal))
+        elif t == self.events.length() - 1:
+            # the last batch is fully known and solved by A*
+            try:
+                term, value = self.pbfs.handle_last_batch(realized_batch, terminal, self.pbfs.last_batch_statistics)
+                # the expected reshuffles after handling the last batch is equal to zero (as no containers are left to
+                # handle anymore.
+                if not (t + 1, term) in self.pbfs.cache_chance:
+                    self.pbfs.cache_chance.store(t + 1, term, value)
+                return value
+            except NoSolutionError:
+                return math.inf
+
+        if call.inbound:
+            outcomes = store_locations(terminal, realized_batch.containers[k - 1], None)
+            if len(outcomes) == 0:
+                return math.inf
+            is_reshuffle = False
+        else:
+            outcomes, is_reshuffle = handle_outbound_container(terminal, realized_batch.containers[k - 1])
+
+        frontier = Frontier()
+        for term in outcomes:
+            frontier.push(self.lower_bound_function(term, self.events, t), term)
+        # k is only updated if a container in the batch is handled, not when a reshuffle has taken place
+        return _DecisionFrame(call, frontier, k + int(not is_reshuffle), is_reshuffle)
+
+    def __step_decision(self, frame: _DecisionFrame, child_value: Optional[float]):
+        if child_value is not None:
+            frame.min_value = child_value if frame.min_value is None else min(frame.min_value, child_value)
+
+        explore = frame.min_value is None and frame.explored == 0
+        if not explore and not frame.frontier.empty():
+            beam_width = self.pbfs.beam_width
+            # only the most promising children are explored, and only if their lower bound is below the best value
+            explore = (beam_width is None or frame.explored < beam_width) \
+                and frame.frontier.peek_priority() < frame.min_value
+        if explore:
+            _, term = frame.frontier.pop()
+            frame.explored += 1
+            call = frame.call
+            return _Decision(call.t, frame.new_k, call.inbound, call.realized_batch, term)
+
+        return int(frame.is_reshuffle) + frame.min_value
+
+    def __chance_bounds(self, frame: _ChanceFrame, child: Optional[Bounds]) -> Bounds:
+        lower = upper = frame.value
+        remaining = frame.permutations[frame.index:]
+        if child is not None:
+            weight = frame.permutations[frame.index - 1][2]
+            lower += weight * child[0]
+            upper += weight * child[1]
+        elif frame.index > 0:
+            # the last started realization is solved, but its value is not yet added
+            remaining = frame.permutations[frame.index - 1:]
+        for _, terminal, weight in remaining:
+            lower += weight * self.lower_bound_function(terminal, self.events, frame.t)
+            upper = math.inf
+        return lower / frame.nr_permutations, upper / frame.nr_permutations
+
+    def __decision_bounds(self, frame: _DecisionFrame, child: Optional[Bounds]) -> Bounds:
+        lower = upper = math.inf if frame.min_value is None else frame.min_value
+        if child is not None:
+            lower = min(lower, child[0])
+            upper = min(upper, child[1])
+        if not frame.frontier.empty():
+            lower = min(lower, frame.frontier.peek_priority())
+        return int(frame.is_reshuffle) + lower, int(frame.is_reshuffle) + upper
@@ -0,0 +1,35 @@
+import heapq
+from itertools import count
+from typing import Any, Tuple
+
+
+class Frontier:
+    """
+    Frontier of a best first search, a min heap on plain tuple priorities. Items with equal priorities are popped in
+    insertion order (a counter breaks ties), such that the items themselves are never compared. Not thread safe, in
+    contrast to queue.PriorityQueue, which avoids locking on every push and pop.
+    """
+    __slots__ = ['heap', 'counter']
+
+    def __init__(self):
+        self.heap = []
+        self.counter = count()
+
+    def push(self, priority, item):
+        heapq.heappush(self.heap, (priority, next(self.counter), item))
+
+    def pop(self) -> Tuple[Any, Any]:
+        """
+        :return: priority and item with the lowest priority
+        """
+        priority, _, item = heapq.heappop(self.heap)
+        return priority, item
+
+    def peek_priority(self):
+        return self.heap[0][0]
+
+    def empty(self) -> bool:
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+# below this shift all bits of a 64 bit hash are consumed, keys that still share a path are kept in a collision list
+MAX_SHIFT = 64
+
+
+class _Node:
+    """
+    Bitmap compressed node of the trie. Bit i of the bitmap is set when the node has an entry for hash chunk i, the
+    entries are stored in chunk order. An entry is either a (key, value) tuple or a child node.
+    """
+    __slots__ = ['bitmap', 'entries']
+
+    def __init__(self, bitmap: int, entries: Tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+
+class _Collision:
+    """
+    Keys with equal 64 bit hashes.
+    """
+    __slots__ = ['items']
+
+    def __init__(self, items: Tuple[Tuple[Any, Any], ...]):
+        self.items = items
+
+
+def _position(bitmap: int, bit: int) -> int:
+    return bin(bitmap & (bit - 1)).count("1")
+
+
+def _key_hash(key) -> int:
+    return hash(key) & ((1 << MAX_SHIFT) - 1)
+
+
+def _merge(shift: int, first: Tuple[Any, Any], first_hash: int, second: Tuple[Any, Any], second_hash: int):
+    # creates the smallest subtree that distinguishes two entries
+    if shift >= MAX_SHIFT:
+        return _Collision((first, second))
+    first_chunk = (first_hash >> shift) & MASK
+    second_chunk = (second_hash >> shift) & MASK
+    if first_chunk == second_chunk:
+        return _Node(1 << first_chunk, (_merge(shift + BITS, first, first_hash, second, second_hash),))
+    if first_chunk < second_chunk:
+        return _Node((1 << first_chunk) | (1 << second_chunk), (first, second))
+    return _Node((1 << first_chunk) | (1 << second_chunk), (second, first))
+
+
+def _set(node, shift: int, key_hash: int, key, value) -> Tuple[Any, bool]:
+    """
+    :return: the new node and whether a key was added (as opposed to replaced)
+    """
+    if isinstance(node, _Collision):
+        for i in range(len(node.items)):
+            if node.items[i][0] == key:
+                return _Collision(node.items[:i] + ((key, value),) + node.items[i + 1:]), False
+        return _Collision(node.items + ((key, value),)), True
+
+    bit = 1 << ((key_hash >> shift) & MASK)
+    position = _position(node.bitmap, bit)
+    if not node.bitmap & bit:
+        entries = node.entries[:position] + ((key, value),) + node.entries[position:]
+        return _Node(node.bitmap | bit, entries), True
+
+    entry = node.entries[position]
+    if isinstance(entry, tuple):
+        if entry[0] == key:
+            replacement, added = (key, value), False
+        else:
+            replacement = _merge(shift + BITS, entry, _key_hash(entry[0]), (key, value), key_hash)
+            added = True
+    else:
+        replacement, added = _set(entry, shift + BITS, key_hash, key, value)
+    return _Node(node.bitmap, node.entries[:position] + (replacement,) + node.entries[position + 1:]), added
+
+
+def _remove(node, shift: int, key_hash: int, key) -> Tuple[Any, bool]:
+    """
+    :return: the new node (None if it became empty) and whether the key was found
+    """
+    if isinstance(node, _Collision):
+        items = tuple([item for item in node.items if item[0] != key])
+        if len(items) == len(node.items):
+            return node, False
+        return (_Collision(items) if len(items) > 0 else None), True
+
+    bit = 1 << ((key_hash >> shift) & MASK)
+    if not node.bitmap & bit:
+        return node, False
+    position = _position(node.bitmap, bit)
+    entry = node.entries[position]
+    if isinstance(entry, tuple):
+        if entry[0] != key:
+            return node, False
+        replacement = None
+    else:
+        replacement, found = _remove(entry, shift + BITS, key_hash, key)
+        if not found:
+            return node, False
+
+    if replacement is None:
+        if node.bitmap == bit:
+            return None, True
+        return _Node(node.bitmap ^ bit, node.entries[:position] + node.entries[position + 1:]), True
+    return _Node(node.bitmap, node.entries[:position] + (replacement,) + node.entries[position + 1:]), True
+
+
+def _items(node) -> Iterator[Tuple[Any, Any]]:
+    if isinstance(node, _Collision):
+        yield from node.items
+        return
+    for entry in node.entries:
+        if isinstance(entry, tuple):
+            yield entry
+        else:
+            yield from _items(entry)
+
+
+class PersistentIndex:
+    """
+    Immutable mapping based on a hash array mapped trie. Updates return a new index which shares all untouched nodes
+    with the original, such that an update only copies O(log n) small nodes.
+    """
+    __slots__ = ['root', 'size']
+
+    def __init__(self, root: Optional[_Node] = None, size: int = 0):
+        self.root = root
+        self.size = size
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[Any, Any]]) -> PersistentIndex:
+        result = cls()
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    def get(self, key, default=None):
+        node = self.root
+        key_hash = _key_hash(key)
+        shift = 0
+        while node is not None:
+            if isinstance(node, _Collision):
+                for item in node.items:
+                    if item[0] == key:
+                        return item[1]
+                return default
+            bit = 1 << ((key_hash >> shift) & MASK)
+            if not node.bitmap & bit:
+                return default
+            entry = node.entries[_position(node.bitmap, bit)]
+            if isinstance(entry, tuple):
+                return entry[1] if entry[0] == key else default
+            node = entry
+            shift += BITS
+        return default
+
+    def set(self, key, value) -> PersistentIndex:
+        if self.root is None:
+            return PersistentIndex(_Node(1 << (_key_hash(key) & MASK), ((key, value),)), 1)
+        root, added = _set(self.root, 0, _key_hash(key), key, value)
+        return PersistentIndex(root, self.size + int(added))
+
+    def remove(self, key) -> PersistentIndex:
+        if self.root is None:
+            return self
+        root, found = _remove(self.root, 0, _key_hash(key), key)
+        if not found:
+            return self
+        return PersistentIndex(root, self.size - 1)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        if self.root is None:
+            return iter(())
+        return _items(self.root)
+
+    def __contains__(self, key) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self):
+        return self.size
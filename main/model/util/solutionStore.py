@@ -0,0 +1,109 @@
+import hashlib
+import sqlite3
+from typing import Dict, Iterable, Optional, Tuple
+
+SIGN_BIT = 1 << 63
+
+
+def _signed(key: int) -> int:
+    # sqlite integers are signed 64 bit
+    return key - (1 << 64) if key >= SIGN_BIT else key
+
+
+def instance_hash(events, terminal, *parameters) -> str:
+    """
+    Hash identifying a PBFS instance: the events, the initial terminal and any parameters that influence the solution.
+    Deterministic over runs, such that solutions can be reused.
+    """
+    batches = tuple([(batch.inbound, batch.containers) for batch in events.batches])
+    layout = tuple([(block.two_way, tuple([stack.containers for stack in block.stacks])) for block in terminal.blocks])
+    description = repr((batches, layout, terminal.max_height, parameters))
+    return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+
+class SolutionStore:
+    """
+    Persistent key value store of the expected number of reshuffles solved by PBFS, backed by a sqlite file. Values are
+    keyed by the instance hash, the time step and the 64 bit Zobrist hash of the abstract terminal (see
+    TranspositionTable), such that repeated runs on the same instance can start from the values of an earlier run.
+
+    Entries can be added one at a time while solving, these are buffered and written in bulk.
+
+    An instance is marked complete once every value stored while solving it has been saved. Only then a value missing
+    from the store was never solved, e.g. as it was pruned, rather than evicted before it could be saved.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 10000):
+        """
+        :param path: path of the sqlite file, created if it does not exist. ":memory:" for a store that is not persisted.
+        :param buffer_size: number of entries added by put that are kept in memory before they are written
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        # (instance, time step, key) -> value of the entries that are not yet written
+        self.pending: Dict[Tuple[str, int, int], float] = {}
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS solutions ("
+                                "instance TEXT NOT NULL, t INTEGER NOT NULL, key INTEGER NOT NULL, value REAL NOT NULL, "
+                                "PRIMARY KEY (instance, t, key)) WITHOUT ROWID")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS complete_instances (instance TEXT PRIMARY KEY)")
+        self.connection.commit()
+
+    def get(self, instance: str, t: int, key: int) -> Optional[float]:
+        value = self.pending.get((instance, t, key))
+        if value is not None:
+            return value
+        row = self.connection.execute("SELECT value FROM solutions WHERE instance = ? AND t = ? AND key = ?",
+                                      (instance, t, _signed(key))).fetchone()
+        return None if row is None else row[0]
+
+    def contains_instance(self, instance: str) -> bool:
+        self.flush()
+        return self.connection.execute("SELECT 1 FROM solutions WHERE instance = ? LIMIT 1",
+                                       (instance,)).fetchone() is not None
+
+    def is_complete(self, instance: str) -> bool:
+        return self.connection.execute("SELECT 1 FROM complete_instances WHERE instance = ?",
+                                       (instance,)).fetchone() is not None
+
+    def mark_complete(self, instance: str):
+        self.connection.execute("INSERT OR IGNORE INTO complete_instances (instance) VALUES (?)", (instance,))
+        self.connection.commit()
+
+    def save(self, instance: str, entries: Iterable[Tuple[int, int, float]]):
+        """
+        Stores (time step, key, value) entries of an instance, replacing earlier values of the same entries.
+        """
+        for t, key, value in entries:
+            self.pending[(instance, t, key)] = value
+        self.flush()
+
+    def put(self, instance: str, t: int, key: int, value: float):
+        """
+        Stores a single entry, written together with other entries once buffer_size entries are pending.
+        """
+        self.pending[(instance, t, key)] = value
+        if len(self.pending) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending entries.
+        """
+        if len(self.pending) == 0:
+            return
+        self.connection.executemany("INSERT OR REPLACE INTO solutions (instance, t, key, value) VALUES (?, ?, ?, ?)",
+                                    [(instance, t, _signed(key), value)
+                                     for (instance, t, key), value in self.pending.items()])
+        self.connection.commit()
+        self.pending.clear()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,167 @@
+import math
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+DEPTH = "depth"
+LRU = "lru"
+POLICIES = (DEPTH, LRU)
+
+
+class TranspositionTable:
+    """
+    Bounded cache of the expected number of reshuffles of terminals, keyed by time step and the 64 bit Zobrist hash of
+    the terminal. As the hash of a terminal equals the hash of its abstraction, terminals do not need to be abstracted
+    nor kept in memory to be looked up. Distinct terminals with equal hashes are not distinguished.
+
+    Entries are grouped per time step, each group is kept in least recently used order. When the table is full an entry
+    is evicted according to the policy:
+        depth: the least recently used entry of the latest time step, entries of early time steps are the roots of the
+            largest subtrees and thus the most expensive to recompute.
+        lru: the least recently used entry of the whole table.
+    """
+    __slots__ = ['max_entries', 'policy', 'tables', 'size', 'hits', 'misses', 'evictions', 'dropped', 'tick', 'last_used',
+                 'on_remove']
+
+    def __init__(self, max_entries: Optional[int] = None, policy: str = DEPTH,
+                 on_remove: Optional[Callable[[int, int, float], None]] = None):
+        """
+        :param max_entries: maximum number of entries, None for an unbounded table
+        :param policy: eviction policy, either "depth" or "lru"
+        :param on_remove: called with the time step, hash and value of every evicted or dropped entry, e.g. to persist it
+        """
+        if policy not in POLICIES:
+            raise ValueError("unknown eviction policy {}, expected one of {}".format(policy, POLICIES))
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max entries must be at least 1, got {}".format(max_entries))
+        self.max_entries = max_entries
+        self.policy = policy
+        # time step -> hash -> value
+        self.tables: Dict[int, OrderedDict] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dropped = 0
+        # lru: time step -> tick of the last use of each hash, in the same order as the table of the time step
+        self.tick = 0
+        self.last_used: Dict[int, OrderedDict] = {}
+        self.on_remove = on_remove
+
+    def get(self, t: int, terminal, default: Optional[float] = None) -> Optional[float]:
+        """
+        :return: the value of the terminal at time step t, default if it is not (or no longer) stored
+        """
+        table = self.tables.get(t)
+        key = terminal.zobrist
+        if table is None or key not in table:
+            self.misses += 1
+            return default
+        self.hits += 1
+        table.move_to_end(key)
+        if self.policy == LRU:
+            self.__touch(t, key)
+        return table[key]
+
+    def store(self, t: int, terminal, value: float):
+        self.__store(t, terminal.zobrist, value)
+
+    def merge(self, other):
+        """
+        Adds the entries of another table. Of two values for the same entry the finite one is kept, the value of this
+        table otherwise. Entries evicted or dropped from the other table count as missing from this table.
+        """
+        self.evictions += other.evictions
+        self.dropped += other.dropped
+        for t, table in other.tables.items():
+            for key, value in table.items():
+                current = self.tables.get(t, {}).get(key)
+                if current is None or (math.isinf(current) and not math.isinf(value)):
+                    self.__store(t, key, value)
+
+    def __store(self, t: int, key: int, value: float):
+        table = self.tables.get(t)
+        if table is None:
+            table = OrderedDict()
+            self.tables[t] = table
+        if key in table:
+            table.move_to_end(key)
+        else:
+            if self.max_entries is not None and self.size >= self.max_entries:
+                self.__evict()
+            self.size += 1
+        table[key] = float(value)
+        if self.policy == LRU:
+            self.__touch(t, key)
+
+    def drop_before(self, t: int):
+        """
+        Removes the entries of all time steps before t, to be called once these time steps can no longer be reached.
+        """
+        for step in [step for step in self.tables if step < t]:
+            table = self.tables.pop(step)
+            if self.on_remove is not None:
+                for key, value in table.items():
+                    self.on_remove(step, key, value)
+            nr_entries = len(table)
+            self.size -= nr_entries
+            self.dropped += nr_entries
+            self.last_used.pop(step, None)
+
+    def complete(self) -> bool:
+        """
+        :return: whether every stored entry is still in the table
+        """
+        return self.evictions == 0 and self.dropped == 0
+
+    def items(self) -> Iterator[Tuple[int, int, float]]:
+        """
+        :return: (time step, hash, value) of all entries
+        """
+        for t, table in self.tables.items():
+            for key, value in table.items():
+                yield t, key, value
+
+    def keys(self) -> Set[Tuple[int, int]]:
+        return {(t, key) for t, table in self.tables.items() for key in table}
+
+    def __touch(self, t: int, key: int):
+        self.tick += 1
+        last_used = self.last_used.get(t)
+        if last_used is None:
+            last_used = OrderedDict()
+            self.last_used[t] = last_used
+        last_used[key] = self.tick
+        last_used.move_to_end(key)
+
+    def __evict(self):
+        if self.policy == DEPTH:
+            step = max([t for t, table in self.tables.items() if len(table) > 0])
+        else:
+            # the least recently used entry of each time step is the first of its group
+            step = min([(next(iter(last_used.values())), t) for t, last_used in self.last_used.items()
+                        if len(last_used) > 0])[1]
+        key, value = self.tables[step].popitem(last=False)
+        if self.on_remove is not None:
+            self.on_remove(step, key, value)
+        if self.policy == LRU:
+            del self.last_used[step][key]
+        self.size -= 1
+        self.evictions += 1
+
+    def __getitem__(self, item: Tuple[int, object]) -> float:
+        t, terminal = item
+        table = self.tables.get(t)
+        if table is None or terminal.zobrist not in table:
+            raise KeyError(item)
+        return table[terminal.zobrist]
+
+    def __setitem__(self, item: Tuple[int, object], value: float):
+        self.store(item[0], item[1], value)
+
+    def __contains__(self, item: Tuple[int, object]) -> bool:
+        t, terminal = item
+        table = self.tables.get(t)
+        return table is not None and terminal.zobrist in table
+
+    def __len__(self):
+        return self.size
@@ -4,7 +4,8 @@ from typing import List
 from main.model.batch import RealizedBatch
 from main.model.dataclass import Container
 from main.model.dataclass.block import Block
-from main.model.dataclass.outcomes import terminal_unique_outcomes, valid_store_location
+from main.model.dataclass.outcomes import terminal_unique_outcomes, valid_store_location, valid_block_stacks, \
+    unique_store_locations
 from main.model.dataclass.stack import Stack
 from main.model.dataclass.terminal import Terminal
 
@@ -75,3 +76,29 @@ class TestBayOutcomes(unittest.TestCase):
         t = t.store_container((0,1), self.c[2]).store_container((0,1), self.c[3])
         self.assertTrue(valid_store_location(t, (0, 1), None))
 
+    def test_valid_block_stacks(self):
+        t = self.t.store_container((0, 2), self.c[0]).store_container((0, 2), self.c[1]).store_container((0, 2), self.c[2])\
+            .store_container((0, 1), self.c[3]).store_container((1, 2), self.c[4])
+        for target in [None, (0, 2, 0), (0, 2, 1), (1, 2, 0)]:
+            for block_index in range(t.nr_blocks()):
+                expected = [stack_index for stack_index in range(5)
+                            if valid_store_location(t, (block_index, stack_index), target)]
+                self.assertEqual(valid_block_stacks(t, block_index, target), expected)
+        self.assertEqual(valid_block_stacks(t, 0, None), [0, 1, 2, 3])
+        # every other stack is either above the diagonal of the target or unreachable
+        self.assertEqual(valid_block_stacks(t, 0, (0, 2, 0)), [])
+        self.assertEqual(valid_block_stacks(t, 1, None), [1, 2, 3])
+        self.assertEqual(valid_block_stacks(t, 2, None), [2])
+
+    def test_unique_store_locations(self):
+        # three identical empty bays, only the middle stack of the first one is considered
+        self.assertEqual(unique_store_locations(self.t, None), [(0, 2)])
+
+        t = self.t.store_container((0, 2), self.c[0]).store_container((2, 2), (10, 0, -1))
+        # bay 0 is mirror symmetric, bay 2 equals bay 0
+        self.assertEqual(unique_store_locations(t, None), [(0, 1), (0, 2), (1, 2)])
+
+        # the block of the target is not grouped, bay 2 is still mirror symmetric
+        t = t.store_container((0, 2), self.c[2]).store_container((0, 2), self.c[3]).store_container((0, 1), self.c[4])
+        self.assertEqual(unique_store_locations(t, (0, 2, 0)), [(1, 2), (2, 1), (2, 2)])
+        self.assertEqual(unique_store_locations(t, (0, 2, 2)), [(0, 3), (1, 2), (2, 1), (2, 2)])
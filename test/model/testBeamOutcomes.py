@@ -0,0 +1,45 @@
+import unittest
+from typing import List
+
+from main.model.batch import RealizedBatch
+from main.model.dataclass import Container
+from main.model.dataclass.beamOutcomes import terminal_beam_outcomes
+from main.model.dataclass.block import Block
+from main.model.dataclass.outcomes import terminal_unique_outcomes
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+
+
+class TestBeamOutcomes(unittest.TestCase):
+    c: List[Container] = [(i, i, -1) for i in range(20)]
+    t = Terminal((
+        Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True),
+        Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True),
+        Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True)
+    ), 4)
+    t = t.store_container((0, 2), c[0]).store_container((0, 2), c[3]).store_container((0, 2), c[2])\
+        .store_container((0, 2), c[1])
+
+    @staticmethod
+    def abstract_outcomes(outcomes):
+        return {(term.abstract(), reshuffles) for term, reshuffles in outcomes}
+
+    def test_wide_beam_equals_enumeration(self):
+        for batch in [RealizedBatch(False, (self.c[0],)), RealizedBatch(False, (self.c[0], self.c[1], self.c[2])),
+                      RealizedBatch(True, (self.c[5], self.c[6]))]:
+            self.assertEqual(self.abstract_outcomes(terminal_beam_outcomes(self.t, batch, 1000)),
+                             self.abstract_outcomes(terminal_unique_outcomes(self.t, batch)))
+
+    def test_narrow_beam(self):
+        batch = RealizedBatch(False, (self.c[0], self.c[1], self.c[2]))
+        outcomes = terminal_beam_outcomes(self.t, batch, 1)
+        self.assertEqual(len(outcomes), 1)
+        self.assertTrue(self.abstract_outcomes(outcomes) <= self.abstract_outcomes(terminal_unique_outcomes(self.t, batch)))
+
+        batch = RealizedBatch(True, (self.c[5], self.c[6], self.c[7]))
+        self.assertEqual(len(terminal_beam_outcomes(self.t, batch, 2)), 2)
+
+    def test_beam_width(self):
+        batch = RealizedBatch(True, (self.c[5],))
+        self.assertEqual(terminal_beam_outcomes(self.t, batch, None), terminal_unique_outcomes(self.t, batch))
+        self.assertRaises(ValueError, terminal_beam_outcomes, self.t, batch, 0)
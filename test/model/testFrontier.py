@@ -0,0 +1,27 @@
+import unittest
+
+from main.model.util.frontier import Frontier
+
+
+class Unorderable:
+    pass
+
+
+class TestFrontier(unittest.TestCase):
+
+    def test_order(self):
+        q = Frontier()
+        q.push((1, 0), "b")
+        q.push((0, -2), "a")
+        q.push((1, -1), "c")
+        self.assertEqual(len(q), 3)
+        self.assertEqual(q.peek_priority(), (0, -2))
+        self.assertEqual([q.pop()[1] for _ in range(3)], ["a", "c", "b"])
+        self.assertTrue(q.empty())
+
+    def test_ties_in_insertion_order(self):
+        q = Frontier()
+        items = [Unorderable() for _ in range(5)]
+        for item in items:
+            q.push((0, 0), item)
+        self.assertEqual([q.pop()[1] for _ in range(5)], items)
@@ -0,0 +1,75 @@
+import math
+import random
+import unittest
+
+from main.model.adp.valuefunctions.features.futureBlockingContainers import future_blocking_containers
+from main.model.adp.valuefunctions.features.futureBlockingStacks import future_blocking_stacks
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+
+
+def scan_blocking_containers(terminal: Terminal, event: Events, current_batch_number: int):
+    # every future arrival against every remaining container
+    labels = [container[1] for block in terminal.blocks for stack in block.stacks for container in stack.containers]
+    return sum([any([t < label <= container[1] for label in labels])
+                for t in range(event.length()) if t > current_batch_number and event.batch(t).inbound
+                for container in event.batch(t).containers])
+
+
+def scan_blocking_stacks(terminal: Terminal, event: Events, current_batch_number: int):
+    result = 0
+    for block in terminal.blocks:
+        for stack in block.stacks:
+            for t in range(current_batch_number + 1, event.length()):
+                remaining = [container[1] for container in stack.containers if container[1] > t]
+                if not event.batch(t).inbound:
+                    continue
+                if len(remaining) == 0:
+                    break
+                if any([label >= container[1] for container in event.batch(t).containers for label in remaining]):
+                    result += 1
+                    break
+    return result
+
+
+class TestFutureArrivals(unittest.TestCase):
+    events = Events.create([(1, 2), (), (3, 4, 5), (2, 3), (6, 7), (1, 6), (), (4,)])
+
+    def test_index(self):
+        arrivals = self.events.future_arrivals(1)
+        self.assertEqual(arrivals.times, (2, 4, 6))
+        self.assertEqual(arrivals.labels, ((1, 3, 4), (2, 4), ()))
+        self.assertEqual(arrivals.prefix_min, (math.inf, 1, 1, 1))
+        self.assertEqual(arrivals.min_label_before(3), 1)
+        self.assertEqual(arrivals.count_at_least(0, 3), 2)
+        # built once per batch number
+        self.assertIs(self.events.future_arrivals(1), arrivals)
+        self.assertEqual(len(self.events.future_arrivals(6)), 0)
+
+    def test_features(self):
+        rng = random.Random(5)
+        for _ in range(50):
+            nr_batches = 2 * rng.randint(1, 4)
+            ids = list(range(1, 4 * nr_batches))
+            rng.shuffle(ids)
+            batches = []
+            present = []
+            for i in range(nr_batches):
+                if i % 2 == 0:
+                    batch = tuple([ids.pop() for _ in range(rng.randint(0, 3))])
+                    present.extend(batch)
+                else:
+                    batch = tuple(rng.sample(present, rng.randint(0, len(present))))
+                    present = [container_id for container_id in present if container_id not in batch]
+                batches.append(batch)
+            events = Events.create(batches)
+
+            terminal = Terminal.empty_single_stack_block(4, 5)
+            for container_id in range(6):
+                container = (100 + container_id, rng.randint(0, nr_batches // 2), -1)
+                terminal = terminal.store_container((rng.randrange(4), 0), container)
+
+            for t in range(-1, nr_batches):
+                self.assertEqual(future_blocking_containers(terminal, events, t),
+                                 scan_blocking_containers(terminal, events, t))
+                self.assertEqual(future_blocking_stacks(terminal, events, t), scan_blocking_stacks(terminal, events, t))
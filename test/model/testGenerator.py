@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from collections import Counter
+
+import numpy
+
+from main.model.events import generator
+from main.model.events.evaluatableEvents import EvaluatableEvents
+from main.model.events.generator import generate_events, generate_packed_events
+from main.model.events.packedEvents import PackedEvents
+
+
+class TestGenerator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "instance.events")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_events(self):
+        events = generate_events(10, 3, 50, numpy.random.default_rng(0))
+        self.assertEqual(events.length(), 20)
+        inbound = [container for batch in events.batches if batch.inbound for container in batch.containers]
+        outbound = [container for batch in events.batches if not batch.inbound for container in batch.containers]
+        self.assertEqual(sorted([container[0] for container in inbound]), list(range(50)))
+        for t in range(events.length()):
+            for container in events.batch(t).containers:
+                if events.batch(t).inbound:
+                    self.assertLessEqual(t // 2, container[1])
+                else:
+                    self.assertEqual(t // 2, container[1])
+        self.assertTrue(set(outbound) <= set(inbound))
+        self.assertTrue(all([container[1] < 10 for container in outbound]))
+
+    def test_seeded(self):
+        self.assertEqual([batch.containers for batch in generate_events(10, 3, 50, numpy.random.default_rng(4)).batches],
+                         [batch.containers for batch in generate_events(10, 3, 50, numpy.random.default_rng(4)).batches])
+
+    def test_packed(self):
+        events = generate_events(10, 3, 50, numpy.random.default_rng(7))
+        generate_packed_events(self.path, 10, 3, 50, 5, numpy.random.default_rng(7))
+        packed = PackedEvents(self.path)
+        # the same random numbers are used for the events themselves
+        self.assertEqual([batch.containers for batch in packed.batches()], [batch.containers for batch in events.batches])
+        self.assertEqual(packed.nr_training, 5)
+        self.assertEqual(packed.nr_evaluating, 5)
+        for sequence in range(1, packed.nr_sequences()):
+            sample = packed.realized_events(sequence)
+            for batch, realized_batch in zip(events.batches, sample.batches):
+                self.assertEqual(batch.inbound, realized_batch.inbound)
+                self.assertEqual(Counter(batch.containers), Counter(realized_batch.containers))
+
+    def test_chunks(self):
+        chunk_containers = generator.CHUNK_CONTAINERS
+        try:
+            generator.CHUNK_CONTAINERS = 7
+            generate_packed_events(self.path, 10, 3, 20, 4, numpy.random.default_rng(2))
+        finally:
+            generator.CHUNK_CONTAINERS = chunk_containers
+        packed = PackedEvents(self.path)
+        self.assertEqual(len(packed.containers), packed.nr_sequences() * packed.batch_offsets[packed.batches_per_sequence])
+
+    def test_samples_differ(self):
+        instance = EvaluatableEvents.create_packed_instance("instance", 5, 2, 40, nr_samples=20,
+                                                           directory=self.directory.name,
+                                                           rng=numpy.random.default_rng(1))
+        orders = set([tuple([batch.containers for batch in sample.batches]) for sample in instance.training_events])
+        self.assertGreater(len(orders), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from typing import List
+
+from main.model.batch import RealizedBatch
+from main.model.dataclass import Container
+from main.model.dataclass.block import Block
+from main.model.dataclass.outboundSearch import solve_outbound_batch, remaining_blocking, SearchStatistics
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+from main.model.noSolutionError import NoSolutionError
+
+
+class TestOutboundSearch(unittest.TestCase):
+    c: List[Container] = [(i, i, -1) for i in range(20)]
+
+    def test_remaining_blocking(self):
+        t = Terminal.empty_single_stack_block(3, 3)
+        t = t.store_container((0, 0), self.c[1]).store_container((0, 0), self.c[3]).store_container((0, 0), self.c[2])
+        # container 3 blocks container 1 and container 2 is retrieved after container 1
+        self.assertEqual(remaining_blocking(t, RealizedBatch(False, (self.c[1], self.c[2])), 0), 2)
+        self.assertEqual(remaining_blocking(t, RealizedBatch(False, (self.c[2], self.c[1])), 0), 1)
+        self.assertEqual(remaining_blocking(t, RealizedBatch(False, (self.c[1], self.c[2])), 1), 0)
+
+    def test_solve(self):
+        t = Terminal.empty_single_stack_block(3, 3)
+        t = t.store_container((0, 0), self.c[1]).store_container((0, 0), self.c[3]).store_container((0, 0), self.c[2])
+
+        statistics = SearchStatistics()
+        batch = RealizedBatch(False, (self.c[1], self.c[2]))
+        term, reshuffles = solve_outbound_batch(t, batch, statistics=statistics)
+        self.assertEqual(reshuffles, 2)
+        self.assertEqual(statistics.searches, 1)
+        self.assertGreater(statistics.expanded, 0)
+        self.assertGreaterEqual(statistics.generated, statistics.expanded - 1)
+
+        batch = RealizedBatch(False, (self.c[2], self.c[1]))
+        term, reshuffles = solve_outbound_batch(t, batch, statistics=statistics)
+        self.assertEqual(reshuffles, 1)
+        self.assertEqual(statistics.searches, 2)
+        self.assertEqual(term.abstract(), t.retrieve_container((0, 0))[0].reshuffle_container((0, 0), (1, 0))
+                         .retrieve_container((0, 0))[0].abstract())
+
+    def test_bay(self):
+        # the container in front of the target is reshuffled, not the target itself
+        t = Terminal((Block((Stack(()), Stack(()), Stack(())), False), Block.empty_single_stack()), 3)
+        t = t.store_container((0, 1), self.c[1]).store_container((0, 0), self.c[3])
+        term, reshuffles = solve_outbound_batch(t, RealizedBatch(False, (self.c[1],)))
+        self.assertEqual(reshuffles, 1)
+        self.assertEqual(term.container_location(self.c[3]), (1, 0, 0))
+
+    def test_no_solution(self):
+        # no room to reshuffle container 3
+        t = Terminal.empty_single_stack_block(1, 2)
+        t = t.store_container((0, 0), self.c[1]).store_container((0, 0), self.c[3])
+        self.assertRaises(NoSolutionError, solve_outbound_batch, t, RealizedBatch(False, (self.c[1],)))
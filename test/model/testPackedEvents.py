@@ -0,0 +1,82 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from main.model.events.evaluatableEvents import EvaluatableEvents
+from main.model.events.packedEvents import PackedEvents, PackedSamples, EXTENSION, pack_sequences, write_packed_events
+
+
+class TestPackedEvents(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.events = EvaluatableEvents.create_from_ids([(1, 2), (), (3, 4, 5), (2, 3), (6,), (1, 4, 6)], nr_samples=3)
+        self.events.write_packed_events("instance", directory=self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertSameSamples(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for expected_sample, actual_sample in zip(expected, actual):
+            self.assertEqual([batch.inbound for batch in expected_sample.batches],
+                             [batch.inbound for batch in actual_sample.batches])
+            self.assertEqual([batch.containers for batch in expected_sample.batches],
+                             [batch.containers for batch in actual_sample.batches])
+
+    def test_round_trip(self):
+        loaded = EvaluatableEvents.load_packed_events("instance", directory=self.directory.name)
+        self.assertEqual([batch.inbound for batch in self.events.batches], [batch.inbound for batch in loaded.batches])
+        self.assertEqual([batch.containers for batch in self.events.batches],
+                         [batch.containers for batch in loaded.batches])
+        self.assertSameSamples(self.events.training_events, loaded.training_events)
+        self.assertSameSamples(self.events.evaluating_events, loaded.evaluating_events)
+
+    def test_load_instance(self):
+        self.assertIsInstance(EvaluatableEvents.load_instance("instance", directory=self.directory.name),
+                              EvaluatableEvents)
+        with self.assertRaises(FileNotFoundError):
+            EvaluatableEvents.load_instance("missing", directory=self.directory.name)
+
+    def test_pickle(self):
+        packed = PackedEvents(os.path.join(self.directory.name, "instance.{}".format(EXTENSION)))
+        unpickled = pickle.loads(pickle.dumps(packed))
+        self.assertEqual(packed.path, unpickled.path)
+        self.assertEqual(packed.nr_training, 3)
+        self.assertEqual(packed.nr_evaluating, 3)
+        for t in range(packed.batches_per_sequence):
+            self.assertEqual(packed.batch_containers(packed.evaluating_sequence(2), t),
+                             unpickled.batch_containers(unpickled.evaluating_sequence(2), t))
+
+    def test_lazy_samples(self):
+        loaded = EvaluatableEvents.load_packed_events("instance", directory=self.directory.name)
+        self.assertIsInstance(loaded.training_events, PackedSamples)
+        samples = PackedSamples(loaded.training_events.packed, 1, 3, cache_size=2)
+        self.assertIs(samples[0], samples[0])
+        samples[1]
+        samples[2]
+        # the first sample was evicted, and is decoded again
+        self.assertEqual(len(samples._cache), 2)
+        self.assertSameSamples(self.events.training_events[:1], [samples[0]])
+        self.assertSameSamples(self.events.training_events[::-1], samples[::-1])
+        with self.assertRaises(IndexError):
+            samples[3]
+
+        for expected in self.events.evaluating_events:
+            self.assertSameSamples([expected], [loaded.sample_evaluating()])
+        with self.assertRaises(ValueError):
+            loaded.sample_evaluating()
+
+    def test_invalid(self):
+        path = os.path.join(self.directory.name, "invalid.{}".format(EXTENSION))
+        with open(path, "wb") as file:
+            file.write(b"not an instance")
+        with self.assertRaises(ValueError):
+            PackedEvents(path)
+        batch_offsets, containers = pack_sequences([[((1, 1, 1),), ()]])
+        with self.assertRaises(ValueError):
+            write_packed_events(path, 2, 1, 0, batch_offsets, containers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from main.model.dataclass.block import Block
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+from main.model.util.persistentIndex import PersistentIndex
+
+
+class TestPersistentIndex(unittest.TestCase):
+
+    def test_matches_dict(self):
+        rng = random.Random(3)
+        index = PersistentIndex()
+        expected = {}
+        for _ in range(2000):
+            key = rng.randrange(300)
+            if rng.random() < 0.6:
+                value = rng.random()
+                index = index.set(key, value)
+                expected[key] = value
+            else:
+                index = index.remove(key)
+                expected.pop(key, None)
+            self.assertEqual(len(index), len(expected))
+        self.assertEqual(dict(index.items()), expected)
+        for key in range(300):
+            self.assertEqual(index.get(key), expected.get(key))
+
+    def test_structure_sharing(self):
+        index = PersistentIndex.from_items([(i, i) for i in range(100)])
+        updated = index.set(5, -5).remove(7)
+        self.assertEqual(index.get(5), 5)
+        self.assertIn(7, index)
+        self.assertEqual(updated.get(5), -5)
+        self.assertNotIn(7, updated)
+
+    def test_hash_collision(self):
+        # hash(-1) == hash(-2)
+        index = PersistentIndex().set(-1, "a").set(-2, "b")
+        self.assertEqual((index.get(-1), index.get(-2)), ("a", "b"))
+        index = index.remove(-1)
+        self.assertEqual((index.get(-1), index.get(-2), len(index)), (None, "b", 1))
+
+    def test_terminal_locations(self):
+        t = Terminal((
+            Block((Stack(()), Stack(()), Stack(())), True),
+            Block((Stack(()),), False)
+        ), 4).store_container((0, 1), (1, 1, -1)).store_container((0, 1), (2, 2, -1))
+        self.assertEqual(t.container_location((2, 2, -1)), (0, 1, 1))
+
+        # derived from the index of the parent
+        t = t.reshuffle_container((0, 1), (1, 0)).store_container((0, 1), (3, 3, -1))
+        self.assertEqual(t.container_location((2, 2, -1)), (1, 0, 0))
+        self.assertEqual(t.container_location((3, 3, -1)), (0, 1, 1))
+        self.assertRaises(RuntimeError, t.container_location, (4, 4, -1))
+        self.assertEqual(t.reveal_order(((3, 3, -1),)).container_location((3, 3, -1)), (0, 1, 1))
+
+        # duplicate ids fall back to the first match of a linear scan
+        duplicate = t.store_container((0, 0), (3, 3, -1))
+        self.assertEqual(duplicate.container_location((3, 3, -1)), (0, 0, 0))
+        self.assertEqual(t.abstract().container_location((0, 1, -1)), (0, 0, 0))
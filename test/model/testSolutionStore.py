@@ -0,0 +1,44 @@
+import unittest
+
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+from main.model.util.solutionStore import SolutionStore, instance_hash
+
+
+class TestSolutionStore(unittest.TestCase):
+
+    def test_store(self):
+        with SolutionStore(":memory:") as store:
+            self.assertFalse(store.contains_instance("a"))
+            # keys use all 64 bits
+            store.save("a", [(0, (1 << 64) - 1, 1.5), (1, 3, float("inf"))])
+            store.save("a", [(0, (1 << 64) - 1, 2.5)])
+            self.assertTrue(store.contains_instance("a"))
+            self.assertEqual(store.get("a", 0, (1 << 64) - 1), 2.5)
+            self.assertEqual(store.get("a", 1, 3), float("inf"))
+            self.assertIsNone(store.get("a", 0, 3))
+            self.assertIsNone(store.get("b", 0, (1 << 64) - 1))
+            self.assertFalse(store.is_complete("a"))
+            store.mark_complete("a")
+            store.mark_complete("a")
+            self.assertTrue(store.is_complete("a"))
+            self.assertFalse(store.is_complete("b"))
+
+    def test_put(self):
+        with SolutionStore(":memory:", buffer_size=2) as store:
+            store.put("a", 0, 1, 1.5)
+            # pending entries are looked up before they are written
+            self.assertEqual(store.get("a", 0, 1), 1.5)
+            self.assertEqual(len(store.pending), 1)
+            store.put("a", 1, (1 << 64) - 1, 2.5)
+            self.assertEqual(len(store.pending), 0)
+            self.assertEqual(store.get("a", 1, (1 << 64) - 1), 2.5)
+            store.put("b", 0, 1, 3.5)
+            self.assertTrue(store.contains_instance("b"))
+
+    def test_instance_hash(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        self.assertEqual(instance_hash(events, t, None), instance_hash(Events.create([(1, 2), (), (3,), (2, 3)]), t, None))
+        self.assertNotEqual(instance_hash(events, t, None), instance_hash(events, t, 2))
+        self.assertNotEqual(instance_hash(events, t, None), instance_hash(events, Terminal.empty_single_stack_block(3, 3), None))
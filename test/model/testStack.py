@@ -1,3 +1,5 @@
+import math
+import random
 import unittest
 
 from main.model.dataclass.stack import Stack
@@ -61,3 +63,21 @@ class TestStack(unittest.TestCase):
         self.assertEqual(s.reveal_order({1: 2, 2: 1}), s3)
 
 
+
+    def test_incremental_statistics(self):
+        rng = random.Random(7)
+        stack = Stack.empty()
+        for _ in range(500):
+            if stack.height() > 0 and rng.random() < 0.4:
+                stack, _ = stack.retrieve_container()
+            else:
+                label = rng.randrange(4)
+                stack = stack.store_container((rng.randrange(100), label, rng.choice([-1, 1, 2])))
+
+            labels = [container[1] for container in stack.containers]
+            # must equal the value of the closed formula exactly, not only approximately
+            self.assertEqual(stack.blocking_lowerbound, stack.calc_blocking_lowerbound())
+            self.assertEqual(stack.min_label, min(labels, default=math.inf))
+            self.assertEqual(stack.ordered, all(labels[i] <= min(labels[:i]) for i in range(1, len(labels))))
+            if stack.height() > 0:
+                self.assertEqual(stack.min_container(), min(stack.containers, key=lambda x: x[1:]))
@@ -286,3 +286,26 @@ class TestStruct(unittest.TestCase):
         c = (3, 3, -1)
         self.assertEqual(self.t1.store_container((0, 0), c).container_location(c), (0, 0, 1))
         self.assertEqual(self.t1.store_container((1, 0), c).container_location(c), (1, 0, 0))
+
+    def test_abstract_cached(self):
+        t = Terminal.empty_bay(3, 4).store_container((1, 0), (1, 1, -1))
+        abstract = t.abstract()
+        self.assertIs(t.abstract(), abstract)
+        self.assertIs(abstract.abstract(), abstract)
+        self.assertIs(abstract.blocks[0].abstract(), abstract.blocks[0])
+
+    def test_abstract_incremental(self):
+        t = Terminal.empty_bay(3, 4).store_container((1, 0), (1, 1, -1)).store_container((2, 3), (2, 2, -1))
+        t.abstract()
+        moves = [
+            lambda term: term.store_container((0, 4), (3, 3, -1)),
+            lambda term: term.reshuffle_container((1, 0), (1, 2)),
+            lambda term: term.reshuffle_container((2, 3), (0, 1)),
+            lambda term: term.retrieve_container((0, 4))[0],
+        ]
+        for move in moves:
+            # derived from the cached abstraction of the parent, or of an earlier ancestor
+            t = move(t)
+            scratch = Terminal(t.blocks, t.max_height)
+            self.assertEqual(t.abstract(), scratch.abstract())
+            self.assertEqual(t.abstract().blocks, tuple(sorted(block.abstract() for block in t.blocks)))
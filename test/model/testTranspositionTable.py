@@ -0,0 +1,70 @@
+import math
+import unittest
+
+from main.model.dataclass.terminal import Terminal
+from main.model.util.transpositionTable import TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    # distinct terminals, terminals[i] holds a single container of batch i + 1
+    terminals = [Terminal.empty_single_stack_block(3, 3).store_container((0, 0), (i, i + 1, -1)) for i in range(6)]
+
+    def test_store_get(self):
+        table = TranspositionTable()
+        table.store(1, self.terminals[0], 2)
+        self.assertEqual(table.get(1, self.terminals[0]), 2.0)
+        self.assertIsNone(table.get(2, self.terminals[0]))
+        self.assertIsNone(table.get(1, self.terminals[1]))
+        # a terminal and its abstraction share their entry
+        self.assertIn((1, self.terminals[0].abstract()), table)
+        self.assertEqual(table[(1, self.terminals[0].abstract())], 2.0)
+        self.assertEqual((table.hits, table.misses, len(table)), (1, 2, 1))
+        self.assertRaises(ValueError, TranspositionTable, 10, "fifo")
+
+    def test_depth_eviction(self):
+        table = TranspositionTable(3)
+        for t in range(4):
+            table.store(t, self.terminals[t], t)
+        # the latest time step in the table is evicted first, a new entry is always stored
+        self.assertEqual(table.keys(), {(t, self.terminals[t].zobrist) for t in [0, 1, 3]})
+        table.store(0, self.terminals[4], 0)
+        self.assertNotIn((3, self.terminals[3]), table)
+        self.assertEqual((len(table), table.evictions), (3, 2))
+        self.assertFalse(table.complete())
+
+    def test_on_remove(self):
+        removed = []
+        table = TranspositionTable(2, on_remove=lambda t, key, value: removed.append((t, key, value)))
+        for t in range(3):
+            table.store(t, self.terminals[t], t)
+        self.assertEqual(removed, [(1, self.terminals[1].zobrist, 1.0)])
+        table.drop_before(2)
+        self.assertEqual(removed, [(1, self.terminals[1].zobrist, 1.0), (0, self.terminals[0].zobrist, 0.0)])
+
+    def test_lru_eviction(self):
+        table = TranspositionTable(3, "lru")
+        for t in range(3):
+            table.store(t, self.terminals[t], t)
+        table.get(0, self.terminals[0])
+        table.store(3, self.terminals[3], 3)
+        self.assertNotIn((1, self.terminals[1]), table)
+        table.store(4, self.terminals[4], 4)
+        self.assertNotIn((2, self.terminals[2]), table)
+        self.assertIn((0, self.terminals[0]), table)
+
+    def test_drop_merge(self):
+        table = TranspositionTable()
+        for t in range(4):
+            table.store(t, self.terminals[t], t)
+        table.store(3, self.terminals[0], math.inf)
+        table.drop_before(2)
+        self.assertEqual((len(table), table.dropped), (3, 2))
+        self.assertNotIn((1, self.terminals[1]), table)
+
+        other = TranspositionTable()
+        other.store(3, self.terminals[0], 5)
+        other.store(3, self.terminals[3], 7)
+        table.merge(other)
+        # finite values replace infinite ones, but no other values
+        self.assertEqual(table.get(3, self.terminals[0]), 5.0)
+        self.assertEqual(table.get(3, self.terminals[3]), 3.0)
@@ -0,0 +1,56 @@
+import unittest
+from typing import List
+
+from main.model.dataclass import Container
+from main.model.dataclass.block import Block
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+
+
+class TestZobrist(unittest.TestCase):
+    c: List[Container] = [(i, i, -1) for i in range(20)]
+    t = Terminal((
+        Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True),
+        Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True),
+        Block((Stack(()), Stack(()), Stack(())), False)
+    ), 4)
+
+    def test_incremental_equals_scratch(self):
+        t = self.t.store_container((0, 1), self.c[1]).store_container((0, 1), self.c[2])\
+            .store_container((2, 0), self.c[3]).store_container((1, 4), self.c[4])
+        t = t.reshuffle_container((0, 1), (2, 2))
+        t, _ = t.retrieve_container((1, 4))
+
+        scratch = Terminal(tuple([Block(tuple([Stack(stack.containers) for stack in block.stacks]), block.two_way)
+                                  for block in t.blocks]), t.max_height)
+        self.assertEqual(t.zobrist, scratch.zobrist)
+        for block, scratch_block in zip(t.blocks, scratch.blocks):
+            self.assertEqual((block.zobrist, block.zobrist_mirror), (scratch_block.zobrist, scratch_block.zobrist_mirror))
+            for stack, scratch_stack in zip(block.stacks, scratch_block.stacks):
+                self.assertEqual(stack.zobrist, scratch_stack.zobrist)
+
+    def test_ids_ignored(self):
+        left = self.t.store_container((0, 1), (7, 1, -1))
+        right = self.t.store_container((0, 1), (8, 1, -1))
+        self.assertEqual(hash(left), hash(right))
+        self.assertEqual(left.abstract(), right.abstract())
+        self.assertNotEqual(hash(left), hash(self.t.store_container((0, 1), self.c[2])))
+
+    def test_mirror_invariant(self):
+        left = self.t.store_container((0, 0), self.c[1]).store_container((0, 1), self.c[2])
+        right = self.t.store_container((0, 4), self.c[1]).store_container((0, 3), self.c[2])
+        self.assertEqual(hash(left.blocks[0]), hash(right.blocks[0]))
+        self.assertNotEqual(left.blocks[0], right.blocks[0])
+        self.assertEqual(left.abstract(), right.abstract())
+
+        # single direction blocks are not mirror invariant
+        left = self.t.store_container((2, 0), self.c[1])
+        right = self.t.store_container((2, 2), self.c[1])
+        self.assertNotEqual(hash(left.blocks[2]), hash(right.blocks[2]))
+
+    def test_abstract_shares_hash(self):
+        t = self.t.store_container((1, 3), self.c[1]).store_container((1, 3), self.c[2]).store_container((0, 0), self.c[3])
+        abstract = t.abstract()
+        self.assertEqual(hash(t), hash(abstract))
+        self.assertEqual(abstract.zobrist, Terminal.calc_zobrist(abstract.blocks))
+        self.assertEqual(abstract.abstract(), abstract)
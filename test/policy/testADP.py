@@ -1,7 +1,12 @@
+import random
 import unittest
 from typing import List
 
+import numpy
+
 from main.model.adp.valuefunctions.basisfunction import BasisFunction
+from main.model.adp.valuefunctions.features.blockingContainers import blocking_containers
+from main.model.adp.valuefunctions.features.constant import constant
 from main.model.adp.valuefunctions.features.compositeMeasure import MM_rule
 from main.model.batch import RealizedBatch
 from main.model.dataclass import Container
@@ -9,6 +14,7 @@ from main.model.dataclass.block import Block
 from main.model.dataclass.outcomes import terminal_unique_outcomes, valid_store_location
 from main.model.dataclass.stack import Stack
 from main.model.dataclass.terminal import Terminal
+from main.model.events.evaluatableEvents import EvaluatableEvents
 from main.model.events.events import Events
 from main.model.policies.adp import ADP
 
@@ -55,6 +61,38 @@ class TestExactPolicy(unittest.TestCase):
     #     adp = ADP(events, self.t, False, 0.05, value_function_approx, 5, 1, False)
     #     print("done")
 
+    def test_seeded_rng(self):
+        def run(seed, use_optimized_outcomes):
+            rng = numpy.random.default_rng(seed)
+            events = EvaluatableEvents.create_from_ids([(1, 2), (), (3, 4), (2, 3), (5,), (1, 4, 5)], nr_samples=10,
+                                                       rng=rng)
+            value_function_approx = BasisFunction([blocking_containers, constant], 1.0, delta=0.5)
+            # a high epsilon such that the exploration is exercised
+            terminal = Terminal.empty_single_stack_block(3, 4)
+            ADP(events, terminal, False, 0.5, value_function_approx, 10, 1,
+                use_optimized_outcomes=use_optimized_outcomes, rng=rng)
+            return [value_function_approx.value_approximate(10, t, terminal, events) for t in range(events.length())]
+
+        for use_optimized_outcomes in [False, True]:
+            self.assertEqual(run(3, use_optimized_outcomes), run(3, use_optimized_outcomes))
+
+    def test_seeded_rng_events(self):
+        # the realizations of plain events are drawn from the generator of ADP, not from the global random module
+        def run(global_seed):
+            random.seed(global_seed)
+            events = Events.create([(1, 2, 3), (), (4, 5), (2, 3), (6,), (1, 4, 5, 6)])
+            value_function_approx = BasisFunction([blocking_containers, constant], 1.0, delta=0.5)
+            terminal = Terminal.empty_single_stack_block(3, 4)
+            ADP(events, terminal, False, 0.5, value_function_approx, 10, 1, rng=numpy.random.default_rng(4))
+            return [value_function_approx.value_approximate(10, t, terminal, events) for t in range(events.length())]
+
+        self.assertEqual(run(1), run(2))
+
+    def test_sample_rng(self):
+        samples = [self.events.sample(numpy.random.default_rng(5)) for _ in range(2)]
+        self.assertEqual([batch.containers for batch in samples[0].batches],
+                         [batch.containers for batch in samples[1].batches])
+
     def test_hard_outcome_instance(self):
         """
 -37_?(22)∣22_?(28)∣21_?(18)
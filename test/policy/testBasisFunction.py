@@ -0,0 +1,81 @@
+import random
+import unittest
+
+import numpy
+
+from main.model.adp.valuefunctions.basisfunction import BasisFunction
+from main.model.adp.valuefunctions.features.averageStackHeight import average_stack_height
+from main.model.adp.valuefunctions.features.batchLabelDifference import batch_label_difference
+from main.model.adp.valuefunctions.features.blockingContainers import blocking_containers
+from main.model.adp.valuefunctions.features.constant import constant, constant_variable
+from main.model.adp.valuefunctions.features.nonReachableContainers import non_reachable_containers
+from main.model.adp.valuefunctions.features.nonReacheableStacks import non_reachable_stacks
+from main.model.adp.valuefunctions.features.unorderedStacks import unordered_stacks
+from main.model.batch import RealizedBatch
+from main.model.dataclass.block import Block
+from main.model.dataclass.optimizedOutcomes import valid_store_locations
+from main.model.dataclass.outcomes import terminal_unique_outcomes
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+
+
+class TestBasisFunction(unittest.TestCase):
+    events = Events.create([(1, 2), (), (3,), (2, 3)])
+    features = [average_stack_height, batch_label_difference, blocking_containers, constant, constant_variable(3.0)]
+    incremental_features = [average_stack_height, batch_label_difference, blocking_containers, non_reachable_containers,
+                             non_reachable_stacks, unordered_stacks]
+
+    t = Terminal((
+        Block((Stack(()), Stack(()), Stack(()), Stack(())), True),
+        Block.empty_single_stack(),
+    ), 3).store_container((0, 0), (10, 10, -1)).store_container((0, 0), (11, 11, -1)) \
+        .store_container((0, 3), (12, 12, -1)).store_container((1, 0), (13, 1, -1))
+
+    def candidates(self):
+        outcomes = terminal_unique_outcomes(self.t, RealizedBatch(True, ((1, 2, -1), (2, 3, -1))))
+        return [Terminal.empty_single_stack_block(2, 3)] + [term for term, _ in outcomes]
+
+    def test_feature_matrix(self):
+        basis = BasisFunction(self.features, [1.0, -2.0, 0.5, 3.0, 0.25])
+        terminals = self.candidates()
+        matrix = basis.feature_matrix(terminals, self.events, 1)
+        self.assertEqual(matrix.shape, (len(terminals), len(self.features)))
+        for i in range(len(terminals)):
+            numpy.testing.assert_allclose(matrix[i], basis.feature_evaluation(terminals[i], self.events, 1))
+        self.assertEqual(basis.feature_matrix([], self.events, 1).shape, (0, len(self.features)))
+
+    def test_value_approximate_batch(self):
+        basis = BasisFunction(self.features, [1.0, -2.0, 0.5, 3.0, 0.25])
+        terminals = self.candidates()
+        values = basis.value_approximate_batch(1, 1, terminals, self.events)
+        for i in range(len(terminals)):
+            self.assertAlmostEqual(values[i], basis.value_approximate(1, 1, terminals[i], self.events))
+
+    def test_delta_features(self):
+        # containers stored at random locations of a one way and a two way block, each delta is compared to the full
+        # recomputation for every valid location
+        rng = random.Random(3)
+        for _ in range(20):
+            terminal = Terminal((
+                Block((Stack(()), Stack(()), Stack(()), Stack(())), True),
+                Block((Stack(()), Stack(()), Stack(())), False),
+            ), 3)
+            for container_id in range(10):
+                container = (container_id, rng.randint(0, 4), -1)
+                locations = valid_store_locations(terminal, None)
+                for location in locations:
+                    new_terminal = terminal.store_container(location, container)
+                    for feature in self.incremental_features:
+                        value = feature.delta(terminal, feature.delta_state(terminal, self.events, 0), location,
+                                              new_terminal, self.events, 0)
+                        self.assertAlmostEqual(value, feature(new_terminal, self.events, 0),
+                                               msg="{} {}\n{}".format(feature.__name__, location, terminal))
+                terminal = terminal.store_container(rng.choice(locations), container)
+
+    def test_feature_matrix_stored(self):
+        basis = BasisFunction(self.incremental_features + [constant], 1.0)
+        locations = valid_store_locations(self.t, None)
+        terminals = [self.t.store_container(location, (20, 5, -1)) for location in locations]
+        numpy.testing.assert_allclose(basis.feature_matrix_stored(self.t, locations, terminals, self.events, 1),
+                                      basis.feature_matrix(terminals, self.events, 1))
@@ -0,0 +1,60 @@
+import unittest
+
+from main.model.dataclass.block import Block
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+from main.model.events.events import Events
+from main.model.policies.lowerBounds import stack_blocking, bay_blocking, Maximum, bound_name
+from main.model.policies.pbfs import PBFS
+from main.model.util.solutionStore import SolutionStore
+
+
+class TestLowerBounds(unittest.TestCase):
+    # container 1 departs in the first outbound batch, container 2 in the second, container 3 stays
+    events = Events.create([(1, 2, 3), (1,), (), (2,)])
+    c1 = (1, 0, -1)
+    c2 = (2, 1, -1)
+    c3 = (3, 2, -1)
+
+    @staticmethod
+    def bay(two_way: bool, *stacks) -> Terminal:
+        return Terminal((Block(tuple([Stack(containers) for containers in stacks]), two_way),), 3)
+
+    def test_bay_blocking(self):
+        # container 2 is above the diagonal of container 1
+        t = self.bay(False, (self.c2,), (self.c1,), ())
+        self.assertEqual(stack_blocking(t, self.events, 0), 0)
+        self.assertEqual(bay_blocking(t, self.events, 0), 1)
+        # ... but container 1 can be reached from the other side
+        self.assertEqual(bay_blocking(self.bay(True, (self.c2,), (self.c1,), ()), self.events, 0), 0)
+        self.assertEqual(bay_blocking(self.bay(True, (self.c2,), (self.c1,), (self.c3,)), self.events, 0), 1)
+        # container 2 is counted once, within its own stack
+        t = self.bay(False, (self.c1, self.c2), (self.c1,), ())
+        self.assertEqual(bay_blocking(t, self.events, 0), stack_blocking(t, self.events, 0))
+        self.assertEqual(Maximum(stack_blocking, bay_blocking)(t, self.events, 0), 1)
+
+    def test_pbfs(self):
+        events = Events.create([(2, 1), (1,), (5, 4, 3), (2, 5)])
+        t = Terminal((
+            Block((Stack(()), Stack(()), Stack(()), Stack(())), True),
+            Block((Stack(()), Stack(()), Stack(())), False)
+        ), 3)
+        stack = PBFS(events, t, lower_bound_function=stack_blocking)
+        bay = PBFS(events, t, lower_bound_function=bay_blocking)
+        self.assertEqual(bay.cache_chance[(0, t)], stack.cache_chance[(0, t)])
+        self.assertLess(bay.expanded_nodes, stack.expanded_nodes)
+
+    def test_bound_name(self):
+        self.assertEqual(bound_name(stack_blocking), "main.model.policies.lowerBounds.stack_blocking")
+        self.assertEqual(bound_name(Maximum(stack_blocking, bay_blocking)),
+                         "max(main.model.policies.lowerBounds.stack_blocking, "
+                         "main.model.policies.lowerBounds.bay_blocking)")
+        self.assertEqual(bound_name(PBFS.lower_bound_reshuffles_blocking),
+                         "main.model.policies.pbfs.PBFS.lower_bound_reshuffles_blocking")
+        # solutions found with different bounds are kept apart in a store
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        with SolutionStore(":memory:") as store:
+            PBFS(events, t, beam_width=2, store=store, lower_bound_function=stack_blocking)
+            self.assertFalse(PBFS(events, t, beam_width=2, store=store, lower_bound_function=bay_blocking).warm)
+            self.assertTrue(PBFS(events, t, beam_width=2, store=store, lower_bound_function=stack_blocking).warm)
@@ -1,5 +1,10 @@
+import os
+import tempfile
 import unittest
 
+import numpy
+
+from main.model.batch import unique_permutations, weighted_permutations
 from main.model.batch.realizedBatch import RealizedBatch
 from main.model.dataclass.block import Block
 from main.model.dataclass.stack import Stack
@@ -7,7 +12,9 @@ from main.model.dataclass.terminal import Terminal
 from main.model.events.evaluatableEvents import EvaluatableEvents
 from main.model.events.events import Events
 from main.model.policies.pbfs import PBFS
+from main.model.policies.pbfsSearch import PBFSSearch
 from main.model.policies.policy import Policy
+from main.model.util.solutionStore import SolutionStore
 
 
 class TestExactPolicy(unittest.TestCase):
@@ -88,10 +95,10 @@ class TestExactPolicy(unittest.TestCase):
         self.assertEqual(reshuffles, 0)
 
     @staticmethod
-    def evaluate_pbfs(events, init_terminal, pbfs):
+    def evaluate_pbfs(events, init_terminal, pbfs, rng=None):
         total_reshuffles = 0
         for i in range(10):
-            sample = events.sample()
+            sample = events.sample(rng)
             new_terminal = init_terminal
             for batch_number in range(events.length()):
                 # print("-" * 40)
@@ -123,3 +130,144 @@ class TestExactPolicy(unittest.TestCase):
 
 
 
+
+    def test_beam(self):
+        events = Events.create([(1,2,3), (), (), (1,2,3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        exact = PBFS(events, t)
+        beam = PBFS(events, t, beam_width=1)
+        # a beam can only miss better layouts
+        self.assertGreaterEqual(beam.cache_chance[(0, t.abstract())], exact.cache_chance[(0, t.abstract())])
+        self.assertNotEqual(self.evaluate_pbfs(events, t, beam), 0)
+
+    def test_weighted_permutations(self):
+        t = Terminal.empty_single_stack_block(2, 3).store_container((0, 0), (1, 1, -1)).store_container((1, 0), (2, 1, -1))
+        # both orderings reveal the same abstract terminal
+        outbound, total = weighted_permutations(False, ((1, 1, -1), (2, 1, -1)), t)
+        self.assertEqual(total, 2)
+        self.assertEqual([weight for _, _, weight in outbound], [2])
+        # only the ids differ
+        inbound, total = weighted_permutations(True, ((3, 1, -1), (4, 1, -1), (5, 2, -1)), t)
+        self.assertEqual(total, 6)
+        self.assertEqual(sorted([weight for _, _, weight in inbound]), [2, 2, 2])
+
+    def test_weighted_expectation(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        pbfs = PBFS(events, t)
+        # the expectation over all orderings, solving every ordering separately
+        unweighted = PBFS(events, t, solve=False)
+        batch = events.batch(0)
+        permutations = unique_permutations(batch.inbound, batch.containers)
+        value = 0.0
+        for realized_batch in permutations:
+            value += unweighted.pbfs_decision(events, batch.inbound, 0, 0, realized_batch, t,
+                                              PBFS.lower_bound_reshuffles_blocking)
+        self.assertAlmostEqual(pbfs.cache_chance[(0, t.abstract())], value / len(permutations))
+
+    def test_bounded_cache(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        exact = PBFS(events, t)
+        for eviction in ["depth", "lru"]:
+            bounded = PBFS(events, t, max_entries=4, eviction=eviction)
+            self.assertLessEqual(len(bounded.cache_chance), 4)
+            self.assertGreater(bounded.cache_chance.evictions, 0)
+            self.assertEqual(bounded.solve(events, t, PBFS.lower_bound_reshuffles_blocking),
+                             exact.cache_chance[(0, t)])
+            # evicted values are recomputed when handling batches
+            self.assertEqual(self.evaluate_pbfs(events, t, bounded), self.evaluate_pbfs(events, t, exact))
+
+    def test_solution_store(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "solutions.sqlite")
+            with SolutionStore(path) as store:
+                cold = PBFS(events, t, store=store)
+                self.assertFalse(cold.warm)
+                self.assertTrue(store.is_complete(cold.instance))
+            with SolutionStore(path) as store:
+                warm = PBFS(events, t, store=store)
+                self.assertTrue(warm.warm)
+                self.assertTrue(warm.warm_complete)
+                # only the root is looked up, nothing is solved
+                self.assertEqual(len(warm.cache_chance), 1)
+                self.assertEqual(warm.cache_chance[(0, t)], cold.cache_chance[(0, t)])
+                self.assertEqual(self.evaluate_pbfs(events, t, warm), self.evaluate_pbfs(events, t, cold))
+
+    def test_solution_store_evicted(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        exact = PBFS(events, t)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "solutions.sqlite")
+            with SolutionStore(path) as store:
+                bounded = PBFS(events, t, max_entries=2, store=store)
+                self.assertGreater(bounded.cache_chance.evictions, 0)
+                # evicted values are saved as well
+                self.assertTrue(store.is_complete(bounded.instance))
+                for step, key, value in exact.cache_chance.items():
+                    if step < events.length():
+                        self.assertEqual(store.get(bounded.instance, step, key), value)
+            with SolutionStore(path) as store:
+                warm = PBFS(events, t, store=store)
+                self.assertTrue(warm.warm_complete)
+                self.assertEqual(warm.cache_chance[(0, t)], exact.cache_chance[(0, t)])
+                self.assertEqual(self.evaluate_pbfs(events, t, warm, numpy.random.default_rng(3)),
+                                 self.evaluate_pbfs(events, t, exact, numpy.random.default_rng(3)))
+
+    def test_solution_store_incomplete(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        exact = PBFS(events, t)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "solutions.sqlite")
+            with SolutionStore(path) as store:
+                # values evicted by the workers are not saved
+                parallel = PBFS(events, t, processes=2, max_entries=2, store=store)
+                self.assertTrue(parallel.lost)
+                self.assertFalse(store.is_complete(parallel.instance))
+            with SolutionStore(path) as store:
+                warm = PBFS(events, t, store=store)
+                self.assertFalse(warm.warm_complete)
+                # values missing from the store are recomputed rather than taken as pruned
+                self.assertEqual(self.evaluate_pbfs(events, t, warm, numpy.random.default_rng(3)),
+                                 self.evaluate_pbfs(events, t, exact, numpy.random.default_rng(3)))
+
+    def test_long_horizon(self):
+        # a container arrives and departs in every pair of batches, far more batches than the recursion limit allows
+        batches = []
+        for i in range(1, 801):
+            batches += [(i,), (i,)]
+        events = Events.create(batches)
+        t = Terminal.empty_single_stack_block(1, 1)
+        self.assertEqual(PBFS(events, t).cache_chance[(0, t)], 0)
+
+    def test_anytime(self):
+        events = Events.create([(1, 2, 3, 4), (2,), (5,), (1, 3, 4)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        exact = PBFS(events, t).cache_chance[(0, t)]
+        paused = PBFS(events, t, time_limit=0)
+        self.assertFalse(paused.search.done())
+        lower, upper = paused.search.bounds()
+        self.assertLessEqual(lower, exact)
+        self.assertGreaterEqual(upper, exact)
+        self.assertTrue(paused.resume())
+        self.assertAlmostEqual(paused.search.value, exact)
+        self.assertAlmostEqual(paused.cache_chance[(0, t)], exact)
+
+        reports = []
+        search = PBFSSearch.chance(PBFS(events, t, solve=False), events, 0, t, PBFS.lower_bound_reshuffles_blocking)
+        self.assertTrue(search.run(progress=lambda s: reports.append(s.bounds()), progress_interval=0))
+        self.assertGreater(len(reports), 0)
+        self.assertAlmostEqual(search.value, exact)
+
+    def test_parallel(self):
+        events = Events.create([(1, 2), (), (3,), (2, 3)])
+        t = Terminal.empty_single_stack_block(2, 3)
+        serial = PBFS(events, t)
+        parallel = PBFS(events, t, processes=2)
+        self.assertEqual(parallel.cache_chance[(0, t.abstract())], serial.cache_chance[(0, t.abstract())])
+        self.assertEqual(parallel.cache_chance.keys(), serial.cache_chance.keys())
+        self.assertEqual(self.evaluate_pbfs(events, t, parallel), self.evaluate_pbfs(events, t, serial))
@@ -0,0 +1,93 @@
+import random
+import unittest
+
+from main.model.adp.valuefunctions.features.MMRule import MM_rule
+from main.model.adp.valuefunctions.features.compositeMeasure import crl, composite_measure, \
+    composite_adopted_measure, ALPHA
+from main.model.adp.valuefunctions.features.mmAdopted import MM_adopted_rule
+from main.model.adp.valuefunctions.features.util.rollout import Rollout, rollout_scores
+from main.model.dataclass.block import Block
+from main.model.dataclass.outcomes import valid_block_stacks
+from main.model.dataclass.stack import Stack
+from main.model.dataclass.terminal import Terminal
+
+
+def score(function):
+    try:
+        return function()
+    except IndexError:
+        # no valid stack left to reshuffle to
+        return None
+
+
+class TestRollout(unittest.TestCase):
+    t = Terminal((
+        Block((Stack(()), Stack(()), Stack(()), Stack(()), Stack(())), True),
+        Block((Stack(()), Stack(()), Stack(())), False),
+    ), 4)
+
+    def random_terminal(self, rng: random.Random, distinct_labels: bool) -> Terminal:
+        terminal = self.t
+        nr_containers = rng.randint(0, 16)
+        # arbitrary container ids, unrelated to the positions of the containers
+        container_ids = rng.sample(range(1, 100), nr_containers)
+        labels = rng.sample(range(20), nr_containers)
+        for i in range(nr_containers):
+            locations = [(block_index, stack_index) for block_index in range(terminal.nr_blocks())
+                         for stack_index in valid_block_stacks(terminal, block_index, None)]
+            if len(locations) == 0:
+                break
+            if distinct_labels:
+                container = (container_ids[i], labels[i], -1)
+            else:
+                container = (container_ids[i], rng.randint(0, 4), rng.choice([-1, -1, rng.randint(1, 4)]))
+            terminal = terminal.store_container(rng.choice(locations), container)
+        return terminal
+
+    def assert_same_as_simulation(self, terminal: Terminal):
+        self.assertEqual(score(lambda: Rollout.of(terminal).mm_rule()), score(lambda: MM_rule(terminal)))
+        self.assertEqual(score(lambda: Rollout.of(terminal).mm_rule(True)), score(lambda: MM_adopted_rule(terminal)))
+        self.assertEqual(score(lambda: Rollout.of(terminal).crl()), score(lambda: crl(terminal)))
+        self.assertEqual(score(lambda: rollout_scores(terminal)), score(lambda: (MM_rule(terminal), crl(terminal))))
+        self.assertEqual(score(lambda: rollout_scores(terminal, adopted=True)),
+                         score(lambda: (MM_adopted_rule(terminal), crl(terminal))))
+
+    def test_same_as_simulation(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            self.assert_same_as_simulation(self.random_terminal(rng, False))
+            self.assert_same_as_simulation(self.random_terminal(rng, True))
+
+    def test_ids_break_ties(self):
+        # all labels distinct, the store rules still break ties between stacks by the container ids
+        rng = random.Random(3)
+        for container_ids in [range(1, 12), range(11, 0, -1), rng.sample(range(1, 100), 11)]:
+            ids = iter(container_ids)
+            blocks = []
+            for stacks, two_way in [([(), (7, 9, 13), (10, 14, 3, 16), (), ()], True), ([(), (0, 12, 15, 6), ()], False)]:
+                blocks.append(Block(tuple([Stack(tuple([(next(ids), label, -1) for label in stack]))
+                                           for stack in stacks]), two_way))
+            terminal = Terminal(tuple(blocks), 4)
+            self.assert_same_as_simulation(terminal)
+            self.assertAlmostEqual(composite_adopted_measure(terminal, None, 0),
+                                   ALPHA * MM_adopted_rule(terminal) + (1 - ALPHA) * crl(terminal))
+
+    def test_undo(self):
+        terminal = self.t.store_container((0, 2), (1, 3, -1)).store_container((0, 2), (2, 1, -1)) \
+            .store_container((0, 2), (3, 2, -1)).store_container((1, 2), (4, 0, -1))
+        rollout = Rollout.of(terminal)
+        stacks = [[list(stack) for stack in block_stacks] for block_stacks in rollout.stacks]
+        mark = rollout.mark()
+        mm_score = rollout.mm_rule()
+        self.assertEqual(sum([len(stack) for block_stacks in rollout.stacks for stack in block_stacks]), 0)
+        rollout.undo(mark)
+        self.assertEqual(rollout.stacks, stacks)
+        self.assertEqual(rollout.mm_rule(), mm_score)
+
+    def test_cache(self):
+        terminal = self.t.store_container((0, 2), (1, 3, -1)).store_container((0, 2), (2, 1, -1))
+        self.assertEqual(rollout_scores(terminal), (MM_rule(terminal), crl(terminal)))
+        self.assertEqual(rollout_scores(terminal), rollout_scores(self.t.store_container((0, 2), (1, 3, -1))
+                                                                  .store_container((0, 2), (2, 1, -1))))
+        self.assertAlmostEqual(composite_measure(terminal, None, 0),
+                               ALPHA * MM_rule(terminal) + (1 - ALPHA) * crl(terminal))